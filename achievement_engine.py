@@ -0,0 +1,88 @@
+# Achievement evaluation for the Python minigame functions
+from bisect import bisect_right
+
+# Same shape as ALL_ACHIEVEMENTS in src/data/achievements.ts:
+# an achievement unlocks once trigger.stat reaches trigger.value.
+MINIGAME_ACHIEVEMENTS = [
+    {
+        "id": "ACH_FIRST_SALE",
+        "name": "Premier Client",
+        "description": "Vendre votre premier article au marché de Namdaemun.",
+        "trigger": {"stat": "itemsSoldAtMarket", "value": 1},
+    },
+    {
+        "id": "Combo Master lvl 1",
+        "name": "Maître du Combo I",
+        "description": "Atteindre un combo de 15 dans Color Chaos.",
+        "trigger": {"stat": "colorChaosHighestCombo", "value": 15},
+    },
+]
+
+
+class AchievementIndex:
+    """
+    Achievement rules precompiled into {stat: (sorted thresholds, achievement ids)}.
+
+    Only the rules of stats a delta touches are looked at, and for each stat a bisect
+    finds every threshold already reached, so unrelated rules are never evaluated.
+    """
+
+    def __init__(self, achievements):
+        rules_by_stat = {}
+        for achievement in achievements:
+            trigger = achievement["trigger"]
+            rules_by_stat.setdefault(trigger["stat"], []).append((trigger["value"], achievement["id"]))
+
+        self._rules_by_stat = {}
+        for stat, rules in rules_by_stat.items():
+            rules.sort()
+            self._rules_by_stat[stat] = (tuple(value for value, _id in rules), tuple(_id for _value, _id in rules))
+
+    def stats(self):
+        """Returns the stats that at least one achievement depends on."""
+        return frozenset(self._rules_by_stat)
+
+    def evaluate(self, profile, delta, changed_stats=None):
+        """
+        Returns the ids of achievements unlocked by applying `delta` to `profile`.
+
+        Args:
+            profile (PlayerProfile): The stored profile (its achievements are a set).
+            delta (ProfileDelta): The pending changes; its achievements count as already unlocked.
+            changed_stats (iterable, optional): Stats to evaluate. Defaults to every stat the delta
+                                                raises: non-zero increments, and records.
+
+        A counter stat is compared as its stored value plus the increment, so a profile that
+        already passed a threshold without the achievement gets it on its next increment.
+        A record stat (e.g. a highest combo) is compared as the value reached in the delta:
+        the stored best alone never unlocks anything.
+        """
+        if changed_stats is None:
+            changed_stats = {stat for stat, amount in delta.stats.items() if amount} | delta.records.keys()
+
+        unlocked = set()
+        for stat in changed_stats:
+            rules = self._rules_by_stat.get(stat)
+            if rules is None:
+                continue
+            thresholds, achievement_ids = rules
+
+            if stat in delta.records:
+                value = delta.records[stat]
+            else:
+                value = profile.stats.get(stat) if profile.stats is not None else None
+                value = (value or 0) + delta.stats.get(stat, 0)
+
+            for achievement_id in achievement_ids[:bisect_right(thresholds, value)]:
+                if achievement_id not in profile.achievements and achievement_id not in delta.achievements:
+                    unlocked.add(achievement_id)
+        return unlocked
+
+    def award(self, profile, delta, changed_stats=None):
+        """Adds the achievements unlocked by `delta` to it and returns the newly unlocked ids."""
+        unlocked = self.evaluate(profile, delta, changed_stats)
+        delta.achievements |= unlocked
+        return unlocked
+
+
+minigame_achievements = AchievementIndex(MINIGAME_ACHIEVEMENTS)
@@ -0,0 +1,237 @@
+# Adaptive item selection: rounds lean toward the items a player gets wrong or answers slowly
+import threading
+from array import array
+from collections import OrderedDict
+from definition_catalog import register_derived_index
+
+ACCURACY_SMOOTHING = 0.3 # Weight of the latest answer in the running accuracy and latency
+SLOW_ANSWER_SECONDS = 5.0 # Answers this slow (or slower) count as fully "weak" on latency
+ACCURACY_WEIGHT = 0.75 # Share of accuracy vs latency in an item's weakness
+WEAK_ITEM_BOOST = 4.0 # A fully weak item is drawn 1 + 4 = 5 times as often as a mastered or new one
+DEFAULT_MAX_PLAYERS = 10_000 # Players whose statistics are kept in memory (least recently used dropped)
+
+
+class FenwickTree:
+    """
+    Non-negative weights of positions 0..n-1 with O(log n) update and weighted draw.
+
+    Starts all zero in O(1): the arrays are allocated, not filled.
+    """
+    __slots__ = ("_tree", "_weights", "_top_bit", "total")
+
+    def __init__(self, size):
+        self._tree = array("d", bytes(8 * (size + 1))) # 1-based partial sums
+        self._weights = array("d", bytes(8 * size))
+        self._top_bit = 1 << (size.bit_length() - 1) if size else 0
+        self.total = 0.0
+
+    def __len__(self):
+        return len(self._weights)
+
+    def __getitem__(self, position):
+        return self._weights[position]
+
+    def __setitem__(self, position, weight):
+        change = weight - self._weights[position]
+        self._weights[position] = weight
+        self.total += change
+        tree, index = self._tree, position + 1
+        while index < len(tree):
+            tree[index] += change
+            index += index & -index
+
+    def find(self, target):
+        """Returns the position p where the running sum of weights first exceeds `target` (0 <= target < total)."""
+        tree, position, bit = self._tree, 0, self._top_bit
+        while bit:
+            following = position + bit
+            if following < len(tree) and tree[following] <= target:
+                target -= tree[following]
+                position = following
+            bit >>= 1
+        return min(position, len(self._weights) - 1)
+
+
+class _ItemStats:
+    __slots__ = ("attempts", "accuracy", "latency")
+
+    def __init__(self):
+        self.attempts = 0
+        self.accuracy = 0.0 # Smoothed share of correct answers
+        self.latency = 0.0 # Smoothed answer time in seconds
+
+    def record(self, correct, latency_seconds):
+        smoothing = 1.0 if self.attempts == 0 else ACCURACY_SMOOTHING
+        self.attempts += 1
+        self.accuracy += smoothing * ((1.0 if correct else 0.0) - self.accuracy)
+        if latency_seconds is not None:
+            self.latency += smoothing * (latency_seconds - self.latency)
+
+    def extra_weight(self):
+        slowness = min(1.0, self.latency / SLOW_ANSWER_SECONDS)
+        weakness = ACCURACY_WEIGHT * (1.0 - self.accuracy) + (1.0 - ACCURACY_WEIGHT) * slowness
+        return WEAK_ITEM_BOOST * weakness
+
+
+class _PlayerState:
+    """
+    A player's statistics and, for the current snapshot, the extra weights of the items
+    they answered: slot i of `tree` weighs the item at position `positions[i]`. Memory grows
+    with the items answered, not with the catalog.
+    """
+    __slots__ = ("stats", "snapshot", "positions", "slots", "tree")
+
+    def __init__(self):
+        self.stats = {} # item_id -> _ItemStats, only for items the player has answered
+        self.snapshot = None
+        self.positions = [] # Snapshot position of each slot
+        self.slots = {} # Snapshot position -> slot
+        self.tree = FenwickTree(0)
+
+    def set_weight(self, position, weight):
+        slot = self.slots.get(position)
+        if slot is None:
+            slot = self.slots[position] = len(self.positions)
+            self.positions.append(position)
+            if slot >= len(self.tree): # Full: double the capacity (amortized O(log m) per new item)
+                tree = FenwickTree(max(8, 2 * len(self.tree)))
+                for old_slot in range(slot):
+                    tree[old_slot] = self.tree[old_slot]
+                self.tree = tree
+        self.tree[slot] = weight
+
+
+class AdaptiveSelector:
+    """
+    Draws catalog items for a player, weighted toward the items they are weak on.
+
+    Every item has a base weight of 1, plus up to WEAK_ITEM_BOOST for the items the
+    player's answers show as weak (low smoothed accuracy, slow smoothed latency). Only the
+    extra weights of the items a player answered are kept, in a Fenwick tree over those
+    items, so recording an answer and drawing an item are both O(log m) for m items answered,
+    whatever the catalog size. Players without statistics get uniform draws and no state.
+    """
+
+    def __init__(self, catalog, id_field="id", max_players=DEFAULT_MAX_PLAYERS):
+        self._catalog = catalog
+        self._id_field = id_field
+        self._max_players = max_players
+        self._lock = threading.Lock()
+        self._players = OrderedDict()
+        self._compiled = (None, {}) # (source snapshot, {item_id: position})
+        register_derived_index(self._build_positions)
+
+    def _positions(self, snapshot):
+        source, positions = self._compiled
+        if source is not snapshot:
+            positions = {item.get(self._id_field): position for position, item in enumerate(snapshot)}
+            self._compiled = (snapshot, positions)
+        return positions
+
+    def _build_positions(self):
+        snapshot = self._catalog.snapshot()
+        with self._lock:
+            return self._positions(snapshot)
+
+    def _state(self, player_id, snapshot, create=True):
+        """The player's state with its weights placed for `snapshot`, or None (callers hold the lock)."""
+        state = self._players.get(player_id)
+        if state is None:
+            if not create:
+                return None
+            state = self._players[player_id] = _PlayerState()
+            if len(self._players) > self._max_players:
+                self._players.popitem(last=False)
+        else:
+            self._players.move_to_end(player_id)
+        if state.snapshot is not snapshot:
+            positions = self._positions(snapshot)
+            state.snapshot, state.positions, state.slots, state.tree = snapshot, [], {}, FenwickTree(0)
+            for item_id, stats in state.stats.items():
+                position = positions.get(item_id)
+                if position is not None:
+                    state.set_weight(position, stats.extra_weight())
+        return state
+
+    def record(self, player_id, item_id, correct, latency_seconds=None):
+        """Records one answer of the player about an item (latency_seconds None when it was not timed)."""
+        snapshot = self._catalog.snapshot()
+        with self._lock:
+            state = self._state(player_id, snapshot)
+            stats = state.stats.get(item_id)
+            if stats is None:
+                stats = state.stats[item_id] = _ItemStats()
+            stats.record(correct, latency_seconds)
+            position = self._positions(snapshot).get(item_id)
+            if position is not None:
+                state.set_weight(position, stats.extra_weight())
+
+    def record_answers(self, player_id, answers):
+        """
+        Records a game's answers, as [{"id": item_id, "correct": bool, "timeTaken": seconds (optional)}, ...].
+
+        Raises:
+            ValueError: If an answer is malformed (nothing is recorded then).
+        """
+        if not isinstance(answers, list):
+            raise ValueError("'answers' must be a list.")
+        parsed = []
+        for answer in answers:
+            if not isinstance(answer, dict) or not isinstance(answer.get("correct"), bool) or answer.get("id") is None:
+                raise ValueError("Each answer needs an 'id' and a boolean 'correct'.")
+            latency = answer.get("timeTaken")
+            if latency is not None and (isinstance(latency, bool) or not isinstance(latency, (int, float)) or latency < 0):
+                raise ValueError("'timeTaken' must be a non-negative number of seconds.")
+            parsed.append((answer["id"], answer["correct"], latency))
+        for item_id, correct, latency in parsed:
+            self.record(player_id, item_id, correct, latency)
+
+    def weight(self, player_id, item_id):
+        """The current draw weight of an item for the player (1 for new or mastered items)."""
+        stats = self._players.get(player_id, _PlayerState()).stats.get(item_id)
+        return 1.0 + (stats.extra_weight() if stats is not None else 0.0)
+
+    def sample_positions(self, player_id, count, rng):
+        """
+        Draws `count` distinct positions in the current catalog snapshot, weak items first in
+        probability. Returns (snapshot, positions).
+
+        Raises:
+            ValueError: If the catalog holds fewer than `count` items.
+        """
+        snapshot = self._catalog.snapshot()
+        if count > len(snapshot):
+            raise ValueError(f"Cannot draw {count} distinct items from {len(snapshot)}.")
+        with self._lock:
+            state = self._state(player_id, snapshot, create=False)
+            if state is None or state.tree.total <= 0.0:
+                return snapshot, rng.sample(range(len(snapshot)), count)
+            tree, slot_positions, slots = state.tree, state.positions, state.slots
+            chosen, drawn, removed = [], set(), {} # removed: slot -> its weight, zeroed while drawing
+            while len(chosen) < count:
+                uniform_total = float(len(snapshot) - len(chosen))
+                target = rng.random() * (uniform_total + max(tree.total, 0.0))
+                position = None
+                if target >= uniform_total:
+                    slot = tree.find(target - uniform_total)
+                    if tree[slot] > 0.0:
+                        position = slot_positions[slot]
+                if position is None:
+                    # Base weight: uniform over the positions not drawn yet
+                    position = rng.randrange(len(snapshot))
+                    while position in drawn:
+                        position = rng.randrange(len(snapshot))
+                chosen.append(position)
+                drawn.add(position)
+                slot = slots.get(position)
+                if slot is not None and slot not in removed:
+                    removed[slot] = tree[slot]
+                    tree[slot] = 0.0
+            for slot, weight in removed.items(): # Put the drawn items' weights back
+                tree[slot] = weight
+        return snapshot, chosen
+
+    def choose(self, player_id, rng):
+        """Draws one item (read-only record) for the player."""
+        snapshot, (position,) = self.sample_positions(player_id, 1, rng)
+        return snapshot[position]
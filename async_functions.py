@@ -0,0 +1,86 @@
+# Asyncio-native variants of the minigame Cloud Functions
+#
+# The generators only await their catalog (reloaded off the event loop when stale); the
+# submit functions read the profile from an async store (see profile_store_mocks
+# .AsyncInMemoryProfileStore), fetching what they need concurrently, compute the delta with
+# the synchronous reward code and write it back as one batched update (skipped when empty).
+import asyncio
+from definition_catalog import snapshot_async
+from firestore_mocks import market_item_catalog
+from food_feast_functions import get_food_game_data, submit_food_game_results
+from food_mocks import food_item_catalog
+from namdaemun_functions import get_namdaemun_game_data, submit_namdaemun_results
+from poem_functions import get_poem_puzzle_data, submit_poem_results
+from poem_mocks import poem_puzzle_catalog
+from src.game_logic.color_chaos import color_catalog, get_color_chaos_game_data, submit_color_chaos_results
+
+
+async def get_namdaemun_game_data_async(rng=None, player_id=None):
+    await snapshot_async(market_item_catalog)
+    return get_namdaemun_game_data(rng, player_id)
+
+
+async def get_food_game_data_async(options_input, rng=None):
+    """Async get_food_game_data; "playerId" in options_input steers the draw as in the sync version."""
+    await snapshot_async(food_item_catalog)
+    return get_food_game_data(options_input, rng)
+
+
+async def get_poem_puzzle_data_async(rng=None, player_id=None):
+    await snapshot_async(poem_puzzle_catalog)
+    return get_poem_puzzle_data(rng, player_id)
+
+
+async def get_color_chaos_game_data_async(data, rng=None):
+    """Async get_color_chaos_game_data; "playerId" in data steers the draw as in the sync version."""
+    await snapshot_async(color_catalog)
+    return get_color_chaos_game_data(data, rng)
+
+
+async def _load_profile(store, player_id, *catalogs):
+    """Fetches the player's profile while the catalogs the submission needs are refreshed."""
+    profile, *_snapshots = await asyncio.gather(
+        store.get_profile(player_id), *(snapshot_async(catalog) for catalog in catalogs)
+    )
+    if profile is None:
+        raise ValueError(f"Player profile '{player_id}' not found.")
+    # Stored profiles may not repeat their id: the submit functions record answers under "uid"
+    profile.setdefault("uid", player_id)
+    return profile
+
+
+async def _write(store, player_id, delta):
+    if not delta.is_empty():
+        await store.apply_deltas({player_id: delta})
+
+
+async def submit_namdaemun_results_async(store, player_id, score, items_sold):
+    """Async submit_namdaemun_results against `store`. Returns the applied ProfileDelta."""
+    profile = await _load_profile(store, player_id)
+    delta = submit_namdaemun_results(profile, score, items_sold, as_delta=True)
+    await _write(store, player_id, delta)
+    return delta
+
+
+async def submit_food_game_results_async(store, player_id, game_results_input):
+    """Async submit_food_game_results against `store`. Returns {"score", "delta"}."""
+    profile = await _load_profile(store, player_id)
+    result = submit_food_game_results(profile, game_results_input, as_delta=True)
+    await _write(store, player_id, result["delta"])
+    return result
+
+
+async def submit_poem_results_async(store, player_id, poem_id, user_answers, partial_credit=False):
+    """Async submit_poem_results against `store`. Returns {"score", "delta"} (and "message" if the poem is unknown)."""
+    profile = await _load_profile(store, player_id, poem_puzzle_catalog)
+    result = submit_poem_results(profile, poem_id, user_answers, as_delta=True, partial_credit=partial_credit)
+    await _write(store, player_id, result["delta"])
+    return result
+
+
+async def submit_color_chaos_results_async(store, player_id, results):
+    """Async submit_color_chaos_results against `store`. Returns the applied ProfileDelta."""
+    profile = await _load_profile(store, player_id)
+    delta = submit_color_chaos_results(profile, results, as_delta=True)
+    await _write(store, player_id, delta)
+    return delta
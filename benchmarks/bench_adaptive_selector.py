@@ -0,0 +1,42 @@
+# Record and draw time of the adaptive selector on a large catalog: python benchmarks/bench_adaptive_selector.py [--items N]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive_selector import AdaptiveSelector
+from definition_catalog import DefinitionCatalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--operations", type=int, default=100_000)
+    args = parser.parse_args()
+    items = [{"id": f"item_{number}"} for number in range(args.items)]
+    catalog = DefinitionCatalog(lambda: items)
+    selector = AdaptiveSelector(catalog)
+    rng = random.Random(0)
+    catalog.snapshot() # Loaded once per content deploy, not per request
+    selector.choose("warm_up", rng) # Likewise the id -> position table of the snapshot
+
+    start = time.perf_counter()
+    selector.choose("player", rng)
+    print(f"first draw: {(time.perf_counter() - start) * 1e6:8.1f}us (new player, {args.items:,} items)")
+
+    start = time.perf_counter()
+    for _ in range(args.operations):
+        selector.record("player", f"item_{rng.randrange(args.items)}", rng.random() < 0.7, rng.uniform(0.5, 8))
+    print(f"record:     {(time.perf_counter() - start) / args.operations * 1e6:8.1f}us per answer")
+
+    start = time.perf_counter()
+    for _ in range(args.operations):
+        selector.sample_positions("player", 5, rng)
+    print(f"draw 5:     {(time.perf_counter() - start) / args.operations * 1e6:8.1f}us per round")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# Build and open time of a large content snapshot: python benchmarks/bench_content_snapshot.py [--records N]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pipeline import SYLLABLE_PUZZLE_SCHEMA, ContentSnapshot, write_snapshot
+
+
+def synthetic_vocabulary(count):
+    for index in range(count):
+        syllable = chr(0xAC00 + index % 11172) + str(index)
+        yield {"syllable": syllable, "jamo": ["ㄱ", "ㅏ"], "difficulty": index % 5 + 1, "type": "CV"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "vocabulary.kpsnap")
+        start = time.perf_counter()
+        write_snapshot(synthetic_vocabulary(args.records), SYLLABLE_PUZZLE_SCHEMA, path)
+        print(f"build:        {time.perf_counter() - start:8.3f}s for {args.records:,} records")
+
+        start = time.perf_counter()
+        snapshot = ContentSnapshot(path)
+        print(f"open:         {(time.perf_counter() - start) * 1000:8.3f}ms")
+
+        start = time.perf_counter()
+        for index in range(0, args.records, max(1, args.records // 1000)):
+            snapshot.get(chr(0xAC00 + index % 11172) + str(index))
+        print(f"1000 lookups: {(time.perf_counter() - start) * 1000:8.3f}ms")
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
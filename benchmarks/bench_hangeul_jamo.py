@@ -0,0 +1,35 @@
+# Decomposition and puzzle generation over a large vocabulary: python benchmarks/bench_hangeul_jamo.py [--words N]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hangeul_jamo import SYLLABLE_BASE, SYLLABLE_COUNT, decompose_words, generate_syllable_puzzles
+
+
+def synthetic_vocabulary(count, seed=0):
+    rng = random.Random(seed)
+    return ["".join(chr(SYLLABLE_BASE + rng.randrange(SYLLABLE_COUNT)) for _ in range(rng.randint(1, 4)))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=100_000)
+    args = parser.parse_args()
+    words = synthetic_vocabulary(args.words)
+
+    start = time.perf_counter()
+    decompose_words(words)
+    print(f"decompose: {(time.perf_counter() - start) * 1000:8.1f}ms for {args.words:,} words")
+
+    start = time.perf_counter()
+    records = generate_syllable_puzzles(words)
+    print(f"puzzles:   {(time.perf_counter() - start) * 1000:8.1f}ms ({len(records):,} distinct syllables)")
+
+
+if __name__ == "__main__":
+    main()
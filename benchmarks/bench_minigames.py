@@ -0,0 +1,272 @@
+# Latency, throughput and allocations of every minigame function, with regression gates
+#
+#   python benchmarks/bench_minigames.py                      # run, compare with the baseline
+#   python benchmarks/bench_minigames.py --update-baseline    # run and store the results as the baseline
+#   python benchmarks/bench_minigames.py --sizes 10,1000 --only food
+#
+# Each get_*_game_data / submit_*_results function runs against the in-module mock catalogs
+# refilled with synthetic definitions (10, 1k and 100k items by default, food spread over
+# FOOD_CATEGORIES categories), plus end-of-session settlement batches. Every get_* function is
+# measured both with a prebuilt rng and without one (".default_rng", the production path). Exits with status 1 when a case is slower (p50) or allocates more (peak)
+# than its baseline by more than --threshold. Baselines are machine specific: record them on
+# the machine that runs the gate.
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from definition_catalog import CONTENT_SNAPSHOT_DIR_ENV, invalidate_all_catalogs
+from firestore_mocks import MARKET_ITEM_DEFINITIONS_MOCK
+from food_feast_functions import get_food_game_data, submit_food_game_results
+from food_mocks import MOCK_FOOD_ITEMS
+from namdaemun_functions import get_namdaemun_game_data, market_item_selector, submit_namdaemun_results
+from poem_functions import get_poem_puzzle_data, get_poem_puzzle_payload, submit_poem_results
+from poem_mocks import MOCK_POEM_PUZZLES
+from reward_settlement import settle_session
+from src.game_logic.color_chaos import COLOR_DEFINITIONS, get_color_chaos_game_data, submit_color_chaos_results
+
+DEFAULT_SIZES = (10, 1_000, 100_000)
+DEFAULT_BATCH_SIZES = (10, 1_000)
+DEFAULT_THRESHOLD = 0.25 # Allowed slowdown / allocation growth before a case counts as a regression
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "minigames.json")
+ALLOCATION_SLACK_BYTES = 4096 # Below this, allocation changes are noise (small dicts, interned strings)
+MIN_SAMPLE_SECONDS = 0.2 # Each case runs at least this long, and at least --iterations calls
+FOOD_CATEGORIES = 8 # Like the real catalog: categories grow with the catalog, their count does not
+ANSWERED_ITEMS = 200 # Items a regular player has answered, for the adaptive draws
+
+
+def _word(rng):
+    return "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(rng.randint(1, 3)))
+
+
+def fill_catalogs(size, seed=0):
+    """Replaces the mock definition collections, in place, with `size` synthetic items each."""
+    rng = random.Random(seed)
+    categories = min(FOOD_CATEGORIES, max(1, size))
+    MARKET_ITEM_DEFINITIONS_MOCK[:] = [
+        {"id": f"item_{number}", "name_kr": _word(rng), "name_fr": f"Objet {number}", "imageUrl": f"images/item_{number}.png"}
+        for number in range(size)
+    ]
+    MOCK_FOOD_ITEMS[:] = [
+        {"id": f"food_{number:06d}", "hangeul": _word(rng), "name_fr": f"Plat {number}",
+         "category": f"category_{number % categories}", "imageUrl": f"images/food_{number}.png",
+         "audioUrl": f"audio/food_{number}.mp3"}
+        for number in range(size)
+    ]
+    COLOR_DEFINITIONS[:] = [
+        {"colorId": f"color_{number}", "hangeul": _word(rng), "hexCode": f"#{number % 0xFFFFFF:06X}"}
+        for number in range(size)
+    ]
+    MOCK_POEM_PUZZLES.clear()
+    for number in range(size):
+        poem_id = f"POEM_{number:06d}"
+        words = [f"mot{number}_{blank}" for blank in range(4)]
+        MOCK_POEM_PUZZLES[poem_id] = {
+            "id": poem_id, "title": f"Poème {number}", "author": "Banc d'essai",
+            "text": ["Vers ", None, " et ", None, " / puis ", None, " et ", None, "."],
+            "solutions": {f"blank_{blank + 1}": word for blank, word in enumerate(words)},
+            "choices": words + ["lune", "vent", "paix", "rêve"],
+            "reward": {"xp": 50, "mana": 35}, "max_score": 100
+        }
+    invalidate_all_catalogs()
+
+
+def seed_answer_history(player_id, seed=0):
+    """Records a few answers of the player on up to ANSWERED_ITEMS market items, some missed or slow."""
+    rng = random.Random(seed)
+    answered = rng.sample(MARKET_ITEM_DEFINITIONS_MOCK, min(ANSWERED_ITEMS, len(MARKET_ITEM_DEFINITIONS_MOCK)))
+    for item in answered:
+        for _ in range(rng.randint(1, 4)):
+            market_item_selector.record(player_id, item["id"], rng.random() < 0.7, rng.uniform(0.5, 8.0))
+
+
+def _profile(**stats):
+    return {"uid": "bench_player", "mana": 100, "xp": 50, "stats": stats, "achievements": []}
+
+
+def catalog_cases(size):
+    """(name, function) of every generator and submit function, for a catalog of `size` items."""
+    rng = random.Random(1)
+    profile = _profile(itemsSoldAtMarket=3, foodItemsIdentified=12, poemsCompleted=2, colorsIdentified=4)
+    poem_id = next(iter(MOCK_POEM_PUZZLES))
+    perfect = dict(MOCK_POEM_PUZZLES[poem_id]["solutions"])
+    adaptive_player = f"bench_player_{size}" # A fresh history per catalog size
+    seed_answer_history(adaptive_player) # Otherwise the adaptive case only times the uniform fallback
+    cases = [
+        ("namdaemun.get_game_data", lambda: get_namdaemun_game_data(rng)),
+        ("namdaemun.get_game_data.adaptive", lambda: get_namdaemun_game_data(rng, player_id=adaptive_player)),
+        ("namdaemun.submit_results", lambda: submit_namdaemun_results(profile, 1500, 8, as_delta=True)),
+        ("food_feast.get_game_data", lambda: get_food_game_data({"mode": "recognition"}, rng)),
+        ("food_feast.get_game_data.hard", lambda: get_food_game_data({"mode": "listening", "difficulty": "hard"}, rng)),
+        ("food_feast.submit_results", lambda: submit_food_game_results(
+            profile, {"correctAnswers": 8, "totalQuestions": 10, "timeTaken": 45}, as_delta=True)),
+        ("poem.get_puzzle_data", lambda: get_poem_puzzle_data(rng)),
+        ("poem.get_puzzle_payload", lambda: get_poem_puzzle_payload(rng)),
+        ("poem.submit_results", lambda: submit_poem_results(profile, poem_id, perfect, as_delta=True)),
+        ("color_chaos.get_game_data", lambda: get_color_chaos_game_data({"level": 1}, rng)),
+        ("color_chaos.submit_results", lambda: submit_color_chaos_results(
+            profile, {"score": 2500, "highestCombo": 15}, as_delta=True)),
+        # The default request path: no rng passed, as the Cloud Functions call them
+        ("namdaemun.get_game_data.default_rng", lambda: get_namdaemun_game_data()),
+        ("food_feast.get_game_data.default_rng", lambda: get_food_game_data({"mode": "recognition"})),
+        ("food_feast.get_game_data.hard.default_rng", lambda: get_food_game_data({"mode": "listening", "difficulty": "hard"})),
+        ("poem.get_puzzle_data.default_rng", lambda: get_poem_puzzle_data()),
+        ("poem.get_puzzle_payload.default_rng", lambda: get_poem_puzzle_payload()),
+        ("color_chaos.get_game_data.default_rng", lambda: get_color_chaos_game_data({"level": 1})),
+    ]
+    if size >= 4:
+        questions = min(20, size)
+        cases.append((f"food_feast.get_game_data.session{questions}",
+                      lambda: get_food_game_data({"mode": "recognition", "questions": questions}, rng)))
+    return cases
+
+
+def batch_case(batch_size):
+    """Settlement of an end-of-session batch mixing all minigames over batch_size / 4 players."""
+    rng = random.Random(2)
+    poem_ids = list(MOCK_POEM_PUZZLES)
+    profiles = [_profile(itemsSoldAtMarket=0, foodItemsIdentified=0, poemsCompleted=0, colorsIdentified=0)
+                for _ in range(max(1, batch_size // 4))]
+    for number, profile in enumerate(profiles):
+        profile["uid"] = f"bench_player_{number}"
+    submissions = []
+    for number in range(batch_size):
+        profile = profiles[number % len(profiles)]
+        kind = number % 4
+        if kind == 0:
+            submissions.append((profile, "namdaemun", {"score": rng.randrange(3000), "itemsSold": rng.randrange(10)}))
+        elif kind == 1:
+            submissions.append((profile, "food_feast", {"correctAnswers": 7, "totalQuestions": 10, "timeTaken": rng.randrange(60)}))
+        elif kind == 2:
+            poem_id = rng.choice(poem_ids)
+            submissions.append((profile, "poem", {"poemId": poem_id, "answers": dict(MOCK_POEM_PUZZLES[poem_id]["solutions"])}))
+        else:
+            submissions.append((profile, "color_chaos", {"score": rng.randrange(3000), "highestCombo": rng.randrange(30)}))
+    return f"settlement.settle_session[batch={batch_size}]", lambda: settle_session(submissions), batch_size
+
+
+def measure(function, iterations, items_per_call=1):
+    """Returns {"coldMs", "opsPerSec", "p50Us", "p99Us", "peakAllocBytes"} of one case."""
+    start = time.perf_counter()
+    function() # First call after a catalog change: includes per-snapshot compilation
+    cold_seconds = time.perf_counter() - start
+    for _ in range(min(10, iterations)):
+        function()
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < iterations or time.perf_counter() - started < MIN_SAMPLE_SECONDS:
+        call_started = time.perf_counter_ns()
+        function()
+        samples.append(time.perf_counter_ns() - call_started)
+    elapsed = time.perf_counter() - started
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(5):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            function()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "coldMs": round(cold_seconds * 1000, 3),
+        "opsPerSec": round(len(samples) * items_per_call / elapsed, 1),
+        "p50Us": round(samples[len(samples) // 2] / 1000, 2),
+        "p99Us": round(samples[min(len(samples) - 1, len(samples) * 99 // 100)] / 1000, 2),
+        "peakAllocBytes": int(statistics.median(peaks)),
+    }
+
+
+def run(sizes, batch_sizes, iterations, only=None):
+    results = {}
+
+    def record(name, function, items_per_call=1):
+        if only and not name.startswith(only):
+            return
+        results[name] = result = measure(function, iterations, items_per_call)
+        print(f"{name:58} {result['p50Us']:10.2f}us p50 {result['p99Us']:10.2f}us p99 "
+              f"{result['opsPerSec']:12,.0f}/s {result['peakAllocBytes']:10,}B peak {result['coldMs']:9.2f}ms cold")
+
+    for size in sizes:
+        fill_catalogs(size)
+        for name, function in catalog_cases(size):
+            record(f"{name}[n={size}]", function)
+        if size == sizes[0]:
+            for batch_size in batch_sizes:
+                record(*batch_case(batch_size))
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """Returns a message per case slower (p50) or allocating more (peak) than its baseline allows."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result["p50Us"] > reference["p50Us"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {result['p50Us']}us vs baseline {reference['p50Us']}us")
+        allowed_bytes = reference["peakAllocBytes"] * (1 + threshold) + ALLOCATION_SLACK_BYTES
+        if result["peakAllocBytes"] > allowed_bytes:
+            regressions.append(f"{name}: peak {result['peakAllocBytes']}B vs baseline {reference['peakAllocBytes']}B")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks every minigame function against a JSON baseline.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Catalog sizes, comma separated.")
+    parser.add_argument("--batch-sizes", default=",".join(map(str, DEFAULT_BATCH_SIZES)),
+                        help="Settlement batch sizes, comma separated.")
+    parser.add_argument("--iterations", type=int, default=200, help="Minimum timed calls per case.")
+    parser.add_argument("--only", help="Only run the cases whose name starts with this prefix (e.g. food_feast).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the baseline.")
+    args = parser.parse_args()
+
+    if os.environ.get(CONTENT_SNAPSHOT_DIR_ENV):
+        parser.error(f"unset {CONTENT_SNAPSHOT_DIR_ENV}: the benchmark refills the in-module mock catalogs.")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    results = run(sizes, batch_sizes, args.iterations, args.only)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)["cases"]
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "cases": baseline},
+                      file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)["cases"]
+    regressions = find_regressions(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(results)} cases, {len(regressions)} regressions (threshold {args.threshold:.0%}).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# Throughput of the bulk SRS recompute: python benchmarks/bench_srs_bulk.py [--runes N] [--chunk-size N]
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from srs_bulk_recompute import DAY_US, RuneColumns, recompute_columns, recompute_runes
+from srs_scheduler import SrsParameters
+
+TUNED_PARAMETERS = SrsParameters(min_ease_factor=1.5, max_mastery_level=4)
+
+
+def synthetic_runes(count, seed=0):
+    """Yields (userId, runeId, RuneDocument) tuples with a realistic spread of levels and intervals."""
+    rng = np.random.default_rng(seed)
+    now = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    levels = rng.integers(1, 5, count).tolist()
+    eases = np.round(rng.uniform(1.3, 2.8, count), 2).tolist()
+    ages = rng.integers(0, 90 * 24 * 3600, count).tolist()
+    intervals = rng.integers(1, 120, count).tolist()
+    for index in range(count):
+        last_reviewed = now - timedelta(seconds=ages[index])
+        yield f"user_{index // 200}", f"rune_{index % 200}", {
+            "masteryLevel": levels[index],
+            "easeFactor": eases[index],
+            "successfulReviews": levels[index] - 1,
+            "lastReviewed": last_reviewed,
+            "nextReviewDate": last_reviewed + timedelta(days=intervals[index]),
+        }
+
+
+def synthetic_columns(count, seed=0):
+    rng = np.random.default_rng(seed)
+    last_reviewed = rng.integers(1_750_000_000, 1_760_000_000, count) * 1_000_000
+    return RuneColumns(
+        keys=[None] * count,
+        mastery_level=rng.integers(1, 5, count).astype(np.int8),
+        ease_factor=np.round(rng.uniform(1.3, 2.8, count), 2),
+        last_reviewed=last_reviewed,
+        next_review_date=last_reviewed + rng.integers(1, 120, count) * DAY_US,
+    )
+
+
+def report(label, count, seconds):
+    print(f"{label:<32} {count:>10,} runes in {seconds:6.2f}s  ({count / seconds * 60:,.0f} runes/min)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runes", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    columns = synthetic_columns(args.runes)
+    start = time.perf_counter()
+    changed = recompute_columns(columns, TUNED_PARAMETERS)[3]
+    report("vectorized recompute only", args.runes, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    updated = sum(len(chunk) for chunk in recompute_runes(synthetic_runes(args.runes), TUNED_PARAMETERS, args.chunk_size))
+    report("end to end (incl. record I/O)", args.runes, time.perf_counter() - start)
+    print(f"{updated:,} updates ({int(changed.sum()):,} in the columnar run)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# Replay time of a Hangeul Typhoon duel keystroke log: python benchmarks/bench_typhoon_matcher.py [--seconds N]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hangeul_jamo import SYLLABLE_BASE, SYLLABLE_COUNT, keystroke_text
+from typhoon_matcher import verify_typhoon_log
+
+KEYS_PER_SECOND = 8 # A fast typist, per player
+BLOCKS_PER_SECOND = 2 # Per player, at the highest speed level
+
+
+def synthetic_duel(seconds, seed=0):
+    """Both players type the oldest of their blocks, with a typo every 20 keys and an attack every 10 words."""
+    rng = random.Random(seed)
+    blocks, keystrokes = [], []
+    for player in ("alice", "bob"):
+        words = ["".join(chr(SYLLABLE_BASE + rng.randrange(SYLLABLE_COUNT)) for _ in range(rng.randint(1, 4)))
+                 for _ in range(seconds * BLOCKS_PER_SECOND)]
+        for number, word in enumerate(words):
+            blocks.append({"id": f"{player}-{number}", "owner": player, "text": word, "spawnedAt": number / BLOCKS_PER_SECOND})
+        at = 0.0
+        for number, word in enumerate(words):
+            keys = list(keystroke_text(word)) + ["Enter"]
+            if number % 10 == 9:
+                keys = ["<"] + keys[:-1] + [">"]
+            for key in keys:
+                at = max(at + 1 / KEYS_PER_SECOND, number / BLOCKS_PER_SECOND)
+                if rng.random() < 0.05:
+                    keystrokes.append({"player": player, "key": "ㅋ", "at": at})
+                    keystrokes.append({"player": player, "key": "Backspace", "at": at})
+                keystrokes.append({"player": player, "key": key, "at": at})
+    keystrokes.sort(key=lambda stroke: stroke["at"])
+    return blocks, keystrokes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=int, default=180)
+    args = parser.parse_args()
+    blocks, keystrokes = synthetic_duel(args.seconds)
+
+    start = time.perf_counter()
+    results = verify_typhoon_log(blocks, keystrokes)
+    elapsed = time.perf_counter() - start
+    destroyed = sum(len(result["destroyed"]) for result in results.values())
+    print(f"replay: {elapsed * 1000:8.2f}ms for {len(keystrokes):,} keystrokes and {len(blocks):,} blocks "
+          f"({destroyed:,} destroyed)")
+
+
+if __name__ == "__main__":
+    main()
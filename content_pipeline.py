@@ -0,0 +1,478 @@
+# Content pipeline: definition JSON files -> validated, indexed binary snapshots
+#
+#   python content_pipeline.py SOURCE_DIR OUTPUT_DIR [--with-mocks]
+#
+# Each definition file (a JSON array of records) is streamed record by record, validated
+# against its ContentSchema and written to OUTPUT_DIR/<collection>.kpsnap. Minigame modules
+# open the snapshots with ContentSnapshot, which memory-maps the file and only decodes the
+# records that are actually read. A snapshot opened before a pre-fork worker pool forks is
+# shared by every worker through the page cache instead of being copied into each of them.
+# The indexes the minigames derive from a snapshot are built per process, decoding every
+# record: call definition_catalog.build_derived_indexes() before forking to share them too.
+import contextlib
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+SNAPSHOT_MAGIC = b"KPSNAP01"
+SNAPSHOT_SUFFIX = ".kpsnap"
+READ_SIZE = 1 << 16
+_TRAILER = struct.Struct("<Q8s") # footer offset, magic
+_ALIGNMENT = 8
+_SCALAR_END = re.compile(r"[,\]\s]")
+
+
+class ContentValidationError(ValueError):
+    """A definition record does not match its schema."""
+
+
+@dataclass(frozen=True)
+class ContentSchema:
+    """
+    Shape of one definition collection.
+
+    `fields` maps field names to the accepted type (or tuple of types); fields not listed
+    are kept as they are. `id_field` must be unique across the collection, and every
+    field of `index_fields` gets a value -> records index in the snapshot.
+    """
+    collection: str
+    id_field: str
+    fields: dict
+    required: tuple = ()
+    index_fields: tuple = ()
+
+    def validate(self, record, position):
+        """Returns the record if it matches the schema, raises ContentValidationError otherwise."""
+        where = f"{self.collection}[{position}]"
+        if not isinstance(record, dict):
+            raise ContentValidationError(f"{where}: expected an object, got {type(record).__name__}.")
+        for name in self.required:
+            if record.get(name) is None:
+                raise ContentValidationError(f"{where}: missing required field '{name}'.")
+        for name, expected_type in self.fields.items():
+            value = record.get(name)
+            if value is None:
+                continue
+            if isinstance(value, bool) and expected_type is not bool:
+                raise ContentValidationError(f"{where}: '{name}' must be {_type_name(expected_type)}.")
+            if not isinstance(value, expected_type):
+                raise ContentValidationError(f"{where}: '{name}' must be {_type_name(expected_type)}.")
+        return record
+
+
+def _type_name(expected_type):
+    if isinstance(expected_type, tuple):
+        return " or ".join(t.__name__ for t in expected_type)
+    return expected_type.__name__
+
+
+FOOD_ITEM_DEFINITION_SCHEMA = ContentSchema(
+    "foodItemDefinitions", id_field="hangeul",
+    fields={"hangeul": str, "french_name": str, "category": str, "imageUrl": str, "audioUrl": str},
+    required=("hangeul", "french_name", "category"),
+    index_fields=("category",),
+)
+SYLLABLE_PUZZLE_SCHEMA = ContentSchema(
+    "syllablePuzzles", id_field="syllable",
+    fields={"syllable": str, "jamo": list, "difficulty": int, "type": str},
+    required=("syllable", "jamo", "difficulty"),
+    index_fields=("difficulty", "type"),
+)
+SPELL_DEFINITION_SCHEMA = ContentSchema(
+    "spellDefinitions", id_field="spellId",
+    fields={"spellId": str, "name": str, "description": str, "manaCost": int, "type": str,
+            "target": str, "effectDetails": dict},
+    required=("spellId", "name", "manaCost", "type"),
+    index_fields=("type",),
+)
+QUEST_DEFINITION_SCHEMA = ContentSchema(
+    "questDefinitions", id_field="title",
+    fields={"title": str, "description": str, "type": str, "objective": dict, "rewards": dict,
+            "prerequisites": dict},
+    required=("title", "type", "objective"),
+    index_fields=("type",),
+)
+
+# Collections the minigame modules read, in the shape of their Firestore documents
+MARKET_ITEM_SCHEMA = ContentSchema(
+    "marketItemDefinitions", id_field="id",
+    fields={"id": str, "name_kr": str, "name_fr": str, "imageUrl": str, "category": str},
+    required=("id", "name_kr"),
+    index_fields=("category",),
+)
+FOOD_ITEM_SCHEMA = ContentSchema(
+    "foodItems", id_field="id",
+    fields={"id": str, "hangeul": str, "name_fr": str, "category": str, "imageUrl": str, "audioUrl": str},
+    required=("id", "hangeul"),
+    index_fields=("category",),
+)
+POEM_PUZZLE_SCHEMA = ContentSchema(
+    "poemPuzzles", id_field="id",
+    fields={"id": str, "title": str, "author": str, "text": list, "solutions": dict, "choices": list,
+            "reward": dict, "max_score": int},
+    required=("id", "text", "solutions"),
+)
+COLOR_DEFINITION_SCHEMA = ContentSchema(
+    "colorDefinitions", id_field="colorId",
+    fields={"colorId": str, "hangeul": str, "hexCode": str},
+    required=("colorId", "hangeul"),
+)
+
+# Definition files shipped by the content team, relative to the content source directory
+CONTENT_FILES = {
+    "foodItemDefinitions.json": FOOD_ITEM_DEFINITION_SCHEMA,
+    "syllablePuzzles.json": SYLLABLE_PUZZLE_SCHEMA,
+    "spellDefinitions.json": SPELL_DEFINITION_SCHEMA,
+    "questDefinitions.json": QUEST_DEFINITION_SCHEMA,
+}
+
+
+def iter_json_array(source, read_size=READ_SIZE):
+    """
+    Yields the elements of a top-level JSON array one by one.
+
+    Args:
+        source: A path or a text file object.
+        read_size (int): Characters read at a time; memory use is bounded by the largest record.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as file:
+            yield from iter_json_array(file, read_size)
+        return
+
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = source.read(read_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def next_token():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer) or eof:
+                return buffer[position] if position < len(buffer) else ""
+            fill()
+
+    if next_token() != "[":
+        raise ContentValidationError("Expected a JSON array of records.")
+    position += 1
+    if next_token() == "]":
+        return
+
+    while True:
+        token = next_token()
+        if token not in '{["' and not eof and _SCALAR_END.search(buffer, position) is None:
+            fill() # A number or literal may continue in the next chunk
+            continue
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        position = end
+        yield element
+
+        separator = next_token()
+        position += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ContentValidationError(f"Expected ',' or ']' between records, got {separator!r}.")
+
+
+def _index_key(value):
+    """Index values are stored by their compact JSON text, so 2 and "2" stay distinct."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _pad(file):
+    padding = -file.tell() % _ALIGNMENT
+    if padding:
+        file.write(b"\0" * padding)
+
+
+def _write_section(file, sections, name, payload):
+    _pad(file)
+    sections[name] = [file.tell(), len(payload)]
+    file.write(payload)
+
+
+def write_snapshot(records, schema, path):
+    """
+    Validates `records` (any iterable, consumed once) and writes them as a snapshot at `path`.
+
+    Layout: magic, the records as compact JSON blobs, then the offset/id/posting tables as
+    integer arrays in native byte order (little-endian wherever we deploy), a JSON footer describing them, and a fixed-size trailer
+    (footer offset + magic). Records are written as they stream in; only the ids and the
+    index postings are held in memory. The file is replaced atomically.
+
+    Returns:
+        int: The number of records written.
+    """
+    temporary_path = f"{path}.tmp"
+    record_offsets = array("Q")
+    ids = {}
+    postings = {field_name: {} for field_name in schema.index_fields}
+
+    try:
+        with open(temporary_path, "wb") as file:
+            file.write(SNAPSHOT_MAGIC)
+            records_start = file.tell()
+            for position, record in enumerate(records):
+                schema.validate(record, position)
+                record_id = record.get(schema.id_field)
+                if record_id is not None:
+                    if record_id in ids:
+                        raise ContentValidationError(
+                            f"{schema.collection}[{position}]: duplicate {schema.id_field} {record_id!r}.")
+                    ids[record_id] = position
+                for field_name, index in postings.items():
+                    value = record.get(field_name)
+                    if value is not None:
+                        index.setdefault(_index_key(value), array("I")).append(position)
+                record_offsets.append(file.tell() - records_start)
+                file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            record_offsets.append(file.tell() - records_start)
+
+            sections = {"records": [records_start, record_offsets[-1]]}
+            _write_section(file, sections, "recordOffsets", record_offsets.tobytes())
+
+            sorted_ids = sorted(ids, key=str)
+            id_blob = bytearray()
+            id_offsets = array("Q", [0])
+            for record_id in sorted_ids:
+                id_blob += str(record_id).encode("utf-8")
+                id_offsets.append(len(id_blob))
+            _write_section(file, sections, "idKeys", bytes(id_blob))
+            _write_section(file, sections, "idKeyOffsets", id_offsets.tobytes())
+            _write_section(file, sections, "idRecords", array("I", (ids[record_id] for record_id in sorted_ids)).tobytes())
+
+            posting_table = array("I")
+            indexes = {}
+            for field_name, index in postings.items():
+                indexes[field_name] = {}
+                for key, positions in index.items():
+                    indexes[field_name][key] = [len(posting_table), len(positions)]
+                    posting_table.extend(positions)
+            _write_section(file, sections, "postings", posting_table.tobytes())
+
+            _pad(file)
+            footer_offset = file.tell()
+            file.write(json.dumps({
+                "collection": schema.collection,
+                "idField": schema.id_field,
+                "count": len(record_offsets) - 1,
+                "sections": sections,
+                "indexes": indexes,
+            }, ensure_ascii=False).encode("utf-8"))
+            file.write(_TRAILER.pack(footer_offset, SNAPSHOT_MAGIC))
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError): # open() itself failed: report its error, not this one
+            os.remove(temporary_path)
+        raise
+
+    os.replace(temporary_path, path)
+    return len(record_offsets) - 1
+
+
+class LazyRecord(Mapping):
+    """
+    Read-only record backed by its bytes in the mapped snapshot.
+
+    Nothing is decoded until a field is read, so sampling a few records out of a large
+    collection only ever decodes those few.
+    """
+    __slots__ = ("_blob", "_data")
+
+    def __init__(self, blob):
+        self._blob = blob
+        self._data = None
+
+    def _decoded(self):
+        data = self._data
+        if data is None:
+            data = self._data = json.loads(bytes(self._blob))
+        return data
+
+    def __getitem__(self, key):
+        return self._decoded()[key]
+
+    def __iter__(self):
+        return iter(self._decoded())
+
+    def __len__(self):
+        return len(self._decoded())
+
+    def __repr__(self):
+        return f"LazyRecord({self._decoded()!r})"
+
+
+class ContentSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot written by write_snapshot.
+
+    Opening it only parses the small footer; records come back as LazyRecords, decoded
+    when first read, and id lookups binary-search the mapped id table. Same read interface as
+    definition_catalog.CatalogSnapshot (len, iteration, indexing, get, items_where, values_of).
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if len(view) < len(SNAPSHOT_MAGIC) + _TRAILER.size or view[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a content snapshot.")
+        footer_offset, magic = _TRAILER.unpack_from(view, len(view) - _TRAILER.size)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is truncated.")
+        footer = json.loads(bytes(view[footer_offset:len(view) - _TRAILER.size]))
+
+        def section(name, typecode=None):
+            offset, length = footer["sections"][name]
+            data = view[offset:offset + length]
+            return data.cast(typecode) if typecode else data
+
+        self.collection = footer["collection"]
+        self.id_field = footer["idField"]
+        self._count = footer["count"]
+        self._indexes = footer["indexes"]
+        self._records = section("records")
+        self._record_offsets = section("recordOffsets", "Q")
+        self._id_keys = section("idKeys")
+        self._id_key_offsets = section("idKeyOffsets", "Q")
+        self._id_records = section("idRecords", "I")
+        self._postings = section("postings", "I")
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self._record(position)
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("snapshot index out of range")
+        return self._record(position)
+
+    def _record(self, position):
+        offsets = self._record_offsets
+        return LazyRecord(self._records[offsets[position]:offsets[position + 1]])
+
+    def _id_key(self, rank):
+        offsets = self._id_key_offsets
+        return bytes(self._id_keys[offsets[rank]:offsets[rank + 1]]).decode("utf-8")
+
+    def get(self, item_id):
+        """Returns the read-only record with the given id, or None."""
+        key = str(item_id)
+        ranks = _LazyKeys(self)
+        rank = bisect_left(ranks, key)
+        if rank < len(ranks) and ranks[rank] == key:
+            return self._record(self._id_records[rank])
+        return None
+
+    def items_where(self, field_name, value):
+        """Returns the tuple of records whose indexed `field_name` equals `value`."""
+        start, count = self._indexes[field_name].get(_index_key(value), (0, 0))
+        return tuple(self._record(position) for position in self._postings[start:start + count])
+
+    def values_of(self, field_name):
+        """Returns the distinct values seen for an indexed field."""
+        return tuple(json.loads(key) for key in self._indexes[field_name])
+
+    def close(self):
+        for name in ("_records", "_record_offsets", "_id_keys", "_id_key_offsets", "_id_records", "_postings"):
+            getattr(self, name).release()
+        self._mmap.close()
+
+
+class _LazyKeys:
+    """Sequence view of a snapshot's sorted ids, decoding only the keys bisect probes."""
+    __slots__ = ("_snapshot",)
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot._id_records)
+
+    def __getitem__(self, rank):
+        return self._snapshot._id_key(rank)
+
+
+def compile_content_pack(source_dir, output_dir, content_files=CONTENT_FILES):
+    """
+    Builds one snapshot per definition file found in `source_dir`.
+
+    Returns:
+        dict: {collection: number of records} for the snapshots written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = {}
+    for file_name, schema in content_files.items():
+        source_path = os.path.join(source_dir, file_name)
+        if not os.path.exists(source_path):
+            continue
+        output_path = os.path.join(output_dir, schema.collection + SNAPSHOT_SUFFIX)
+        written[schema.collection] = write_snapshot(iter_json_array(source_path), schema, output_path)
+    return written
+
+
+def export_mock_collections(output_dir):
+    """
+    Writes snapshots of the in-module mock collections (market items, food items, poems,
+    colors), the collections definition_catalog.content_catalog serves from snapshots.
+
+    Returns:
+        dict: {collection: number of records} for the snapshots written.
+    """
+    from firestore_mocks import MARKET_ITEM_DEFINITIONS_MOCK
+    from food_mocks import MOCK_FOOD_ITEMS
+    from poem_mocks import MOCK_POEM_PUZZLES
+    from src.game_logic.color_chaos import COLOR_DEFINITIONS
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = {}
+    for schema, records in (
+        (MARKET_ITEM_SCHEMA, MARKET_ITEM_DEFINITIONS_MOCK),
+        (FOOD_ITEM_SCHEMA, MOCK_FOOD_ITEMS),
+        (POEM_PUZZLE_SCHEMA, MOCK_POEM_PUZZLES.values()),
+        (COLOR_DEFINITION_SCHEMA, COLOR_DEFINITIONS),
+    ):
+        output_path = os.path.join(output_dir, schema.collection + SNAPSHOT_SUFFIX)
+        written[schema.collection] = write_snapshot(records, schema, output_path)
+    return written
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Builds content snapshots from definition JSON files.")
+    parser.add_argument("source_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--with-mocks", action="store_true", help="Also export the in-module mock collections.")
+    args = parser.parse_args()
+
+    written = compile_content_pack(args.source_dir, args.output_dir)
+    if args.with_mocks:
+        written.update(export_mock_collections(args.output_dir))
+    for collection, count in written.items():
+        print(f"{collection}: {count} records")
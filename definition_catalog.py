@@ -0,0 +1,247 @@
+# Shared in-memory catalog for definition collections (market items, food items, poems, colors)
+import asyncio
+import os
+import threading
+import time
+import weakref
+from types import MappingProxyType
+from content_pipeline import SNAPSHOT_SUFFIX, ContentSnapshot
+
+DEFAULT_TTL_SECONDS = 300 # Definitions only change on content deploys, 5 minutes is plenty
+CONTENT_SNAPSHOT_DIR_ENV = "KP_CONTENT_SNAPSHOT_DIR"
+
+_registered_catalogs = []
+_derived_indexes = [] # WeakMethods building an index derived from a catalog snapshot
+
+
+class CatalogSnapshot:
+    """
+    Immutable, indexed view over one load of a definition collection.
+
+    Records are exposed as read-only mappings (shallow: nested lists are shared),
+    so callers must copy the few records they hand out instead of the whole collection.
+    """
+    __slots__ = ("items", "_by_id", "_by_field")
+
+    def __init__(self, records, id_field="id", index_fields=()):
+        items = tuple(MappingProxyType(dict(record)) for record in records)
+        by_id = {}
+        by_field = {field: {} for field in index_fields}
+
+        for item in items:
+            item_id = item.get(id_field)
+            if item_id is not None:
+                by_id[item_id] = item
+            for field, index in by_field.items():
+                value = item.get(field)
+                if value is not None:
+                    index.setdefault(value, []).append(item)
+
+        self.items = items
+        self._by_id = by_id
+        self._by_field = {
+            field: {value: tuple(matching) for value, matching in index.items()}
+            for field, index in by_field.items()
+        }
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, position):
+        return self.items[position]
+
+    def get(self, item_id):
+        """Returns the read-only record with the given id, or None."""
+        return self._by_id.get(item_id)
+
+    def items_where(self, field, value):
+        """Returns the tuple of records whose indexed `field` equals `value`."""
+        return self._by_field[field].get(value, ())
+
+    def values_of(self, field):
+        """Returns the distinct values seen for an indexed field (e.g. all categories)."""
+        return tuple(self._by_field[field])
+
+
+class DefinitionCatalog:
+    """
+    Loads a definition collection once and serves indexed snapshots of it.
+
+    The snapshot is rebuilt when:
+      - `ttl_seconds` have elapsed since the last load, unless `version()` still returns
+        the token seen at load time (the same snapshot object is then kept for another
+        TTL, so caches keyed by snapshot identity are not rebuilt),
+      - `version()` (a cheap change token, e.g. a collection update counter) differs
+        from the value seen at load time,
+      - `invalidate()` has been called (e.g. from a content-deploy hook).
+    """
+
+    def __init__(self, loader, id_field="id", index_fields=(), ttl_seconds=DEFAULT_TTL_SECONDS,
+                 version=None, clock=time.monotonic):
+        self._loader = loader
+        self._id_field = id_field
+        self._index_fields = tuple(index_fields)
+        self._ttl_seconds = ttl_seconds
+        self._version = version
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._loaded_version = None
+        self._expires_at = 0.0
+        _registered_catalogs.append(self)
+
+    def _is_fresh(self, snapshot):
+        if snapshot is None or self._clock() >= self._expires_at:
+            return False
+        return self._version is None or self._version() == self._loaded_version
+
+    def snapshot(self):
+        """Returns the current CatalogSnapshot, reloading it first if it is stale."""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot): # Another thread reloaded while we waited
+                return snapshot
+            loaded_version = self._version() if self._version is not None else None
+            if snapshot is not None and self._version is not None and loaded_version == self._loaded_version:
+                # Only the TTL ran out: the collection did not change, keep the snapshot
+                self._expires_at = self._clock() + self._ttl_seconds
+                return snapshot
+            snapshot = CatalogSnapshot(self._loader(), self._id_field, self._index_fields)
+            self._loaded_version = loaded_version
+            self._expires_at = self._clock() + self._ttl_seconds
+            self._snapshot = snapshot
+            return snapshot
+
+    def peek(self):
+        """Returns the cached snapshot if it is still fresh, None if snapshot() would reload it."""
+        snapshot = self._snapshot
+        return snapshot if self._is_fresh(snapshot) else None
+
+    def invalidate(self):
+        """Drops the cached snapshot; the next access reloads the collection."""
+        with self._lock:
+            self._snapshot = None
+
+
+def static_version():
+    """
+    Version token of collections that only change through invalidate() (e.g. the in-module
+    mocks, edited by tests that then call invalidate_all_catalogs()): TTL expiries never
+    rebuild their snapshot.
+    """
+    return 0
+
+
+class MappedCatalog:
+    """
+    Serves a memory-mapped ContentSnapshot (see content_pipeline) instead of an in-memory load.
+
+    The file is mapped once, at construction, so a pre-fork worker pool shares its pages.
+    It is remapped when the file has been replaced (content deploys swap it atomically),
+    checked at most every `ttl_seconds` or after `invalidate()`.
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        self._path = path
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._file_id = None
+        self._snapshot = None
+        self._checked_at = None
+        self._open()
+        _registered_catalogs.append(self)
+
+    def _open(self):
+        stat = os.stat(self._path)
+        file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_id != self._file_id:
+            # The previous mapping is released once the last reader drops it
+            self._snapshot = ContentSnapshot(self._path)
+            self._file_id = file_id
+        self._checked_at = self._clock()
+
+    def snapshot(self):
+        """Returns the mapped snapshot, remapping it first if the file was replaced."""
+        checked_at = self._checked_at
+        if checked_at is not None and self._clock() - checked_at < self._ttl_seconds:
+            return self._snapshot
+        with self._lock:
+            if self._checked_at is None or self._clock() - self._checked_at >= self._ttl_seconds:
+                self._open()
+            return self._snapshot
+
+    def peek(self):
+        """Returns the mapped snapshot if no file check is due, None otherwise."""
+        checked_at = self._checked_at
+        if checked_at is not None and self._clock() - checked_at < self._ttl_seconds:
+            return self._snapshot
+        return None
+
+    def invalidate(self):
+        """Makes the next access check whether the file was replaced."""
+        with self._lock:
+            self._checked_at = None
+
+
+def content_catalog(collection, fallback):
+    """
+    Returns a MappedCatalog over `<collection>.kpsnap` when the KP_CONTENT_SNAPSHOT_DIR
+    environment variable points to a directory that has it, otherwise `fallback`.
+    """
+    directory = os.environ.get(CONTENT_SNAPSHOT_DIR_ENV)
+    if directory:
+        path = os.path.join(directory, collection + SNAPSHOT_SUFFIX)
+        if os.path.exists(path):
+            return MappedCatalog(path)
+    return fallback
+
+
+async def snapshot_async(catalog):
+    """
+    Awaitable catalog.snapshot(): served directly while fresh, reloaded in a worker thread
+    otherwise, so a (network) reload never blocks the event loop.
+    """
+    snapshot = catalog.peek()
+    if snapshot is not None:
+        return snapshot
+    return await asyncio.to_thread(catalog.snapshot)
+
+
+def register_derived_index(build):
+    """
+    Registers the bound method that builds (or returns the already built) index an object
+    derives from a catalog's current snapshot, for build_derived_indexes(). The object is
+    only weakly referenced.
+    """
+    _derived_indexes.append(weakref.WeakMethod(build))
+
+
+def build_derived_indexes():
+    """
+    Loads the catalogs and builds every registered derived index for their current snapshots.
+
+    The derived indexes (distractor tables, adaptive positions, poem solutions and payloads)
+    are linear in the catalog size and, over a MappedCatalog, decode every record once. A
+    pre-fork server calls this before forking so its workers inherit the built indexes
+    instead of each decoding the whole snapshot on its first request. They are rebuilt lazily,
+    per process, after a content deploy.
+    """
+    _derived_indexes[:] = [reference for reference in _derived_indexes if reference() is not None]
+    for reference in list(_derived_indexes):
+        build = reference()
+        if build is not None:
+            build()
+
+
+def invalidate_all_catalogs():
+    """Invalidation hook for content deploys: every registered catalog reloads on next access."""
+    for catalog in _registered_catalogs:
+        catalog.invalidate()
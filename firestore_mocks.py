@@ -1,3 +1,6 @@
+from definition_catalog import DefinitionCatalog, content_catalog, static_version
+from instrumentation import instrumented
+
 # Mock data for marketItemDefinitions collection
 MARKET_ITEM_DEFINITIONS_MOCK = [
     {"id": "item_1", "name_kr": "사과", "name_fr": "Pomme", "imageUrl": "images/apple.png"},
@@ -48,6 +51,7 @@ class FirestoreDBMock:
 # Global instance of the mock DB, similar to how firebase_admin.firestore.client() might be used
 db_mock = FirestoreDBMock()
 
+@instrumented("data.get_market_item_definitions")
 def get_market_item_definitions():
     """
     Simulates fetching all items from the marketItemDefinitions collection in Firestore.
@@ -55,6 +59,15 @@ def get_market_item_definitions():
     items_collection = db_mock.collection("marketItemDefinitions").stream()
     return [item.to_dict() for item in items_collection]
 
+# Cached, indexed view of marketItemDefinitions shared by all requests.
+# The mock list only changes in tests, which call invalidate_all_catalogs() after editing it.
+# With KP_CONTENT_SNAPSHOT_DIR set, the mapped marketItemDefinitions snapshot is used instead.
+market_item_catalog = content_catalog("marketItemDefinitions", DefinitionCatalog(
+    get_market_item_definitions,
+    index_fields=("category",),
+    version=static_version
+))
+
 if __name__ == '__main__':
     # Example usage:
     all_items = get_market_item_definitions()
@@ -0,0 +1,157 @@
+# Precomputed "hard" distractor candidates for the Food Feast minigame
+import threading
+from definition_catalog import register_derived_index
+from food_mocks import food_item_catalog
+
+HANGEUL_SYLLABLES = range(0xAC00, 0xD7A4)
+EXHAUSTIVE_CANDIDATES = 256 # Candidate lists up to this size are filtered whole; larger ones are sampled
+REJECTION_ATTEMPTS_PER_DRAW = 8 # Random picks tried per missing distractor before falling back to the next tier
+
+
+def hangeul_syllables(text):
+    """Returns the set of precomposed Hangeul syllables in `text` (e.g. "김밥" -> {"김", "밥"})."""
+    return {char for char in text or "" if ord(char) in HANGEUL_SYLLABLES}
+
+
+class _Tables:
+    """
+    Shared position lists of one catalog snapshot, linear in its size: one list per
+    category, per syllable and per (category, syllable) pair, plus each item's category
+    and syllables. Nothing is stored per pair of items.
+    """
+    __slots__ = ("snapshot", "categories", "syllables", "by_category", "by_syllable", "by_category_syllable")
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.categories, self.syllables = [], []
+        self.by_category, self.by_syllable, self.by_category_syllable = {}, {}, {}
+        for position, item in enumerate(snapshot):
+            category = item.get("category")
+            syllables = frozenset(hangeul_syllables(item.get("hangeul")))
+            self.categories.append(category)
+            self.syllables.append(syllables)
+            if category is not None:
+                self.by_category.setdefault(category, []).append(position)
+            for syllable in syllables:
+                self.by_syllable.setdefault(syllable, []).append(position)
+                if category is not None:
+                    self.by_category_syllable.setdefault((category, syllable), []).append(position)
+
+
+def _draw(lists, count, taken, rng, accept=None):
+    """
+    Draws up to `count` positions from the concatenation of `lists`, skipping the ones in
+    `taken` (which the drawn positions are added to) and the ones `accept` rejects, if given.
+
+    Short lists are filtered whole; long ones are sampled by rejection, so the cost depends
+    on `count`, not on the size of a category.
+    """
+    total = sum(len(positions) for positions in lists)
+    if not count or not total:
+        return []
+    if total <= EXHAUSTIVE_CANDIDATES:
+        candidates = [position for positions in lists for position in positions]
+        candidates = [position for position in dict.fromkeys(candidates) if position not in taken and (accept is None or accept(position))]
+        drawn = rng.sample(candidates, min(count, len(candidates)))
+        taken.update(drawn)
+        return drawn
+
+    drawn = []
+    for _ in range(REJECTION_ATTEMPTS_PER_DRAW * count):
+        index = rng.randrange(total)
+        for positions in lists:
+            if index < len(positions):
+                position = positions[index]
+                break
+            index -= len(positions)
+        if position not in taken and (accept is None or accept(position)):
+            taken.add(position)
+            drawn.append(position)
+            if len(drawn) == count:
+                break
+    return drawn
+
+
+class FoodDistractorIndex:
+    """
+    Hard distractor candidates of every food item, indexed once per catalog snapshot
+    (the per-category positions also serve whole-game sessions).
+
+    The index holds position lists per category and per syllable, shared by all the items;
+    drawing k hard distractors samples from the lists of the correct item in O(k) instead
+    of filtering the whole catalog for every question.
+    """
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self._lock = threading.Lock()
+        self._compiled = None # _Tables of the last snapshot
+        register_derived_index(self._tables)
+
+    def _tables(self):
+        snapshot = self._catalog.snapshot()
+        tables = self._compiled
+        if tables is not None and tables.snapshot is snapshot:
+            return tables
+        with self._lock: # The first hard questions after a reload wait for one build instead of each building
+            tables = self._compiled
+            if tables is None or tables.snapshot is not snapshot:
+                tables = self._compiled = _Tables(snapshot)
+            return tables
+
+    def category_positions(self):
+        """Returns (snapshot, positions of the items of each category) for the current snapshot, without copying."""
+        tables = self._tables()
+        return tables.snapshot, tuple(tables.by_category.values())
+
+    def hard_round(self, num_incorrect, rng, correct_position=None, snapshot=None):
+        """
+        Draws one correct item and `num_incorrect` distractors, strongest candidates first:
+        same category with a syllable in common, then either of the two, then any item.
+
+        `correct_position` fixes the correct item (it is drawn otherwise), as a position in
+        `snapshot`: the one category_positions() returned, or by default the current one.
+
+        Returns:
+            tuple: (correct_item, display_items), like round_sampler.sample_round.
+        Raises:
+            ValueError: If the catalog holds fewer than 1 + num_incorrect items.
+        """
+        tables = self._tables()
+        if snapshot is not None and tables.snapshot is not snapshot: # The catalog reloaded meanwhile
+            tables = _Tables(snapshot)
+        items = tables.snapshot
+        if len(items) < 1 + num_incorrect:
+            raise ValueError(f"Cannot draw {1 + num_incorrect} distinct items from {len(items)}.")
+
+        if correct_position is None:
+            correct_position = rng.randrange(len(items))
+        category = tables.categories[correct_position]
+        syllables = tables.syllables[correct_position]
+        categories, syllables_of = tables.categories, tables.syllables
+
+        def weak(position): # Same category or a syllable in common, but not both
+            same_category = category is not None and categories[position] == category
+            return same_category == syllables_of[position].isdisjoint(syllables)
+
+        chosen = [correct_position]
+        taken = {correct_position}
+        strong_lists = [tables.by_category_syllable[category, syllable] for syllable in syllables] if category is not None else []
+        chosen += _draw(strong_lists, num_incorrect, taken, rng)
+        weak_lists = [tables.by_syllable[syllable] for syllable in syllables]
+        if category is not None:
+            weak_lists.append(tables.by_category[category])
+        chosen += _draw(weak_lists, 1 + num_incorrect - len(chosen), taken, rng, weak)
+        while len(chosen) < 1 + num_incorrect: # Not enough look-alikes: fill with any other items
+            position = rng.randrange(len(items))
+            if position not in taken:
+                taken.add(position)
+                chosen.append(position)
+
+        display_items = [items[position] for position in chosen]
+        correct_item = display_items[0]
+        rng.shuffle(display_items)
+        return correct_item, display_items
+
+
+food_distractors = FoodDistractorIndex(food_item_catalog)
@@ -1,16 +1,43 @@
 # Cloud Functions for the Festin des Mots (Food Feast) Minigame
-import random
-from food_mocks import get_all_food_items
+from food_mocks import food_item_catalog
+from food_distractors import food_distractors
+from achievement_engine import minigame_achievements
+from adaptive_selector import AdaptiveSelector
+from instrumentation import instrumented, phase
+from models.game_results import FoodGameResults
+from models.player_profile import PlayerProfile
+from profile_delta import ProfileDelta
+from rng_service import request_rng
+from round_sampler import sample_balanced, sample_round
 
 MIN_OPTIONS = 3 # Minimum number of options for a question (1 correct + 2 incorrect)
 MAX_OPTIONS = 4 # Maximum number of options for a question (1 correct + 3 incorrect)
-
-def get_food_game_data(options_input):
+MAX_SESSION_QUESTIONS = 50 # Upper bound for a whole-game request ({"questions": N})
+# Item field shown as the question in each mode; the answer is always the Hangeul
+PROMPT_FIELDS = {"recognition": "imageUrl", "listening": "audioUrl", "reverse": "name_fr"}
+DIFFICULTIES = ("normal", "hard")
+# Per-player answer statistics steering the correct item of "normal" rounds
+food_selector = AdaptiveSelector(food_item_catalog)
+
+@instrumented("food_feast.get_game_data")
+def get_food_game_data(options_input, rng=None):
     """
     Generates game data for the Food Feast minigame based on the requested mode.
 
     Args:
         options_input (dict): Contains options like mode. E.g., {"mode": "recognition"}
+                              - "mode": "recognition" (image), "listening" (audio) or "reverse" (French name);
+                                the player always answers with the Hangeul.
+                              - "difficulty": "normal" (default) or "hard", where distractors share the
+                                category and/or a syllable with the answer.
+                              - "questions": N generates a whole N-question game at once, at the
+                                requested difficulty (see generate_food_session).
+                              - "gameId" and "round": seed the round from them (see rng_service),
+                                so the same game round always regenerates the same questions.
+                              - "playerId": in "normal" rounds, the correct item leans toward the
+                                ones this player misses or answers slowly (see food_selector).
+        rng (random.Random, optional): The request's random generator. Pass a seeded one
+                                       (see rng_service.round_rng) to reproduce a round.
 
     Returns:
         dict: Game data structured for the client.
@@ -20,57 +47,127 @@ def get_food_game_data(options_input):
                   "options": [{"hangeul": "...", "id": "..."}, ...],
                   "correct_answer_id": "..."
               }
+              The other modes send "audioUrl" or "name_fr" in the question instead of "imageUrl".
               Returns an error structure or raises an error if data cannot be generated.
     Raises:
         ValueError: If not enough unique food items are available for the game mode.
     """
     mode = options_input.get("mode")
+    rng = request_rng(rng, options_input, "food_feast")
 
-    if mode == "recognition":
-        all_items = get_all_food_items()
-
-        num_options_to_generate = random.randint(MIN_OPTIONS, MAX_OPTIONS)
+    prompt_field = PROMPT_FIELDS.get(mode)
+    if prompt_field is None:
+        # Placeholder for other modes or error handling
+        return {"error": f"Mode '{mode}' not implemented."}
 
-        if len(all_items) < num_options_to_generate:
-            raise ValueError(
-                f"Not enough unique food items ({len(all_items)}) to generate a recognition game "
-                f"with {num_options_to_generate} options."
-            )
+    difficulty = options_input.get("difficulty", "normal")
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"'difficulty' must be one of {', '.join(DIFFICULTIES)}.")
+
+    if "questions" in options_input:
+        return generate_food_session(options_input["questions"], rng, mode, difficulty)
+
+    with phase("food_feast.catalog_fetch"):
+        all_items = food_item_catalog.snapshot()
+
+    num_options_to_generate = rng.randint(MIN_OPTIONS, MAX_OPTIONS)
+
+    if len(all_items) < num_options_to_generate:
+        raise ValueError(
+            f"Not enough unique food items ({len(all_items)}) to generate a {mode} game "
+            f"with {num_options_to_generate} options."
+        )
+
+    # Draw the correct item and its distractors without shuffling the whole catalog.
+    # The options come back already shuffled so the correct one isn't always first.
+    with phase("food_feast.sample"):
+        if difficulty == "hard":
+            correct_item, selected_items_for_game = food_distractors.hard_round(num_options_to_generate - 1, rng)
+        else:
+            correct_position = None
+            if options_input.get("playerId") is not None:
+                all_items, (correct_position,) = food_selector.sample_positions(options_input["playerId"], 1, rng)
+            correct_item, selected_items_for_game = sample_round(all_items, num_options_to_generate - 1, rng, correct_position)
+
+    # Prepare question (image, audio or French name of the correct item)
+    question_data = {
+        prompt_field: correct_item.get(prompt_field),
+        "id": correct_item.get("id") # Including ID might be useful for client-side logic/tracking
+    }
 
-        # Shuffle items and pick a set for question and options
-        random.shuffle(all_items)
+    # Prepare options (Hangeul names)
+    options_data = []
+    for item in selected_items_for_game:
+        options_data.append({
+            "hangeul": item.get("hangeul"),
+            "id": item.get("id") # Client can send back the ID of the chosen option
+        })
 
-        selected_items_for_game = all_items[:num_options_to_generate]
-        correct_item = selected_items_for_game[0] # First one after shuffle is the correct one
+    return {
+        "question": question_data,
+        "options": options_data,
+        "correct_answer_id": correct_item.get("id")
+        # Sending correct_answer_id for the client to know, though the TDD test
+        # was looking for correct_answer_kr. The test will need adjustment.
+        # Alternatively, the client can derive correct_answer_hangeul from correct_answer_id and options.
+    }
 
-        # Prepare question (image of the correct item)
-        question_data = {
-            "imageUrl": correct_item.get("imageUrl"),
-            "id": correct_item.get("id") # Including ID might be useful for client-side logic/tracking
-        }
+@instrumented("food_feast.generate_session")
+def generate_food_session(num_questions, rng, mode="recognition", difficulty="normal"):
+    """
+    Generates every question of a game in one call.
 
-        # Prepare options (Hangeul names)
-        # Options should also be shuffled so the correct one isn't always first in the options list
-        random.shuffle(selected_items_for_game) # Shuffle again for options order
+    Correct answers are distinct and spread evenly over the food categories (uncategorized
+    items only appear as distractors). Options reference items by id; the hangeul and the
+    prompt field of the mode (see PROMPT_FIELDS) of each item used are sent once, in a shared table.
 
-        options_data = []
-        for item in selected_items_for_game:
-            options_data.append({
-                "hangeul": item.get("hangeul"),
-                "id": item.get("id") # Client can send back the ID of the chosen option
-            })
+    Args:
+        num_questions (int): Number of questions, from 1 to MAX_SESSION_QUESTIONS.
+        rng (random.Random): The request's random generator.
+        mode (str): "recognition", "listening" or "reverse".
+        difficulty (str): "normal" or "hard" (distractors drawn by food_distractors, as in single rounds).
 
-        return {
-            "question": question_data,
-            "options": options_data,
-            "correct_answer_id": correct_item.get("id")
-            # Sending correct_answer_id for the client to know, though the TDD test
-            # was looking for correct_answer_kr. The test will need adjustment.
-            # Alternatively, the client can derive correct_answer_hangeul from correct_answer_id and options.
-        }
-    else:
-        # Placeholder for other modes or error handling
-        return {"error": f"Mode '{mode}' not implemented."}
+    Returns:
+        dict: {
+                  "mode": "recognition",
+                  "items": {"food_001": {"hangeul": "...", "imageUrl": "..."}, ...},
+                  "questions": [{"id": "<correct item, shown as an image>", "options": ["food_004", ...]}, ...]
+              }
+              (with "audioUrl" or "name_fr" instead of "imageUrl" in the other modes)
+    Raises:
+        ValueError: If num_questions is out of range or the catalog is too small for it.
+    """
+    if not isinstance(num_questions, int) or isinstance(num_questions, bool) \
+            or not 1 <= num_questions <= MAX_SESSION_QUESTIONS:
+        raise ValueError(f"'questions' must be an integer between 1 and {MAX_SESSION_QUESTIONS}.")
+
+    all_items, category_positions = food_distractors.category_positions()
+    if len(all_items) < MAX_OPTIONS:
+        raise ValueError(
+            f"Not enough unique food items ({len(all_items)}) to generate a game "
+            f"with {MAX_OPTIONS} options."
+        )
+
+    prompt_field = PROMPT_FIELDS[mode]
+    # Position lists cached per snapshot: no per-request grouping (nor record decoding on mapped catalogs)
+    correct_positions = sample_balanced(category_positions, num_questions, rng)
+
+    items_table = {}
+    questions = []
+    for correct_position in correct_positions:
+        num_incorrect = rng.randint(MIN_OPTIONS, MAX_OPTIONS) - 1
+        if difficulty == "hard":
+            correct_item, options = food_distractors.hard_round(num_incorrect, rng, correct_position, all_items)
+        else:
+            correct_item, options = sample_round(all_items, num_incorrect, rng, correct_position)
+
+        for item in options:
+            item_id = item.get("id")
+            if item_id not in items_table:
+                items_table[item_id] = {"hangeul": item.get("hangeul"), prompt_field: item.get(prompt_field)}
+        questions.append({"id": correct_item.get("id"), "options": [item.get("id") for item in options]})
+
+    return {"mode": mode, "items": items_table, "questions": questions}
 
 # Constants for submit_food_game_results, can be tuned or moved to a config
 MAX_SCORE_POINTS = 1000
@@ -79,7 +176,29 @@ MANA_CONVERSION_FACTOR = 10 # 10 score points = 1 Mana
 XP_CONVERSION_FACTOR = 5    # 5 score points = 1 XP (example)
 
 
-def submit_food_game_results(player_profile, game_results_input):
+def calculate_food_game_score(results):
+    """Returns the score of a game (FoodGameResults): accuracy points minus a time penalty, never negative."""
+    if results.total_questions == 0: # Avoid division by zero
+        calculated_score = 0
+    else:
+        base_score = (results.correct_answers / results.total_questions) * MAX_SCORE_POINTS
+        penalty = results.time_taken * TIME_PENALTY_PER_SECOND
+        calculated_score = base_score - penalty
+
+    return max(0, int(calculated_score)) # Ensure score is not negative and is an integer
+
+
+def compute_food_game_delta(results, calculated_score):
+    """Returns the ProfileDelta (Mana, XP, foodItemsIdentified) for a scored game."""
+    return ProfileDelta(
+        mana=calculated_score // MANA_CONVERSION_FACTOR,
+        xp=calculated_score // XP_CONVERSION_FACTOR,
+        stats={"foodItemsIdentified": results.correct_answers}
+    )
+
+
+@instrumented("food_feast.submit_results")
+def submit_food_game_results(player_profile, game_results_input, as_delta=False):
     """
     Calculates score, updates player Mana, XP, and stats based on game results.
 
@@ -88,40 +207,40 @@ def submit_food_game_results(player_profile, game_results_input):
                                Expected: {"mana": int, "xp": int, "stats": {"foodItemsIdentified": int}}
         game_results_input (dict): Results from the game.
                                    Expected: {"correctAnswers": int, "totalQuestions": int, "timeTaken": int}
+                                   Optional: "answers": [{"id", "correct", "timeTaken"}, ...] per question,
+                                   recorded in food_selector for the profile's "uid".
+        as_delta (bool): If True, the profile is left untouched and the changes are returned
+                         as a ProfileDelta under "delta" instead of "updated_profile".
 
     Returns:
         dict: {"score": calculated_score, "updated_profile": player_profile}
+              (or {"score": calculated_score, "delta": ProfileDelta} when as_delta is True)
     """
-    if not player_profile or not isinstance(player_profile.get("stats"), dict):
-        # Basic validation, can be expanded
+    # Validate once at the boundary, the reward code below works on the typed models
+    try:
+        profile = PlayerProfile.from_dict(player_profile, required=("stats",))
+    except (TypeError, ValueError):
         raise ValueError("Invalid player_profile structure.")
     if not game_results_input:
         raise ValueError("game_results_input is required.")
+    results = FoodGameResults.from_dict(game_results_input)
+    if profile.uid is not None and "answers" in game_results_input:
+        food_selector.record_answers(profile.uid, game_results_input["answers"])
 
-    correct_answers = game_results_input.get("correctAnswers", 0)
-    total_questions = game_results_input.get("totalQuestions", 0)
-    time_taken = game_results_input.get("timeTaken", 0)
+    with phase("food_feast.reward"):
+        calculated_score = calculate_food_game_score(results)
+        delta = compute_food_game_delta(results, calculated_score)
 
-    if total_questions == 0: # Avoid division by zero
-        calculated_score = 0
-    else:
-        base_score = (correct_answers / total_questions) * MAX_SCORE_POINTS
-        penalty = time_taken * TIME_PENALTY_PER_SECOND
-        calculated_score = base_score - penalty
-
-    calculated_score = max(0, int(calculated_score)) # Ensure score is not negative and is an integer
-
-    # Update player profile
-    player_profile["mana"] = player_profile.get("mana", 0) + (calculated_score // MANA_CONVERSION_FACTOR)
-    player_profile["xp"] = player_profile.get("xp", 0) + (calculated_score // XP_CONVERSION_FACTOR)
-
-    current_items_identified = player_profile["stats"].get("foodItemsIdentified", 0)
-    player_profile["stats"]["foodItemsIdentified"] = current_items_identified + correct_answers
-
-    # Placeholder for achievement checking logic
-    # check_food_feast_achievements(player_profile, game_results_input, calculated_score)
+    # Check achievements depending on the updated stats
+    with phase("food_feast.achievements"):
+        minigame_achievements.award(profile, delta)
 
+    if as_delta:
+        return {
+            "score": calculated_score,
+            "delta": delta
+        }
     return {
         "score": calculated_score,
-        "updated_profile": player_profile
+        "updated_profile": delta.apply_to(player_profile)
     }
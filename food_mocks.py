@@ -1,4 +1,6 @@
 # Mock data for foodItemDefinitions, simulating a Firestore collection
+from definition_catalog import DefinitionCatalog, content_catalog, static_version
+from instrumentation import instrumented
 
 MOCK_FOOD_ITEMS = [
     {
@@ -75,16 +77,31 @@ MOCK_FOOD_ITEMS = [
     }
 ]
 
+# Shared, indexed view of the food items (or their mapped snapshot, see content_catalog):
+# id and category lookups are O(1) and hand out read-only records, never copies.
+# Tests that edit MOCK_FOOD_ITEMS call invalidate_all_catalogs() so the catalog notices.
+food_item_catalog = content_catalog("foodItems", DefinitionCatalog(
+    lambda: MOCK_FOOD_ITEMS,
+    index_fields=("category",),
+    version=static_version
+))
+
+@instrumented("data.get_all_food_items")
 def get_all_food_items():
-    """Simulates fetching all food items from Firestore."""
-    return [item.copy() for item in MOCK_FOOD_ITEMS] # Return copies
+    """
+    Simulates fetching all food items from Firestore.
+    Returns the catalog's read-only sequence of items; copy an item with dict() to modify it.
+    """
+    return food_item_catalog.snapshot()
 
+@instrumented("data.get_food_item_by_id")
 def get_food_item_by_id(item_id):
-    """Simulates fetching a specific food item by its ID."""
-    for item in MOCK_FOOD_ITEMS:
-        if item["id"] == item_id:
-            return item.copy() # Return a copy
-    return None
+    """Simulates fetching a specific food item by its ID. Returns a read-only item, or None."""
+    return food_item_catalog.snapshot().get(item_id)
+
+def get_food_items_by_category(category):
+    """Returns the tuple of read-only items of a category (e.g. "plats", "boissons")."""
+    return food_item_catalog.snapshot().items_where("category", category)
 
 if __name__ == '__main__':
     print("Available food items (new structure):")
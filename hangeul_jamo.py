@@ -0,0 +1,167 @@
+# Hangeul syllable <-> jamo decomposition and bulk generation of syllable puzzles
+#
+# Precomposed syllables are laid out arithmetically from U+AC00:
+#   code = 0xAC00 + (initial * 21 + medial) * 28 + final
+# so decomposing is two divmods; everything a puzzle needs per syllable is tabulated once.
+import json
+
+SYLLABLE_BASE = 0xAC00
+INITIALS = tuple("ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ")
+MEDIALS = tuple("ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ")
+FINALS = ("",) + tuple("ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ") # "" = no final consonant
+SYLLABLE_COUNT = len(INITIALS) * len(MEDIALS) * len(FINALS) # 11172
+SYLLABLES = range(SYLLABLE_BASE, SYLLABLE_BASE + SYLLABLE_COUNT)
+
+# Puzzles ask for the basic letters: compound vowels and finals are given as their parts
+COMPOUND_PARTS = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+# Difficulty points added to 1 for what makes a syllable hard to read for a French speaker
+MAX_DIFFICULTY = 5
+TENSE_INITIAL_POINTS = 1 # ㄲ ㄸ ㅃ ㅆ ㅉ
+VOWEL_POINTS = {"ㅡ": 1, "ㅘ": 1, "ㅙ": 1, "ㅚ": 1, "ㅝ": 1, "ㅞ": 1, "ㅟ": 1, "ㅢ": 2}
+NEUTRALIZED_FINAL_POINTS = 1 # A final not pronounced like the letter (ㅅ -> t, ㅍ -> p, ...), or ㅇ (ng)
+COMPOUND_FINAL_POINTS = 2
+
+_INITIAL_INDEX = {jamo: index for index, jamo in enumerate(INITIALS)}
+_MEDIAL_INDEX = {jamo: index for index, jamo in enumerate(MEDIALS)}
+_FINAL_INDEX = {jamo: index for index, jamo in enumerate(FINALS)}
+
+
+def _final_points(final):
+    if final in "ㄱㄴㄷㄹㅁㅂ": # Also matches "" (no final)
+        return 0
+    return COMPOUND_FINAL_POINTS if final in COMPOUND_PARTS else NEUTRALIZED_FINAL_POINTS
+
+
+def _build_tables():
+    """Per syllable offset: (initial, medial, final), puzzle jamo tuple, type and difficulty."""
+    letters, puzzle_jamo, types, difficulties = [], [], [], []
+    for initial in INITIALS:
+        initial_points = TENSE_INITIAL_POINTS if initial in "ㄲㄸㅃㅆㅉ" else 0
+        for medial in MEDIALS:
+            vowel = COMPOUND_PARTS.get(medial, medial)
+            open_type = "CVV" if len(vowel) > 1 else "CV"
+            points = initial_points + VOWEL_POINTS.get(medial, 0)
+            for final in FINALS:
+                letters.append((initial, medial, final))
+                puzzle_jamo.append(tuple(initial + vowel + COMPOUND_PARTS.get(final, final)))
+                types.append("CVC" if final else open_type)
+                difficulties.append(min(MAX_DIFFICULTY, 1 + points + _final_points(final)))
+    return tuple(letters), tuple(puzzle_jamo), tuple(types), bytes(difficulties)
+
+
+_LETTERS, _PUZZLE_JAMO, _TYPES, _DIFFICULTIES = _build_tables()
+# str.translate table: syllable -> its letters, other characters are left as they are
+_DECOMPOSE_TEXT = {SYLLABLE_BASE + offset: "".join(letters) for offset, letters in enumerate(_LETTERS)}
+# Keys typed on a Korean (2-set) keyboard: compound letters are typed as their parts
+_KEYSTROKE_TEXT = {SYLLABLE_BASE + offset: "".join(jamo) for offset, jamo in enumerate(_PUZZLE_JAMO)}
+_KEYSTROKE_TEXT.update((ord(letter), parts) for letter, parts in COMPOUND_PARTS.items())
+
+
+def is_syllable(char):
+    """True for a single precomposed Hangeul syllable (가 .. 힣)."""
+    return len(char) == 1 and ord(char) in SYLLABLES
+
+
+def _offset(syllable):
+    if not isinstance(syllable, str) or not is_syllable(syllable):
+        raise ValueError(f"{syllable!r} is not a precomposed Hangeul syllable.")
+    return ord(syllable) - SYLLABLE_BASE
+
+
+def decompose(syllable):
+    """Returns the (initial, medial, final) letters of a syllable, final being "" if none ("각" -> ("ㄱ", "ㅏ", "ㄱ"))."""
+    return _LETTERS[_offset(syllable)]
+
+
+def compose(initial, medial, final=""):
+    """
+    Builds the syllable of the given letters (Hangeul compatibility jamo), e.g. ("ㅎ", "ㅏ", "ㄴ") -> "한".
+
+    Raises:
+        ValueError: If a letter cannot take that position in a syllable.
+    """
+    try:
+        initial_index = _INITIAL_INDEX[initial]
+        medial_index = _MEDIAL_INDEX[medial]
+        final_index = _FINAL_INDEX[final]
+    except KeyError as error:
+        raise ValueError(f"Cannot compose a syllable from {(initial, medial, final)!r}: bad letter {error}.")
+    return chr(SYLLABLE_BASE + (initial_index * len(MEDIALS) + medial_index) * len(FINALS) + final_index)
+
+
+def decompose_text(text):
+    """Replaces every syllable of `text` by its letters ("한글!" -> "ㅎㅏㄴㄱㅡㄹ!")."""
+    return text.translate(_DECOMPOSE_TEXT)
+
+
+def decompose_words(words):
+    """decompose_text over a whole word list, in one pass per word."""
+    table = _DECOMPOSE_TEXT
+    return [word.translate(table) for word in words]
+
+
+def keystroke_text(text):
+    """The keys typed to enter `text` on a Korean keyboard ("과일" -> "ㄱㅗㅏㅇㅣㄹ"), other characters as they are."""
+    return text.translate(_KEYSTROKE_TEXT)
+
+
+def syllable_puzzle(syllable):
+    """
+    Returns the syllablePuzzles record of a syllable:
+    {"syllable": "꽃", "jamo": ["ㄲ", "ㅗ", "ㅊ"], "difficulty": 3, "type": "CVC"}.
+
+    "jamo" lists the basic letters to assemble (compound vowels and finals split), "type" is
+    "CV", "CVV" (compound vowel) or "CVC" (with a final) and "difficulty" goes from 1 to MAX_DIFFICULTY.
+    """
+    offset = _offset(syllable)
+    return {
+        "syllable": syllable,
+        "jamo": list(_PUZZLE_JAMO[offset]),
+        "difficulty": _DIFFICULTIES[offset],
+        "type": _TYPES[offset]
+    }
+
+
+def generate_syllable_puzzles(words):
+    """
+    Returns one syllablePuzzles record per distinct syllable used in `words`, in order of
+    first appearance. Non-Hangeul characters are ignored.
+    """
+    base, puzzle_jamo, difficulties, types = SYLLABLE_BASE, _PUZZLE_JAMO, _DIFFICULTIES, _TYPES
+    records = []
+    for char in dict.fromkeys("".join(words)):
+        offset = ord(char) - base
+        if 0 <= offset < SYLLABLE_COUNT:
+            records.append({
+                "syllable": char,
+                "jamo": list(puzzle_jamo[offset]),
+                "difficulty": difficulties[offset],
+                "type": types[offset]
+            })
+    return records
+
+
+def write_syllable_puzzles(words, path):
+    """Writes the puzzles of `words` as a syllablePuzzles.json file (see content_pipeline). Returns the record count."""
+    records = generate_syllable_puzzles(words)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(records, file, ensure_ascii=False, indent=2)
+        file.write("\n")
+    return len(records)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generates syllablePuzzles.json from a word list (one word per line).")
+    parser.add_argument("word_list")
+    parser.add_argument("output", nargs="?", default="syllablePuzzles.json")
+    args = parser.parse_args()
+    with open(args.word_list, encoding="utf-8") as word_file:
+        count = write_syllable_puzzles(word_file.read().split(), args.output)
+    print(f"{count} syllable puzzles written to {args.output}")
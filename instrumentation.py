@@ -0,0 +1,214 @@
+# Timing and counter hooks for the minigame hot paths, off unless a sink is installed
+#
+#   instrumentation.set_sink(instrumentation.InMemorySink())
+#   ... serve requests ...
+#   instrumentation.get_sink().snapshot()
+#
+# Entry points are wrapped with @instrumented("namdaemun.get_game_data") and inner phases
+# with `with phase("namdaemun.catalog_fetch"):`. Without a sink both cost a single global
+# check: no clock read, no allocation.
+import contextlib
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the latency histogram buckets, from 10us to 10s
+DEFAULT_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+PROMETHEUS_PREFIX = "korean_party"
+
+_sink = None
+
+
+def set_sink(sink):
+    """Installs the sink every timing and counter goes to (None disables instrumentation). Returns the previous one."""
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+def get_sink():
+    return _sink
+
+
+def increment(name, amount=1):
+    """Adds to a counter (e.g. "food_feast.hard_rounds")."""
+    sink = _sink
+    if sink is not None:
+        sink.increment(name, amount)
+
+
+class _Phase:
+    __slots__ = ("_sink", "_name", "_started")
+
+    def __init__(self, sink, name):
+        self._sink = sink
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._sink.observe(self._name, time.perf_counter() - self._started)
+        if exc_type is not None:
+            self._sink.increment(f"{self._name}.errors")
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name):
+    """Context manager timing a block as `name` (and counting "<name>.errors" if it raises)."""
+    sink = _sink
+    return _NO_PHASE if sink is None else _Phase(sink, name)
+
+
+def instrumented(name):
+    """Decorator timing every call of a function as `name`, like phase()."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            sink = _sink
+            if sink is None:
+                return function(*args, **kwargs)
+            with _Phase(sink, name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class Histogram:
+    """Cumulative-ready latency histogram: a count per bucket, plus the total count and sum."""
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last one: above the largest bucket
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the given quantile (inf if above every bucket)."""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return 0.0
+
+
+class InMemorySink:
+    """Keeps a Histogram per timed name and a total per counter, in process memory."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self._buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """Returns {"timings": {name: {"count", "sumSeconds", "p50", "p99"}}, "counters": {name: total}}."""
+        with self._lock:
+            return {
+                "timings": {
+                    name: {"count": histogram.count, "sumSeconds": histogram.sum,
+                           "p50": histogram.quantile(0.5), "p99": histogram.quantile(0.99)}
+                    for name, histogram in self.histograms.items()
+                },
+                "counters": dict(self.counters)
+            }
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+class LogSink:
+    """Writes one log line per timing or counter increment (for local debugging, not for load)."""
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self._logger = logger or logging.getLogger("korean_party.instrumentation")
+        self._level = level
+
+    def observe(self, name, seconds):
+        self._logger.log(self._level, "timing %s %.3fms", name, seconds * 1000)
+
+    def increment(self, name, amount=1):
+        self._logger.log(self._level, "counter %s +%s", name, amount)
+
+
+def _metric_name(name):
+    return PROMETHEUS_PREFIX + "_" + "".join(char if char.isalnum() else "_" for char in name)
+
+
+class PrometheusTextSink(InMemorySink):
+    """
+    An InMemorySink that renders its metrics in the Prometheus text format, e.g. to a file
+    read by the node exporter's textfile collector. Call write() periodically.
+    """
+
+    def __init__(self, path, buckets=DEFAULT_BUCKETS):
+        super().__init__(buckets)
+        self.path = path
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                metric = _metric_name(name) + "_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.sum!r}")
+                lines.append(f"{metric}_count {histogram.count}")
+            for name, total in sorted(self.counters.items()):
+                metric = _metric_name(name) + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {total}")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Atomically replaces the file at `path` with the current metrics."""
+        temporary_path = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                file.write(self.render())
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError): # open() itself failed: report its error, not this one
+                os.remove(temporary_path)
+            raise
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,85 @@
+from dataclasses import dataclass, field
+
+
+def _int_field(data, key):
+    value = data.get(key, 0)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"'{key}' must be an integer.")
+    return value
+
+
+def _number_field(data, key):
+    """An int or a float (as the reward formulas of timeTaken and Color Chaos scores accept), never a bool."""
+    value = data.get(key, 0)
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise ValueError(f"'{key}' must be a number.")
+    return value
+
+
+def _require_dict(data):
+    if not isinstance(data, dict):
+        raise ValueError("results must be a dictionary.")
+
+
+@dataclass(slots=True, frozen=True)
+class NamdaemunResults:
+    """Results of a Namdaemun game: {"score": int, "itemsSold": int}."""
+    score: int = 0
+    items_sold: int = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        _require_dict(data)
+        return cls(_int_field(data, "score"), _int_field(data, "itemsSold"))
+
+    def to_dict(self):
+        return {"score": self.score, "itemsSold": self.items_sold}
+
+
+@dataclass(slots=True, frozen=True)
+class FoodGameResults:
+    """Results of a Festin des Mots game: {"correctAnswers": int, "totalQuestions": int, "timeTaken": int or float}."""
+    correct_answers: int = 0
+    total_questions: int = 0
+    time_taken: float = 0 # Seconds
+
+    @classmethod
+    def from_dict(cls, data):
+        _require_dict(data)
+        return cls(_int_field(data, "correctAnswers"), _int_field(data, "totalQuestions"), _number_field(data, "timeTaken"))
+
+    def to_dict(self):
+        return {"correctAnswers": self.correct_answers, "totalQuestions": self.total_questions, "timeTaken": self.time_taken}
+
+
+@dataclass(slots=True, frozen=True)
+class PoemResults:
+    """Results of a Poème Perdu game: {"poemId": str, "answers": {"blank_1": "word", ...}}."""
+    poem_id: str
+    answers: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data):
+        _require_dict(data)
+        poem_id, answers = data.get("poemId"), data.get("answers")
+        if not isinstance(poem_id, str) or not isinstance(answers, dict):
+            raise ValueError("expected 'poemId' (str) and 'answers' (dict).")
+        return cls(poem_id, answers)
+
+    def to_dict(self):
+        return {"poemId": self.poem_id, "answers": dict(self.answers)}
+
+
+@dataclass(slots=True, frozen=True)
+class ColorChaosResults:
+    """Results of a Color Chaos game: {"score": int or float, "highestCombo": int}."""
+    score: float = 0
+    highest_combo: int = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        _require_dict(data)
+        return cls(_number_field(data, "score"), _int_field(data, "highestCombo"))
+
+    def to_dict(self):
+        return {"score": self.score, "highestCombo": self.highest_combo}
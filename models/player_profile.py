@@ -0,0 +1,150 @@
+from dataclasses import dataclass, field
+from typing import Optional, TypedDict
+
+
+class PlayerStatsDocument(TypedDict, total=False):
+    """
+    Represents the `stats` map of a user document in Firestore (/users/{userId}).
+    """
+    itemsSoldAtMarket: int       # Namdaemun
+    foodItemsIdentified: int     # Festin des Mots
+    poemsCompleted: int          # Poème Perdu
+    colorsIdentified: int        # Color Chaos
+    colorChaosHighestCombo: int  # Color Chaos record (max-merged)
+
+
+class PlayerProfileDocument(TypedDict, total=False):
+    """
+    Represents the fields of a user document read and written by the minigame functions.
+    """
+    uid: str
+    mana: float              # Color Chaos rewards are fractional (score * 0.1)
+    xp: int
+    stats: PlayerStatsDocument
+    achievements: list       # Achievement names/ids, no duplicates
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# (attribute, document key) pairs, so the codec below is plain attribute access
+_STAT_FIELDS = (
+    ("items_sold_at_market", "itemsSoldAtMarket"),
+    ("food_items_identified", "foodItemsIdentified"),
+    ("poems_completed", "poemsCompleted"),
+    ("colors_identified", "colorsIdentified"),
+    ("color_chaos_highest_combo", "colorChaosHighestCombo"),
+)
+_STAT_ATTRIBUTES = {key: attribute for attribute, key in _STAT_FIELDS}
+_STAT_KEYS = frozenset(_STAT_ATTRIBUTES)
+_PROFILE_KEYS = frozenset(("uid", "mana", "xp", "stats", "achievements"))
+
+
+@dataclass(slots=True)
+class PlayerStats:
+    """Typed view of PlayerStatsDocument. None means the stat is absent from the document."""
+    items_sold_at_market: Optional[int] = None
+    food_items_identified: Optional[int] = None
+    poems_completed: Optional[int] = None
+    colors_identified: Optional[int] = None
+    color_chaos_highest_combo: Optional[int] = None
+    extra: dict = field(default_factory=dict) # Stats the minigames don't use, kept for round-trips
+
+    @classmethod
+    def from_dict(cls, data, required=()):
+        """
+        Decodes a stats map. Raises ValueError if a known stat is not an integer
+        or a stat listed in `required` is missing.
+        """
+        stats = cls(extra={key: value for key, value in data.items() if key not in _STAT_KEYS})
+        for attribute, key in _STAT_FIELDS:
+            value = data.get(key)
+            if value is None:
+                if key in required:
+                    raise ValueError(f"player_profile['stats'] must have '{key}' as an integer.")
+                continue
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError(f"player_profile['stats'] must have '{key}' as an integer.")
+            setattr(stats, attribute, value)
+        return stats
+
+    def get(self, key, default=None):
+        """Returns a stat by its document key (e.g. "itemsSoldAtMarket")."""
+        attribute = _STAT_ATTRIBUTES.get(key)
+        value = getattr(self, attribute) if attribute is not None else self.extra.get(key)
+        return default if value is None else value
+
+    def to_dict(self):
+        data = dict(self.extra)
+        for attribute, key in _STAT_FIELDS:
+            value = getattr(self, attribute)
+            if value is not None:
+                data[key] = value
+        return data
+
+
+@dataclass(slots=True)
+class PlayerProfile:
+    """Typed view of PlayerProfileDocument, decoded once at the function boundary."""
+    uid: Optional[str] = None
+    mana: Optional[float] = None
+    xp: Optional[int] = None
+    stats: Optional[PlayerStats] = None
+    achievements: frozenset = frozenset() # Serialized back as a sorted list
+    extra: dict = field(default_factory=dict) # Other document fields (displayName, ...), kept for round-trips
+
+    @classmethod
+    def from_dict(cls, data, required=(), required_stats=()):
+        """
+        Decodes and validates a profile dict.
+
+        Args:
+            data (dict): The profile document.
+            required (tuple): Top-level fields that must be present ("mana", "xp", "stats").
+            required_stats (tuple): Stats keys that must be present (implies "stats").
+
+        Raises:
+            TypeError: If `data` is not a dictionary.
+            ValueError: If a field has the wrong type or a required field is missing.
+        """
+        if not isinstance(data, dict):
+            raise TypeError("player_profile must be a dictionary.")
+
+        profile = cls(uid=data.get("uid"),
+                      extra={key: value for key, value in data.items() if key not in _PROFILE_KEYS})
+        for key in ("mana", "xp"):
+            value = data.get(key)
+            if value is None:
+                if key in required:
+                    raise ValueError(f"player_profile must have '{key}' as a number.")
+            elif not _is_number(value):
+                raise ValueError(f"player_profile must have '{key}' as a number.")
+        profile.mana = data.get("mana")
+        profile.xp = data.get("xp")
+
+        stats = data.get("stats")
+        if stats is not None and not isinstance(stats, dict):
+            raise ValueError("player_profile must have 'stats' as a dictionary.")
+        if stats is None and ("stats" in required or required_stats):
+            raise ValueError("player_profile must have 'stats' as a dictionary.")
+        if stats is not None:
+            profile.stats = PlayerStats.from_dict(stats, required_stats)
+
+        achievements = data.get("achievements")
+        if isinstance(achievements, list):
+            profile.achievements = frozenset(achievements)
+        return profile
+
+    def to_dict(self):
+        data = dict(self.extra)
+        if self.uid is not None:
+            data["uid"] = self.uid
+        if self.mana is not None:
+            data["mana"] = self.mana
+        if self.xp is not None:
+            data["xp"] = self.xp
+        if self.stats is not None:
+            data["stats"] = self.stats.to_dict()
+        data["achievements"] = sorted(self.achievements)
+        return data
@@ -1,6 +1,35 @@
 # Cloud Functions for the Namdaemun Minigame
+from achievement_engine import minigame_achievements
+from instrumentation import instrumented, phase
+from models.game_results import NamdaemunResults
+from models.player_profile import PlayerProfile
+from profile_delta import ProfileDelta
 
-def submit_namdaemun_results(player_profile, score, items_sold):
+SCORE_POINTS_PER_MANA = 20 # 20 score points = 1 Mana
+
+def compute_namdaemun_delta(profile, results):
+    """
+    Computes the rewards of a Namdaemun game.
+
+    Args:
+        profile (PlayerProfile): The player's decoded profile.
+        results (NamdaemunResults): The game results.
+
+    Returns:
+        ProfileDelta: Mana earned and items sold (achievements are awarded by the caller).
+    """
+    delta = ProfileDelta()
+
+    # 1. Calculate Mana earned
+    delta.mana = results.score // SCORE_POINTS_PER_MANA
+
+    # 2. Update itemsSoldAtMarket
+    delta.stats["itemsSoldAtMarket"] = results.items_sold
+
+    return delta
+
+@instrumented("namdaemun.submit_results")
+def submit_namdaemun_results(player_profile, score, items_sold, as_delta=False):
     """
     Calculates score, grants rewards, and updates player stats after a Namdaemun game.
 
@@ -9,47 +38,47 @@ def submit_namdaemun_results(player_profile, score, items_sold):
                                Expected structure: {"mana": int, "stats": {"itemsSoldAtMarket": int}, "achievements": list}
         score (int): The score obtained by the player in the minigame.
         items_sold (int): The number of items successfully sold by the player.
+        as_delta (bool): If True, the profile is left untouched and the changes are returned
+                         as a ProfileDelta instead.
 
     Returns:
-        dict: The updated player profile.
+        dict: The updated player profile (or a ProfileDelta when as_delta is True).
     """
-    if not isinstance(player_profile, dict):
-        raise TypeError("player_profile must be a dictionary.")
-    if "mana" not in player_profile or not isinstance(player_profile["mana"], int):
-        raise ValueError("player_profile must have 'mana' as an integer.")
-    if "stats" not in player_profile or not isinstance(player_profile["stats"], dict):
-        raise ValueError("player_profile must have 'stats' as a dictionary.")
-    if "itemsSoldAtMarket" not in player_profile["stats"] or not isinstance(player_profile["stats"]["itemsSoldAtMarket"], int):
-        raise ValueError("player_profile['stats'] must have 'itemsSoldAtMarket' as an integer.")
-    if "achievements" not in player_profile or not isinstance(player_profile["achievements"], list):
+    # Validate once at the boundary, the reward code below works on the typed models
+    profile = PlayerProfile.from_dict(player_profile, required=("mana",), required_stats=("itemsSoldAtMarket",))
+    if not as_delta and not isinstance(player_profile.get("achievements"), list):
         # Ensure achievements list exists, even if empty
         player_profile["achievements"] = []
 
+    with phase("namdaemun.reward"):
+        delta = compute_namdaemun_delta(profile, NamdaemunResults(score, items_sold))
+    # 3. Check achievements depending on the updated stats (e.g. ACH_FIRST_SALE)
+    with phase("namdaemun.achievements"):
+        minigame_achievements.award(profile, delta)
 
-    # 1. Calculate Mana earned
-    mana_earned = score // 20
-    player_profile["mana"] += mana_earned
-
-    # 2. Update itemsSoldAtMarket
-    # Check if it's the first sale by seeing if itemsSoldAtMarket was 0 before adding new sales
-    is_first_sale_session = (player_profile["stats"]["itemsSoldAtMarket"] == 0 and items_sold > 0)
-
-    player_profile["stats"]["itemsSoldAtMarket"] += items_sold
-
-    # 3. Check for ACH_FIRST_SALE achievement
-    if is_first_sale_session:
-        if "ACH_FIRST_SALE" not in player_profile["achievements"]:
-            player_profile["achievements"].append("ACH_FIRST_SALE")
+    if as_delta:
+        return delta
+    return delta.apply_to(player_profile)
 
-    return player_profile
+from adaptive_selector import AdaptiveSelector
+from firestore_mocks import market_item_catalog
+from rng_service import request_rng
+from round_sampler import sample_round
 
-import random
-from firestore_mocks import get_market_item_definitions
+# Per-player answer statistics steering which item the player has to find
+market_item_selector = AdaptiveSelector(market_item_catalog)
 
-def get_namdaemun_game_data():
+@instrumented("namdaemun.get_game_data")
+def get_namdaemun_game_data(rng=None, player_id=None):
     """
     Generates a random game set for the Namdaemun minigame.
 
+    Args:
+        rng (random.Random, optional): The request's random generator. Pass a seeded one
+                                       (see rng_service.round_rng) to reproduce a round.
+        player_id (str, optional): When given, the item to find leans toward the ones this
+                                   player misses or answers slowly (see market_item_selector).
+
     Returns:
         dict: A dictionary containing:
             - "correct_item" (dict): The item the player needs to find.
@@ -58,13 +87,16 @@ def get_namdaemun_game_data():
     Raises:
         ValueError: If there are not enough items in the definitions to create a game set.
     """
-    all_items = get_market_item_definitions()
+    with phase("namdaemun.catalog_fetch"):
+        all_items = market_item_catalog.snapshot()
 
     if not all_items:
         raise ValueError("No market item definitions found. Cannot generate game data.")
 
+    rng = request_rng(rng)
+
     # Determine the number of incorrect items: 3 or 4
-    num_incorrect_items = random.choice([3, 4])
+    num_incorrect_items = rng.choice([3, 4])
     total_items_needed = 1 + num_incorrect_items
 
     if len(all_items) < total_items_needed:
@@ -72,19 +104,15 @@ def get_namdaemun_game_data():
             f"Not enough unique items to generate a game set. Need {total_items_needed}, have {len(all_items)}."
         )
 
-    # Shuffle all items to ensure randomness in selection
-    random.shuffle(all_items)
-
-    # Select the correct item
-    correct_item = all_items[0]
-
-    # Select incorrect items (ensuring they are different from the correct one)
-    # The shuffle already helps, we just need to pick from the rest
-    incorrect_items = all_items[1:total_items_needed]
-
-    # Prepare the display items list and shuffle it
-    display_items = [correct_item] + incorrect_items
-    random.shuffle(display_items)
+    # Draw only the items we need from the shared catalog (no full copy or shuffle),
+    # and copy those few read-only records into plain dicts for the response.
+    with phase("namdaemun.sample"):
+        correct_position = None
+        if player_id is not None:
+            all_items, (correct_position,) = market_item_selector.sample_positions(player_id, 1, rng)
+        correct_record, display_records = sample_round(all_items, num_incorrect_items, rng, correct_position)
+    correct_item = dict(correct_record)
+    display_items = [correct_item if record is correct_record else dict(record) for record in display_records]
 
     return {
         "correct_item": correct_item,
@@ -1,7 +1,40 @@
 # Cloud Functions for the Poème Perdu Minigame
-from poem_mocks import get_poem_puzzle_by_id
+from poem_index import poem_solutions
+from achievement_engine import minigame_achievements
+from instrumentation import instrumented, phase
+from models.game_results import PoemResults
+from models.player_profile import PlayerProfile
+from profile_delta import ProfileDelta
 
-def submit_poem_results(player_profile, poem_id, user_answers):
+def compute_poem_delta(solutions, results, partial_credit=False):
+    """
+    Scores a submission (PoemResults) against its poem's SolutionTable.
+
+    Answers are compared in normalized form (Unicode NFC, case and whitespace insensitive).
+    A perfect submission scores the poem's max_score and earns its rewards. Otherwise the
+    score is 0, or with `partial_credit` max_score prorated by the correct blanks (no rewards).
+
+    Returns:
+        tuple: (score, ProfileDelta) with the poem's rewards for a perfect submission.
+    """
+    delta = ProfileDelta()
+
+    if solutions.is_perfect(results.answers):
+        calculated_score = solutions.max_score
+        # Apply rewards
+        delta.mana = solutions.reward_mana
+        delta.xp = solutions.reward_xp
+        delta.stats["poemsCompleted"] = 1
+    elif partial_credit:
+        calculated_score = solutions.partial_score(results.answers)
+    else:
+        # Score is 0 if not all answers are perfect, as per TDD test setup.
+        calculated_score = 0
+
+    return calculated_score, delta
+
+@instrumented("poem.submit_results")
+def submit_poem_results(player_profile, poem_id, user_answers, as_delta=False, partial_credit=False):
     """
     Processes the user's submission for a poem puzzle, calculates score, and updates player profile.
 
@@ -10,87 +43,82 @@ def submit_poem_results(player_profile, poem_id, user_answers):
                                Expected: {"mana": int, "xp": int, "stats": {"poemsCompleted": int}}
         poem_id (str): The ID of the submitted poem.
         user_answers (dict): A dictionary of the user's answers, e.g., {"blank_1": "word", ...}
+        as_delta (bool): If True, the profile is left untouched and the changes are returned
+                         as a ProfileDelta under "delta" instead of "updated_profile".
+        partial_credit (bool): If True, an imperfect submission scores per correct blank.
 
     Returns:
         dict: A dictionary containing:
             - "score" (int): The calculated score for the poem.
-            - "updated_profile" (dict): The player's profile after updates.
+            - "updated_profile" (dict): The player's profile after updates (or "delta" when as_delta is True).
             - "message" (str, optional): A message about the submission (e.g., if poem not found).
     """
-    if not isinstance(player_profile, dict) or \
-       not all(k in player_profile for k in ["mana", "xp", "stats"]) or \
-       not isinstance(player_profile["stats"], dict) or \
-       "poemsCompleted" not in player_profile["stats"]:
-        # This basic validation can be expanded
+    # Validate once at the boundary
+    try:
+        profile = PlayerProfile.from_dict(player_profile, required=("mana", "xp"), required_stats=("poemsCompleted",))
+    except (TypeError, ValueError):
         raise ValueError("Invalid player_profile structure.")
 
-    poem_data = get_poem_puzzle_by_id(poem_id)
+    with phase("poem.solutions_lookup"):
+        solutions = poem_solutions.get(poem_id)
+
+    profile_key = "delta" if as_delta else "updated_profile"
 
-    if not poem_data:
+    if solutions is None:
         return {
             "score": 0,
-            "updated_profile": player_profile,
+            profile_key: ProfileDelta() if as_delta else player_profile,
             "message": f"Poem with ID '{poem_id}' not found."
         }
 
-    correct_solutions = poem_data.get("solutions", {})
-    calculated_score = 0
-    all_correct = True
-
-    # Check if all required blanks are answered and if they are correct
-    if len(user_answers) != len(correct_solutions):
-        all_correct = False
-    else:
-        for blank_key, correct_word in correct_solutions.items():
-            if user_answers.get(blank_key) != correct_word:
-                all_correct = False
-                break
-
-    if all_correct:
-        calculated_score = poem_data.get("max_score", 0)
-        # Apply rewards
-        rewards = poem_data.get("reward", {})
-        player_profile["mana"] += rewards.get("mana", 0)
-        player_profile["xp"] += rewards.get("xp", 0)
-        player_profile["stats"]["poemsCompleted"] = player_profile["stats"].get("poemsCompleted", 0) + 1
-    else:
-        # For now, score is 0 if not all answers are perfect, as per TDD test setup.
-        # Future enhancements could include partial scoring.
-        calculated_score = 0
-
+    with phase("poem.reward"):
+        calculated_score, delta = compute_poem_delta(solutions, PoemResults(poem_id, user_answers), partial_credit)
+    if profile.uid is not None:
+        poem_selector.record(profile.uid, poem_id, solutions.is_perfect(user_answers))
+    with phase("poem.achievements"):
+        minigame_achievements.award(profile, delta)
 
     return {
         "score": calculated_score,
-        "updated_profile": player_profile
+        profile_key: delta if as_delta else delta.apply_to(player_profile)
     }
 
-import random
-from poem_mocks import get_all_poem_puzzles
+from adaptive_selector import AdaptiveSelector
+from poem_index import poem_payloads
+from poem_mocks import poem_puzzle_catalog
+from rng_service import request_rng
+
+# Per-player results (recorded by submit_poem_results) steering which poem comes next
+poem_selector = AdaptiveSelector(poem_puzzle_catalog)
 
-def get_poem_puzzle_data():
+def _poem_for(player_id, rng):
+    return poem_selector.choose(player_id, request_rng(rng))["id"]
+
+@instrumented("poem.get_puzzle_data")
+def get_poem_puzzle_data(rng=None, player_id=None):
     """
     Retrieves data for a random poem puzzle to be played.
 
+    Args:
+        rng (random.Random, optional): The request's random generator. Pass a seeded one
+                                       (see rng_service.round_rng) to reproduce a round.
+        player_id (str, optional): When given, the draw leans toward the poems this player
+                                   has not solved perfectly yet (see poem_selector).
+
     Returns:
         dict: A dictionary containing the data for a randomly selected poem puzzle,
               including 'poemId', 'title', 'author', 'text', and 'choices'.
-              Returns None or raises an error if no poems are available.
+              Solutions and rewards are never included.
     Raises:
         ValueError: If no poem puzzles are available in the mock data.
     """
-    all_puzzles = get_all_poem_puzzles()
-    if not all_puzzles:
-        raise ValueError("No poem puzzles available to generate game data.")
+    if player_id is not None:
+        return poem_payloads.payload(_poem_for(player_id, rng))
+    return poem_payloads.random_payload(request_rng(rng))
 
-    selected_poem = random.choice(all_puzzles)
-
-    # Return only the data needed by the client for the game
-    # Specifically, do not include 'solutions' or full 'reward' details if not needed upfront.
-    # The 'id' is important for the client to send back with the submission.
-    return {
-        "poemId": selected_poem.get("id"),
-        "title": selected_poem.get("title"),
-        "author": selected_poem.get("author"),
-        "text": selected_poem.get("text"),
-        "choices": selected_poem.get("choices")
-    }
+@instrumented("poem.get_puzzle_payload")
+def get_poem_puzzle_payload(rng=None, player_id=None):
+    """Same as get_poem_puzzle_data, as pre-serialized UTF-8 JSON bytes for the HTTP response."""
+    if player_id is not None:
+        return poem_payloads.payload_bytes(_poem_for(player_id, rng))
+    return poem_payloads.random_payload_bytes(request_rng(rng))
@@ -0,0 +1,172 @@
+# Compiled answer-checking tables and client payloads for the Poème Perdu minigame
+import json
+import unicodedata
+from dataclasses import dataclass
+from definition_catalog import register_derived_index
+from poem_mocks import poem_puzzle_catalog
+from round_sampler import thread_rng
+
+
+def normalize_answer(answer):
+    """Canonical form used to compare answers: collapsed whitespace, case-folded, Unicode NFC."""
+    if not isinstance(answer, str):
+        return None
+    return unicodedata.normalize("NFC", " ".join(answer.split()).casefold())
+
+
+@dataclass(frozen=True, slots=True)
+class SolutionTable:
+    """
+    Read-only solutions of one poem, in blank order (the order of its "solutions" mapping).
+
+    `normalized` holds the precomputed normalize_answer() form of every expected word,
+    so a submission only normalizes the player's answers.
+    """
+    poem_id: str
+    blank_keys: tuple
+    expected: tuple
+    normalized: tuple
+    max_score: int = 0
+    reward_mana: int = 0
+    reward_xp: int = 0
+
+    @classmethod
+    def from_poem(cls, poem):
+        solutions = poem.get("solutions", {})
+        rewards = poem.get("reward", {})
+        return cls(
+            poem_id=poem.get("id"),
+            blank_keys=tuple(solutions),
+            expected=tuple(solutions.values()),
+            normalized=tuple(normalize_answer(word) for word in solutions.values()),
+            max_score=poem.get("max_score", 0),
+            reward_mana=rewards.get("mana", 0),
+            reward_xp=rewards.get("xp", 0),
+        )
+
+    def __len__(self):
+        return len(self.blank_keys)
+
+    def check(self, answers):
+        """Returns a tuple of booleans, one per blank, telling which answers are correct."""
+        return tuple(
+            normalize_answer(answers.get(blank_key)) == expected
+            for blank_key, expected in zip(self.blank_keys, self.normalized)
+        )
+
+    def correct_count(self, answers):
+        return sum(self.check(answers))
+
+    def is_perfect(self, answers):
+        """True when exactly the poem's blanks are answered, all correctly."""
+        return len(answers) == len(self.blank_keys) and all(self.check(answers))
+
+    def partial_score(self, answers):
+        """max_score prorated by the number of correct blanks (rounded down)."""
+        if not self.blank_keys:
+            return 0
+        return self.max_score * self.correct_count(answers) // len(self.blank_keys)
+
+
+class PoemIndex:
+    """
+    SolutionTables of every poem, compiled once per catalog snapshot.
+
+    Submissions look their poem up here instead of copying the full puzzle.
+    """
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self._compiled = (None, {}) # (source snapshot, {poem_id: SolutionTable})
+        register_derived_index(self._tables)
+
+    def _tables(self):
+        snapshot = self._catalog.snapshot()
+        source, tables = self._compiled
+        if source is not snapshot:
+            # Recompiling twice on a race is harmless; the tuple is swapped atomically
+            tables = {poem["id"]: SolutionTable.from_poem(poem) for poem in snapshot if poem.get("id") is not None}
+            self._compiled = (snapshot, tables)
+        return tables
+
+    def get(self, poem_id):
+        """Returns the SolutionTable of a poem, or None if there is no such poem."""
+        return self._tables().get(poem_id)
+
+
+# Only these fields reach the client: no solutions, rewards or max_score.
+CLIENT_PAYLOAD_FIELDS = (("poemId", "id"), ("title", "title"), ("author", "author"), ("text", "text"), ("choices", "choices"))
+
+
+def client_payload(poem):
+    return {client_key: poem.get(poem_key) for client_key, poem_key in CLIENT_PAYLOAD_FIELDS}
+
+
+def _copy_payload(payload):
+    return {key: list(value) if isinstance(value, (list, tuple)) else value for key, value in payload.items()}
+
+
+class PoemPayloadCache:
+    """
+    Client payloads of every poem, built and serialized once per catalog snapshot.
+
+    Serving a poem is a random index into a tuple of ready JSON bytes, which keeps the
+    start-of-turn spike (every player fetching a poem at once) down to a lookup.
+    """
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self._compiled = (None, (), (), {}) # (source snapshot, payload dicts, JSON bytes, {poem_id: position})
+        register_derived_index(self._payloads)
+
+    def _payloads(self):
+        snapshot = self._catalog.snapshot()
+        compiled = self._compiled
+        if compiled[0] is not snapshot:
+            payloads = tuple(client_payload(poem) for poem in snapshot)
+            encoded = tuple(
+                json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                for payload in payloads
+            )
+            positions = {poem.get("id"): position for position, poem in enumerate(snapshot)}
+            compiled = self._compiled = (snapshot, payloads, encoded, positions)
+        return compiled
+
+    def __len__(self):
+        return len(self._payloads()[1])
+
+    def _random_index(self, count, rng):
+        if not count:
+            raise ValueError("No poem puzzles available to generate game data.")
+        return (rng or thread_rng()).randrange(count)
+
+    def random_payload(self, rng=None):
+        """Returns a random poem's client payload as a new dict (its lists are copied too)."""
+        _snapshot, payloads, _encoded, _positions = self._payloads()
+        return _copy_payload(payloads[self._random_index(len(payloads), rng)])
+
+    def random_payload_bytes(self, rng=None):
+        """Returns a random poem's client payload as UTF-8 JSON bytes, ready to send."""
+        _snapshot, _payloads, encoded, _positions = self._payloads()
+        return encoded[self._random_index(len(encoded), rng)]
+
+    def _position(self, poem_id):
+        compiled = self._payloads()
+        position = compiled[3].get(poem_id)
+        if position is None:
+            raise KeyError(f"Poem with ID '{poem_id}' not found.")
+        return compiled, position
+
+    def payload(self, poem_id):
+        """Returns the client payload of a given poem as a new dict. Raises KeyError if there is no such poem."""
+        (_snapshot, payloads, _encoded, _positions), position = self._position(poem_id)
+        return _copy_payload(payloads[position])
+
+    def payload_bytes(self, poem_id):
+        """Returns the client payload of a given poem as UTF-8 JSON bytes. Raises KeyError if there is no such poem."""
+        (_snapshot, _payloads, encoded, _positions), position = self._position(poem_id)
+        return encoded[position]
+
+
+poem_solutions = PoemIndex(poem_puzzle_catalog)
+poem_payloads = PoemPayloadCache(poem_puzzle_catalog)
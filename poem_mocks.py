@@ -1,4 +1,6 @@
 # Mock data for poemPuzzles collection
+from definition_catalog import DefinitionCatalog, content_catalog, static_version
+from instrumentation import instrumented
 
 MOCK_POEM_PUZZLES = {
     "POEM_01": {
@@ -32,6 +34,7 @@ MOCK_POEM_PUZZLES = {
     }
 }
 
+@instrumented("data.get_poem_puzzle_by_id")
 def get_poem_puzzle_by_id(poem_id):
     """
     Simulates fetching a specific poem puzzle by its ID from Firestore.
@@ -48,6 +51,11 @@ def get_all_poem_puzzles():
     """
     return list(MOCK_POEM_PUZZLES.values())
 
+# Tests that add or remove poems call invalidate_all_catalogs() so the catalog notices.
+poem_puzzle_catalog = content_catalog(
+    "poemPuzzles", DefinitionCatalog(get_all_poem_puzzles, version=static_version)
+)
+
 if __name__ == '__main__':
     poem1 = get_poem_puzzle_by_id("POEM_01")
     if poem1:
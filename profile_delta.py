@@ -0,0 +1,105 @@
+# Compact, mergeable player profile updates produced by the minigame submit_* functions
+from dataclasses import dataclass, field
+
+INCREMENT = "increment"
+MAXIMUM = "maximum"
+ARRAY_UNION = "arrayUnion"
+
+
+@dataclass(slots=True)
+class ProfileDelta:
+    """
+    The changes one or more minigame submissions make to a player profile.
+
+    Every field merges without reading the stored profile, so deltas can be coalesced
+    in any order and written as atomic field transforms:
+      - mana, xp and stats are increments,
+      - records are max-merged (e.g. colorChaosHighestCombo),
+      - achievements are set-unioned.
+    """
+    mana: float = 0
+    xp: int = 0
+    stats: dict = field(default_factory=dict)
+    records: dict = field(default_factory=dict)
+    achievements: set = field(default_factory=set)
+
+    def is_empty(self):
+        return not (self.mana or self.xp or self.stats or self.records or self.achievements)
+
+    def merge(self, other):
+        """Coalesces `other` into this delta in place and returns self."""
+        self.mana += other.mana
+        self.xp += other.xp
+        for stat, increment in other.stats.items():
+            self.stats[stat] = self.stats.get(stat, 0) + increment
+        for stat, value in other.records.items():
+            if stat not in self.records or value > self.records[stat]:
+                self.records[stat] = value
+        self.achievements |= other.achievements
+        return self
+
+    def apply_to(self, player_profile):
+        """Applies the delta to a full profile dict in place (read-modify-write path) and returns it."""
+        if self.mana or "mana" in player_profile:
+            player_profile["mana"] = player_profile.get("mana", 0) + self.mana
+        if self.xp or "xp" in player_profile:
+            player_profile["xp"] = player_profile.get("xp", 0) + self.xp
+        if self.stats or self.records:
+            stats = player_profile.setdefault("stats", {})
+            for stat, increment in self.stats.items():
+                stats[stat] = stats.get(stat, 0) + increment
+            for stat, value in self.records.items():
+                if value > stats.get(stat, 0):
+                    stats[stat] = value
+        if self.achievements:
+            achievements = player_profile.setdefault("achievements", [])
+            unlocked = set(achievements)
+            achievements.extend(sorted(self.achievements - unlocked))
+        return player_profile
+
+    def to_field_transforms(self):
+        """
+        Returns the delta as {field_path: (operation, value)} with operations "increment",
+        "maximum" and "arrayUnion", which map one-to-one onto Firestore's Increment,
+        Maximum and ArrayUnion transforms. Zero increments are left out.
+        """
+        transforms = {}
+        if self.mana:
+            transforms["mana"] = (INCREMENT, self.mana)
+        if self.xp:
+            transforms["xp"] = (INCREMENT, self.xp)
+        for stat, increment in self.stats.items():
+            if increment:
+                transforms[f"stats.{stat}"] = (INCREMENT, increment)
+        for stat, value in self.records.items():
+            transforms[f"stats.{stat}"] = (MAXIMUM, value)
+        if self.achievements:
+            transforms["achievements"] = (ARRAY_UNION, sorted(self.achievements))
+        return transforms
+
+    def to_dict(self):
+        return {
+            "mana": self.mana,
+            "xp": self.xp,
+            "stats": dict(self.stats),
+            "records": dict(self.records),
+            "achievements": sorted(self.achievements),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            mana=data.get("mana", 0),
+            xp=data.get("xp", 0),
+            stats=dict(data.get("stats", {})),
+            records=dict(data.get("records", {})),
+            achievements=set(data.get("achievements", ())),
+        )
+
+
+def coalesce_deltas(deltas):
+    """Merges many deltas (e.g. all of one player's submissions) into a single one."""
+    merged = ProfileDelta()
+    for delta in deltas:
+        merged.merge(delta)
+    return merged
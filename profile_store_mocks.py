@@ -0,0 +1,135 @@
+# Local stand-ins for the users collection, used to exercise delta writes without a live Firestore
+import asyncio
+import json
+import sqlite3
+import threading
+from profile_delta import INCREMENT, MAXIMUM, ARRAY_UNION
+
+
+class InMemoryProfileStore:
+    """Keeps profiles as dicts. Every apply_deltas call counts as one batched write."""
+
+    def __init__(self, profiles=None):
+        self._profiles = {player_id: dict(profile) for player_id, profile in (profiles or {}).items()}
+        self._lock = threading.Lock()
+        self.write_count = 0
+
+    def apply_deltas(self, deltas_by_player):
+        """Applies {player_id: ProfileDelta} as a single batched write."""
+        with self._lock:
+            for player_id, delta in deltas_by_player.items():
+                delta.apply_to(self._profiles.setdefault(player_id, {}))
+            self.write_count += 1
+
+    def get_profile(self, player_id):
+        with self._lock:
+            profile = self._profiles.get(player_id)
+            return json.loads(json.dumps(profile)) if profile is not None else None
+
+
+class AsyncInMemoryProfileStore:
+    """
+    Async stand-in for the users collection: an InMemoryProfileStore behind awaitable calls,
+    each taking `latency_seconds` to mimic a Firestore round-trip.
+    """
+
+    def __init__(self, profiles=None, latency_seconds=0.0):
+        self._store = InMemoryProfileStore(profiles)
+        self._latency_seconds = latency_seconds
+        self.read_count = 0
+
+    @property
+    def write_count(self):
+        return self._store.write_count
+
+    async def _round_trip(self):
+        await asyncio.sleep(self._latency_seconds)
+
+    async def get_profile(self, player_id):
+        await self._round_trip()
+        self.read_count += 1
+        return self._store.get_profile(player_id)
+
+    async def get_profiles(self, player_ids):
+        """Fetches several profiles concurrently. Returns {player_id: profile or None}."""
+        profiles = await asyncio.gather(*(self.get_profile(player_id) for player_id in player_ids))
+        return dict(zip(player_ids, profiles))
+
+    async def apply_deltas(self, deltas_by_player):
+        """Applies {player_id: ProfileDelta} as a single batched write."""
+        await self._round_trip()
+        self._store.apply_deltas(deltas_by_player)
+
+
+class SQLiteProfileStore:
+    """
+    Stores profiles as one row per (player, field path), so each delta field becomes an atomic
+    UPSERT (value + increment, or MAX(value, record)), the same way Firestore field transforms
+    apply without a read-modify-write of the whole document.
+    """
+
+    def __init__(self, path=":memory:"):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.write_count = 0
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS profile_fields ("
+                "player_id TEXT NOT NULL, path TEXT NOT NULL, value REAL NOT NULL, "
+                "PRIMARY KEY (player_id, path))"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS profile_achievements ("
+                "player_id TEXT NOT NULL, achievement TEXT NOT NULL, "
+                "PRIMARY KEY (player_id, achievement))"
+            )
+
+    def apply_deltas(self, deltas_by_player):
+        """Applies {player_id: ProfileDelta} in one transaction."""
+        increments, maxima, achievements = [], [], []
+        for player_id, delta in deltas_by_player.items():
+            for path, (operation, value) in delta.to_field_transforms().items():
+                if operation == INCREMENT:
+                    increments.append((player_id, path, value))
+                elif operation == MAXIMUM:
+                    maxima.append((player_id, path, value))
+                elif operation == ARRAY_UNION:
+                    achievements.extend((player_id, achievement) for achievement in value)
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO profile_fields VALUES (?, ?, ?) "
+                "ON CONFLICT (player_id, path) DO UPDATE SET value = value + excluded.value",
+                increments
+            )
+            self._connection.executemany(
+                "INSERT INTO profile_fields VALUES (?, ?, ?) "
+                "ON CONFLICT (player_id, path) DO UPDATE SET value = MAX(value, excluded.value)",
+                maxima
+            )
+            self._connection.executemany("INSERT OR IGNORE INTO profile_achievements VALUES (?, ?)", achievements)
+            self.write_count += 1
+
+    def get_profile(self, player_id):
+        with self._lock:
+            fields = self._connection.execute(
+                "SELECT path, value FROM profile_fields WHERE player_id = ?", (player_id,)).fetchall()
+            achievements = self._connection.execute(
+                "SELECT achievement FROM profile_achievements WHERE player_id = ? ORDER BY achievement",
+                (player_id,)).fetchall()
+        if not fields and not achievements:
+            return None
+
+        profile = {}
+        for path, value in fields:
+            value = int(value) if float(value).is_integer() else value
+            if path.startswith("stats."):
+                profile.setdefault("stats", {})[path[len("stats."):]] = value
+            else:
+                profile[path] = value
+        if achievements:
+            profile["achievements"] = [achievement for (achievement,) in achievements]
+        return profile
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,158 @@
+# Write-behind buffer coalescing minigame reward deltas before they reach the profile store
+import atexit
+import logging
+import threading
+import time
+from profile_delta import ProfileDelta
+
+DEFAULT_MAX_PENDING_PLAYERS = 500
+DEFAULT_MAX_DELAY_SECONDS = 2.0
+DEFAULT_FLUSH_INTERVAL_SECONDS = 0.5 # How often the background flusher checks for a due batch
+
+logger = logging.getLogger("korean_party.profile_write_buffer")
+
+
+class ProfileWriteBuffer:
+    """
+    Accumulates ProfileDelta objects per player and writes them to `store` in batches.
+
+    A batch is flushed when `max_pending_players` players have pending deltas, when the
+    oldest pending delta is older than `max_delay_seconds` (checked on add() and every
+    `flush_interval_seconds` by a daemon thread, so an idle buffer still drains), or
+    explicitly via flush()/close() at session end. If the store write fails, the batch is
+    merged back into the buffer so no increment is lost.
+
+    Flushes triggered by add() or the background thread never raise: their error is logged
+    and kept in `last_flush_error` (None again after the next successful flush). A delta
+    that add() accepted is buffered, so the caller must not add it again. flush() and close()
+    raise the store's error.
+
+    `store` is anything with an apply_deltas({player_id: ProfileDelta}) method
+    (see profile_store_mocks for local stand-ins).
+    """
+
+    def __init__(self, store, max_pending_players=DEFAULT_MAX_PENDING_PLAYERS,
+                 max_delay_seconds=DEFAULT_MAX_DELAY_SECONDS, flush_at_exit=True, clock=time.monotonic,
+                 flush_interval_seconds=DEFAULT_FLUSH_INTERVAL_SECONDS):
+        self._store = store
+        self._max_pending_players = max_pending_players
+        self._max_delay_seconds = max_delay_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._oldest_pending_at = None
+        self._closed = False
+        self.flush_count = 0
+        self.last_flush_error = None
+        if flush_at_exit:
+            atexit.register(self.close)
+        self._stop_flusher = threading.Event()
+        self._flusher = None
+        if flush_interval_seconds: # None or 0: thresholds are only checked on add() and flush_if_due()
+            self._flusher = threading.Thread(target=self._run_flusher, args=(flush_interval_seconds,),
+                                             name="ProfileWriteBuffer-flusher", daemon=True)
+            self._flusher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, player_id, delta):
+        """Buffers one submission's delta for `player_id`, flushing if a threshold is reached."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ProfileWriteBuffer is closed.")
+            pending = self._pending.get(player_id)
+            if pending is None:
+                pending = self._pending[player_id] = ProfileDelta()
+            pending.merge(delta)
+            if self._oldest_pending_at is None:
+                self._oldest_pending_at = self._clock()
+            should_flush = len(self._pending) >= self._max_pending_players or self._is_due()
+
+        if should_flush:
+            self._flush_quietly(self.flush)
+
+    def _flush_quietly(self, flush):
+        try:
+            flush()
+        except Exception as error: # The batch is already back in the buffer
+            with self._lock:
+                self.last_flush_error = error
+                pending = len(self._pending)
+            logger.warning("Profile write-behind flush failed, %d players kept pending: %r", pending, error)
+
+    def _run_flusher(self, interval_seconds):
+        while not self._stop_flusher.wait(interval_seconds):
+            self._flush_quietly(self.flush_if_due)
+
+    def _is_due(self):
+        return self._oldest_pending_at is not None and \
+            self._clock() - self._oldest_pending_at >= self._max_delay_seconds
+
+    def flush_if_due(self):
+        """Flushes if the oldest pending delta has waited longer than max_delay_seconds (for periodic timers)."""
+        with self._lock:
+            due = self._is_due()
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Writes every pending delta in one store call. Returns the number of players written."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._oldest_pending_at = None
+        if not batch:
+            return 0
+
+        try:
+            self._store.apply_deltas(batch)
+        except Exception:
+            # Put the batch back: increments merge commutatively with anything added meanwhile.
+            with self._lock:
+                for player_id, delta in batch.items():
+                    newer = self._pending.get(player_id)
+                    self._pending[player_id] = delta.merge(newer) if newer is not None else delta
+                if self._oldest_pending_at is None:
+                    self._oldest_pending_at = self._clock()
+            raise
+
+        with self._lock: # The flusher thread and request threads both flush
+            self.flush_count += 1
+            self.last_flush_error = None
+        return len(batch)
+
+    def close(self):
+        """Stops the background flusher, flushes what is left and rejects further adds. Safe to call more than once."""
+        with self._lock:
+            already_closed, self._closed = self._closed, True
+        if not already_closed:
+            atexit.unregister(self.close)
+            self._stop_flusher.set()
+            if self._flusher is not None and self._flusher is not threading.current_thread():
+                self._flusher.join()
+        self.flush()
+
+
+if __name__ == '__main__':
+    # Flush throughput load test against the local SQLite stand-in
+    import random
+    from profile_store_mocks import SQLiteProfileStore
+    from src.game_logic.color_chaos import submit_color_chaos_results
+
+    store = SQLiteProfileStore()
+    submissions = 200_000
+    players = [f"player_{i}" for i in range(2_000)]
+    started = time.perf_counter()
+    with ProfileWriteBuffer(store, flush_at_exit=False) as buffer:
+        for _ in range(submissions):
+            results = {"score": random.randint(0, 3000), "highestCombo": random.randint(0, 20)}
+            buffer.add(random.choice(players), submit_color_chaos_results({}, results, as_delta=True))
+    elapsed = time.perf_counter() - started
+    print(f"{submissions} submissions in {elapsed:.2f}s ({submissions / elapsed:,.0f}/s), "
+          f"{store.write_count} store writes")
@@ -0,0 +1,178 @@
+# Batch settlement of minigame results at the end of a party session
+from achievement_engine import minigame_achievements
+from food_feast_functions import MAX_SCORE_POINTS, TIME_PENALTY_PER_SECOND, MANA_CONVERSION_FACTOR, XP_CONVERSION_FACTOR
+from instrumentation import instrumented
+from namdaemun_functions import SCORE_POINTS_PER_MANA
+from models.game_results import NamdaemunResults, FoodGameResults, PoemResults, ColorChaosResults
+from models.player_profile import PlayerProfile
+from poem_functions import compute_poem_delta
+from poem_index import poem_solutions
+from profile_delta import ProfileDelta
+from src.game_logic.color_chaos import MANA_PER_SCORE_POINT
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional: the pure-Python path computes the same rewards
+    np = None
+
+# Below this many values per column, array conversion costs more than it saves (measured
+# crossover between 40 and 100): party-sized sessions stay on the pure-Python path.
+NUMPY_MIN_VALUES = 64
+
+NAMDAEMUN = "namdaemun"
+FOOD_FEAST = "food_feast"
+POEM = "poem"
+COLOR_CHAOS = "color_chaos"
+
+# Typed results model of each minigame; from_dict validates the raw results dict
+RESULT_MODELS = {
+    NAMDAEMUN: NamdaemunResults,
+    FOOD_FEAST: FoodGameResults,
+    POEM: PoemResults,
+    COLOR_CHAOS: ColorChaosResults,
+}
+
+
+def _use_numpy(values):
+    return np is not None and len(values) >= NUMPY_MIN_VALUES
+
+
+def _floor_div(values, divisor):
+    if _use_numpy(values):
+        return (np.asarray(values, dtype=np.int64) // divisor).tolist()
+    return [value // divisor for value in values]
+
+
+def _scale(values, factor):
+    if _use_numpy(values):
+        return (np.asarray(values, dtype=np.float64) * factor).tolist()
+    return [value * factor for value in values]
+
+
+def _food_scores(correct_answers, total_questions, time_taken):
+    """Vectorized form of the submit_food_game_results score formula."""
+    if _use_numpy(correct_answers):
+        correct = np.asarray(correct_answers, dtype=np.float64)
+        total = np.asarray(total_questions, dtype=np.float64)
+        penalty = np.asarray(time_taken, dtype=np.float64) * TIME_PENALTY_PER_SECOND
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw_scores = correct / total * MAX_SCORE_POINTS - penalty
+        scores = np.where(total == 0, 0, np.maximum(0, np.trunc(raw_scores)))
+        return scores.astype(np.int64).tolist()
+
+    scores = []
+    for correct, total, seconds in zip(correct_answers, total_questions, time_taken):
+        raw_score = 0 if total == 0 else (correct / total) * MAX_SCORE_POINTS - seconds * TIME_PENALTY_PER_SECOND
+        scores.append(max(0, int(raw_score)))
+    return scores
+
+
+@instrumented("settlement.settle_session")
+def settle_session(submissions, positions=None):
+    """
+    Settles the minigame results of a whole party session in one pass.
+
+    Profiles are only read: the returned deltas are meant to be applied by the caller.
+
+    Args:
+        submissions (list): (player_profile, minigame, results) tuples, where minigame is one of
+                            "namdaemun", "food_feast", "poem" or "color_chaos" and results is:
+                              - namdaemun: {"score": int, "itemsSold": int}
+                              - food_feast: {"correctAnswers": int, "totalQuestions": int, "timeTaken": number}
+                              - poem: {"poemId": str, "answers": dict}
+                              - color_chaos: {"score": number, "highestCombo": int}
+                            Players are identified by the profile's "uid" (or, failing that,
+                            by the position of their submission).
+        positions (list, optional): The submissions' positions in a larger job, when settling
+                                    one partition of it (see settlement_worker). Used for
+                                    player ids and error messages. Defaults to 0..n-1.
+
+    Returns:
+        dict: {
+            "scores": [int, ...],            # One score per submission, in input order
+            "deltas": {player_id: ProfileDelta},   # One coalesced delta per player
+            "totals": {"mana", "xp", "stats", "achievementsUnlocked", "submissions"}
+        }
+    Raises:
+        ValueError: If a submission names an unknown minigame or has malformed results.
+    """
+    groups = {minigame: [] for minigame in RESULT_MODELS}
+    profiles = []
+    player_ids = []
+    decoded_profiles = {}
+    for index, (player_profile, minigame, results) in enumerate(submissions):
+        position = positions[index] if positions is not None else index
+        if minigame not in groups:
+            raise ValueError(f"Submission {position}: unknown minigame '{minigame}'.")
+        # Validate once at the boundary: each profile object is decoded a single time
+        profile = decoded_profiles.get(id(player_profile))
+        try:
+            if profile is None:
+                profile = decoded_profiles[id(player_profile)] = PlayerProfile.from_dict(player_profile)
+            results = RESULT_MODELS[minigame].from_dict(results)
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"Submission {position} ({minigame}): {error}")
+        groups[minigame].append((index, results))
+        profiles.append(profile)
+        player_ids.append(profile.uid if profile.uid is not None else position)
+
+    # Rewards per submission: (score, ProfileDelta), achievements are checked in the final pass
+    rewards = [None] * len(player_ids)
+    for minigame, entries in groups.items():
+        if not entries:
+            continue
+        indexes = [index for index, _results in entries]
+        group_results = [results for _index, results in entries]
+
+        if minigame == NAMDAEMUN:
+            scores = [results.score for results in group_results]
+            items_sold = [results.items_sold for results in group_results]
+            for index, score, mana, sold in zip(indexes, scores, _floor_div(scores, SCORE_POINTS_PER_MANA), items_sold):
+                rewards[index] = (score, ProfileDelta(mana=mana, stats={"itemsSoldAtMarket": sold}))
+        elif minigame == FOOD_FEAST:
+            correct_answers = [results.correct_answers for results in group_results]
+            scores = _food_scores(correct_answers, [results.total_questions for results in group_results],
+                                  [results.time_taken for results in group_results])
+            manas = _floor_div(scores, MANA_CONVERSION_FACTOR)
+            xps = _floor_div(scores, XP_CONVERSION_FACTOR)
+            for index, score, mana, xp, correct in zip(indexes, scores, manas, xps, correct_answers):
+                rewards[index] = (score, ProfileDelta(mana=mana, xp=xp, stats={"foodItemsIdentified": correct}))
+        elif minigame == POEM:
+            for index, results in entries:
+                solutions = poem_solutions.get(results.poem_id)
+                rewards[index] = compute_poem_delta(solutions, results) if solutions else (0, ProfileDelta())
+        elif minigame == COLOR_CHAOS:
+            scores = [results.score for results in group_results]
+            combos = [results.highest_combo for results in group_results]
+            for index, score, mana, combo in zip(indexes, scores, _scale(scores, MANA_PER_SCORE_POINT), combos):
+                rewards[index] = (score, ProfileDelta(
+                    mana=mana, stats={"colorsIdentified": combo}, records={"colorChaosHighestCombo": combo}))
+
+    # Single pass in submission order: merge rewards per player and check the achievements of
+    # the stats each submission changed against the running totals, so two games of the same
+    # player are settled in sequence.
+    deltas = {}
+    session_delta = ProfileDelta()
+    for index, profile in enumerate(profiles):
+        submission_delta = rewards[index][1]
+        delta = deltas.setdefault(player_ids[index], ProfileDelta())
+        changed_stats = {stat for stat, amount in submission_delta.stats.items() if amount} | submission_delta.records.keys()
+
+        delta.merge(submission_delta)
+        minigame_achievements.award(profile, delta, changed_stats)
+        session_delta.mana += submission_delta.mana
+        session_delta.xp += submission_delta.xp
+        for stat, increment in submission_delta.stats.items():
+            session_delta.stats[stat] = session_delta.stats.get(stat, 0) + increment
+
+    return {
+        "scores": [score for score, _delta in rewards],
+        "deltas": deltas,
+        "totals": {
+            "mana": session_delta.mana,
+            "xp": session_delta.xp,
+            "stats": session_delta.stats,
+            "achievementsUnlocked": sum(len(delta.achievements) for delta in deltas.values()),
+            "submissions": len(player_ids)
+        }
+    }
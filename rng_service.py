@@ -0,0 +1,34 @@
+# Deterministic per-round random generators for the minigame generators
+import hashlib
+from round_sampler import make_rng, thread_rng
+
+
+def derive_seed(game_id, round_number, stream=""):
+    """
+    Returns the 64-bit seed of one round of a game.
+
+    The same (game_id, round_number, stream) always gives the same seed, so a round can be
+    regenerated server-side instead of being stored, and load tests replay bit-for-bit.
+    `stream` separates generators used in the same round (e.g. one per minigame).
+    """
+    key = f"{game_id}\x1f{round_number}\x1f{stream}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def round_rng(game_id, round_number, stream=""):
+    """Returns a private random.Random for one round (see derive_seed)."""
+    return make_rng(derive_seed(game_id, round_number, stream))
+
+
+def request_rng(rng=None, options=None, stream=""):
+    """
+    Picks the generator of a get_*_game_data request: `rng` if given, else a round generator
+    when `options` carries "gameId" and "round", else the thread's unseeded one
+    (round_sampler.thread_rng, so no generator is built per request). Never the shared
+    global `random` state.
+    """
+    if rng is not None:
+        return rng
+    if options and options.get("gameId") is not None and options.get("round") is not None:
+        return round_rng(options["gameId"], options["round"], stream)
+    return thread_rng()
@@ -0,0 +1,118 @@
+# Sampling engine shared by the minigame generators (Namdaemun, Food Feast)
+import os
+import random
+import threading
+
+_per_thread = threading.local()
+
+
+def make_rng(seed=None):
+    """
+    Returns a private random.Random for one request.
+    Passing the same seed again regenerates the exact same round (replays, anti-cheat audits).
+
+    Seeding a new generator costs about 20us (os.urandom when `seed` is None): for unseeded
+    requests, use thread_rng() instead.
+    """
+    return random.Random(seed)
+
+
+def thread_rng():
+    """
+    Returns the calling thread's unseeded random.Random, created on first use and reused by
+    every unseeded request of the thread (never the shared global `random` state).
+    """
+    rng = getattr(_per_thread, "rng", None)
+    if rng is None:
+        rng = _per_thread.rng = random.Random()
+    return rng
+
+
+def _reseed_after_fork():
+    # A forked worker (see settlement_worker) must not replay its parent's sequence
+    rng = getattr(_per_thread, "rng", None)
+    if rng is not None:
+        rng.seed()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
+
+
+def sample_round(items, num_incorrect, rng, correct_position=None):
+    """
+    Draws one correct item plus `num_incorrect` distinct distractors.
+
+    Runs in O(k) for k = 1 + num_incorrect: only k positions are drawn, and `items`
+    (a list, tuple or catalog snapshot) is never copied, shuffled or otherwise mutated.
+
+    Args:
+        items (Sequence): The candidate items.
+        num_incorrect (int): The number of distractors to draw.
+        rng (random.Random): The request's random generator.
+        correct_position (int, optional): Position of the correct item when it was chosen
+                                          beforehand (e.g. by an AdaptiveSelector); drawn otherwise.
+
+    Returns:
+        tuple: (correct_item, display_items) where display_items contains the correct item
+               and the distractors in random order.
+    Raises:
+        ValueError: If `items` holds fewer than 1 + num_incorrect entries.
+    """
+    positions = rng.sample(range(len(items)), 1 + num_incorrect)
+    if correct_position is not None:
+        # One spare position in case the correct item is drawn as its own distractor
+        positions = [correct_position] + [position for position in positions if position != correct_position][:num_incorrect]
+    display_items = [items[position] for position in positions]
+    correct_item = display_items[0]
+    rng.shuffle(display_items)
+    return correct_item, display_items
+
+
+def sample_balanced(groups, count, rng):
+    """
+    Draws `count` distinct items spread as evenly as possible across `groups`.
+
+    Quotas are water-filled: one common level is raised across the groups, each group
+    capped at its size, and the remainder goes to a random subset of the groups still above
+    that level, so the quotas of groups that are not exhausted differ by at most one. Only
+    the drawn positions are touched, so this runs in O(count + G log G) for G groups.
+
+    Args:
+        groups (Sequence[Sequence]): Disjoint groups of items, e.g. the items (or positions) of each category.
+        count (int): The number of items to draw.
+        rng (random.Random): The request's random generator.
+
+    Returns:
+        list: The drawn items, in random order.
+    Raises:
+        ValueError: If the groups hold fewer than `count` items in total.
+    """
+    sizes = [len(group) for group in groups]
+    if count > sum(sizes):
+        raise ValueError(f"Cannot draw {count} distinct items from {sum(sizes)}.")
+
+    quotas = [0] * len(groups)
+    remaining = count
+    open_groups = len(groups)
+    by_size = sorted(range(len(groups)), key=sizes.__getitem__)
+    for rank, index in enumerate(by_size):
+        if sizes[index] > remaining // open_groups: # This group and every larger one stay open
+            level, extra = divmod(remaining, open_groups)
+            above = sorted(by_size[rank:]) # Index order, so a seeded rng picks the same groups
+            for index in above:
+                quotas[index] = level
+            for index in rng.sample(above, extra):
+                quotas[index] += 1
+            break
+        quotas[index] = sizes[index] # Exhausted below the level
+        remaining -= sizes[index]
+        open_groups -= 1
+
+    drawn = [
+        groups[index][position]
+        for index, quota in enumerate(quotas) if quota
+        for position in rng.sample(range(sizes[index]), quota)
+    ]
+    rng.shuffle(drawn)
+    return drawn
@@ -0,0 +1,127 @@
+# Parallel end-of-session settlement: partitions a job by player across a process pool
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from reward_settlement import settle_session
+
+MIN_PARALLEL_SUBMISSIONS = 64 # Smaller jobs are settled inline, the pool round trip would dominate
+
+
+def _player_key(position, player_profile):
+    """The player id settle_session will use: the profile's "uid", or the submission position."""
+    uid = player_profile.get("uid") if isinstance(player_profile, dict) else None
+    return uid if uid is not None else position
+
+
+def partition_by_player(submissions, partition_count):
+    """
+    Splits a job into at most `partition_count` partitions of whole players.
+
+    All the submissions of a player land in the same partition, in their original order,
+    so that player's games are settled in sequence. Players are spread largest first onto
+    the least loaded partition to balance the submission counts.
+
+    Returns:
+        list: Partitions as lists of (position, submission), ordered by first position.
+    """
+    players = {}
+    for position, submission in enumerate(submissions):
+        players.setdefault(_player_key(position, submission[0]), []).append((position, submission))
+
+    partition_count = max(1, min(partition_count, len(players)))
+    partitions = [[] for _ in range(partition_count)]
+    loads = [(0, number) for number in range(partition_count)]
+    for entries in sorted(players.values(), key=len, reverse=True):
+        load, number = heapq.heappop(loads)
+        partitions[number].extend(entries)
+        heapq.heappush(loads, (load + len(entries), number))
+
+    for entries in partitions:
+        entries.sort(key=lambda entry: entry[0])
+    return sorted((entries for entries in partitions if entries), key=lambda entries: entries[0][0])
+
+
+def _settle_partition(entries):
+    positions = [position for position, _submission in entries]
+    return positions, settle_session([submission for _position, submission in entries], positions)
+
+
+def _merge(submission_count, player_order, partition_results):
+    scores = [None] * submission_count
+    deltas = {}
+    totals = {"mana": 0, "xp": 0, "stats": {}, "achievementsUnlocked": 0, "submissions": 0}
+    for positions, result in partition_results:
+        for position, score in zip(positions, result["scores"]):
+            scores[position] = score
+        deltas.update(result["deltas"]) # Partitions never share a player
+        for total in ("mana", "xp", "achievementsUnlocked", "submissions"):
+            totals[total] += result["totals"][total]
+        for stat, increment in result["totals"]["stats"].items():
+            totals["stats"][stat] = totals["stats"].get(stat, 0) + increment
+    return {
+        "scores": scores,
+        "deltas": {player_id: deltas[player_id] for player_id in player_order},
+        "totals": totals
+    }
+
+
+class SettlementWorker:
+    """
+    Settles end-of-session jobs (see reward_settlement.settle_session) in parallel.
+
+    A job is partitioned by player and every partition is settled by settle_session in a
+    worker process, so the CPU-bound reward and achievement computation scales across
+    cores. Each player's submissions stay together and in order, so the coalesced delta of
+    a player is exactly the one the sequential settlement produces; the result has the
+    same shape and can be written in one batch (e.g. through a ProfileWriteBuffer).
+
+    `executor` defaults to a ProcessPoolExecutor of `max_workers` processes, created on
+    first use and shut down by close(); an executor passed in is left to its owner.
+    """
+
+    def __init__(self, max_workers=None, executor=None, min_parallel_submissions=MIN_PARALLEL_SUBMISSIONS):
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._min_parallel_submissions = min_parallel_submissions
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def settle(self, submissions):
+        """
+        Settles a job of (player_profile, minigame, results) submissions.
+
+        Returns:
+            dict: The settle_session result for the whole job.
+        Raises:
+            ValueError: If a submission is invalid (reported with its position in the job).
+        """
+        submissions = list(submissions)
+        if len(submissions) < self._min_parallel_submissions or self._max_workers == 1:
+            return settle_session(submissions)
+
+        partitions = partition_by_player(submissions, self._max_workers)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self._max_workers)
+        futures = [self._executor.submit(_settle_partition, entries) for entries in partitions]
+        partition_results = [future.result() for future in futures]
+
+        player_order = dict.fromkeys(
+            _player_key(position, player_profile) for position, (player_profile, _minigame, _results) in enumerate(submissions)
+        )
+        return _merge(len(submissions), player_order, partition_results)
+
+
+def settle_job(submissions, max_workers=None):
+    """Settles one end-of-session job with a short-lived SettlementWorker."""
+    with SettlementWorker(max_workers) as worker:
+        return worker.settle(submissions)
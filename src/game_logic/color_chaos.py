@@ -1,4 +1,11 @@
-import random
+from adaptive_selector import AdaptiveSelector
+from definition_catalog import DefinitionCatalog, content_catalog, static_version
+from instrumentation import instrumented, phase
+from achievement_engine import minigame_achievements
+from models.game_results import ColorChaosResults
+from models.player_profile import PlayerProfile
+from profile_delta import ProfileDelta
+from rng_service import request_rng
 
 # Collection colorDefinitions
 COLOR_DEFINITIONS = [
@@ -12,66 +19,101 @@ COLOR_DEFINITIONS = [
     {"colorId": "juhwangsaek", "hangeul": "주황색", "hexCode": "#FFA500"}  # Orange
 ]
 
-def get_color_chaos_game_data(data):
+color_catalog = content_catalog("colorDefinitions", DefinitionCatalog(
+    lambda: COLOR_DEFINITIONS, id_field="colorId", version=static_version
+))
+# Per-player answer statistics (fed by the server-side sessions) steering the target draws
+color_selector = AdaptiveSelector(color_catalog, id_field="colorId")
+
+MANA_PER_SCORE_POINT = 0.1 # 1 Mana for every 10 score points
+
+@instrumented("color_chaos.get_game_data")
+def get_color_chaos_game_data(data, rng=None):
     """
-    Selects a color randomly from COLOR_DEFINITIONS.
-    The 'data' input (e.g., {level: 1}) is not used in this version but is kept for API consistency.
+    Selects a color randomly from COLOR_DEFINITIONS (or its mapped snapshot, see color_catalog).
+    The 'data' input (e.g., {level: 1}) may carry:
+      - "playerId": the draw leans toward the colors that player misses or answers slowly
+        (see color_selector), otherwise it is uniform;
+      - "gameId" and "round", which seed the draw (see rng_service).
+    'level' is not used in this version. Pass `rng` to control the draw directly.
     """
-    if not COLOR_DEFINITIONS:
+    with phase("color_chaos.catalog_fetch"):
+        colors = color_catalog.snapshot()
+    if not colors:
         # Handle empty color list case, though tests should catch this via setUp
         return {"error": "No colors defined"}
 
-    selected_color = random.choice(COLOR_DEFINITIONS)
+    rng = request_rng(rng, data, "color_chaos")
+    player_id = data.get("playerId") if data else None
+    with phase("color_chaos.sample"):
+        selected_color = color_selector.choose(player_id, rng) if player_id is not None else rng.choice(colors)
 
     return {
         "targetColor": selected_color["colorId"],
         "targetHangeul": selected_color["hangeul"]
     }
 
-def submit_color_chaos_results(player_profile, results):
+def compute_color_chaos_delta(profile, results):
     """
-    Calculates rewards, updates user document (player_profile), and manages achievements.
+    Computes the rewards of a Color Chaos game.
 
     Args:
-        player_profile (dict): The player's current profile.
-                               Expected structure: {"mana": int, "stats": {"colorsIdentified": int, "colorChaosHighestCombo": int}, "achievements": list}
-        results (dict): The results from the game.
-                        Expected structure: {"score": int, "highestCombo": int}
+        profile (PlayerProfile): The player's decoded profile.
+        results (ColorChaosResults): The game results.
 
     Returns:
-        dict: The updated player_profile.
+        ProfileDelta: Mana, colors identified and the highest combo record (achievements are awarded by the caller).
     """
-    # Ensure player_profile and its nested structures exist, initialize if not.
-    # This is good practice for functions that modify nested dictionaries.
-    if "mana" not in player_profile:
-        player_profile["mana"] = 0
-    if "stats" not in player_profile:
-        player_profile["stats"] = {}
-    if "colorsIdentified" not in player_profile["stats"]:
-        player_profile["stats"]["colorsIdentified"] = 0
-    if "colorChaosHighestCombo" not in player_profile["stats"]:
-        player_profile["stats"]["colorChaosHighestCombo"] = 0
-    if "achievements" not in player_profile:
-        player_profile["achievements"] = []
+    delta = ProfileDelta()
 
     # Calculate Mana reward
-    mana_per_score_point = 0.1 # As defined in the test
-    mana_gain = results.get("score", 0) * mana_per_score_point
-    player_profile["mana"] += mana_gain
+    delta.mana = results.score * MANA_PER_SCORE_POINT
 
     # Update stats
-    player_profile["stats"]["colorsIdentified"] += results.get("highestCombo", 0)
+    delta.stats["colorsIdentified"] = results.highest_combo
+    # Max-merged with the stored record when applied
+    delta.records["colorChaosHighestCombo"] = results.highest_combo
+
+    return delta
 
-    current_highest_combo = player_profile["stats"]["colorChaosHighestCombo"]
-    new_highest_combo = results.get("highestCombo", 0)
-    if new_highest_combo > current_highest_combo:
-        player_profile["stats"]["colorChaosHighestCombo"] = new_highest_combo
+@instrumented("color_chaos.submit_results")
+def submit_color_chaos_results(player_profile, results, as_delta=False):
+    """
+    Calculates rewards, updates user document (player_profile), and manages achievements.
+
+    Args:
+        player_profile (dict): The player's current profile.
+                               Expected structure: {"mana": int, "stats": {"colorsIdentified": int, "colorChaosHighestCombo": int}, "achievements": list}
+        results (dict): The results from the game.
+                        Expected structure: {"score": int, "highestCombo": int}
+        as_delta (bool): If True, the profile is left untouched and the changes are returned
+                         as a ProfileDelta instead.
+
+    Returns:
+        dict: The updated player_profile (or a ProfileDelta when as_delta is True).
+    """
+    if not as_delta:
+        # Ensure player_profile and its nested structures exist, initialize if not.
+        # This is good practice for functions that modify nested dictionaries.
+        if "mana" not in player_profile:
+            player_profile["mana"] = 0
+        if "stats" not in player_profile:
+            player_profile["stats"] = {}
+        if "colorsIdentified" not in player_profile["stats"]:
+            player_profile["stats"]["colorsIdentified"] = 0
+        if "colorChaosHighestCombo" not in player_profile["stats"]:
+            player_profile["stats"]["colorChaosHighestCombo"] = 0
+        if "achievements" not in player_profile:
+            player_profile["achievements"] = []
 
-    # Handle Achievements
-    # Example: "Combo Master lvl 1" for combo >= 15
-    if results.get("highestCombo", 0) >= 15:
-        achievement_name = "Combo Master lvl 1"
-        if achievement_name not in player_profile["achievements"]:
-            player_profile["achievements"].append(achievement_name)
+    # Validate once at the boundary, the reward code below works on the typed models
+    profile = PlayerProfile.from_dict(player_profile)
+    with phase("color_chaos.reward"):
+        delta = compute_color_chaos_delta(profile, ColorChaosResults.from_dict(results))
+    # Handle Achievements (e.g. "Combo Master lvl 1" for a combo >= 15)
+    with phase("color_chaos.achievements"):
+        minigame_achievements.award(profile, delta)
 
-    return player_profile
+    if as_delta:
+        return delta
+    return delta.apply_to(player_profile)
@@ -0,0 +1,180 @@
+# Server-side Color Chaos sessions: the server draws the targets and verifies every answer
+import hashlib
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from instrumentation import instrumented
+from models.game_results import ColorChaosResults
+from src.game_logic.color_chaos import color_catalog, color_selector, submit_color_chaos_results
+
+SESSION_DURATION_SECONDS = 60
+LATE_ANSWER_GRACE_SECONDS = 2 # Network latency allowance after the timer ends
+POINTS_PER_HIT = 100
+COMBO_BONUS_POINTS = 10 # Extra points per hit already in the current combo
+
+
+def target_position(seed, index, color_count):
+    """
+    Position in the palette of the index-th target of a session, in O(1).
+
+    The whole sequence is a pure function of the seed, so sessions never store it.
+    """
+    digest = hashlib.blake2b(index.to_bytes(8, "little"), digest_size=8, key=seed.to_bytes(8, "little")).digest()
+    return int.from_bytes(digest, "little") % color_count
+
+
+@dataclass(slots=True)
+class ColorChaosSession:
+    """Compact per-session state: the seed, a cursor and running counters (no target list)."""
+    player_id: str
+    seed: int
+    palette: object # The shared color catalog snapshot the session started with
+    expires_at: float
+    shown_at: float # When the current target was sent, to time the answer
+    cursor: int = 0 # Index of the target the next answer is for
+    score: int = 0
+    combo: int = 0
+    highest_combo: int = 0
+
+    def target(self, index=None):
+        """Returns the color (record) of a target, by default the one currently shown."""
+        index = self.cursor if index is None else index
+        return self.palette[target_position(self.seed, index, len(self.palette))]
+
+    def results(self):
+        return ColorChaosResults(self.score, self.highest_combo)
+
+
+def _target_payload(session):
+    target = session.target()
+    return {"index": session.cursor, "targetColor": target["colorId"], "targetHangeul": target["hangeul"]}
+
+
+class ColorChaosSessionEngine:
+    """
+    Holds the running Color Chaos sessions in memory.
+
+    Each answer event is checked against the target the server generated for that index
+    and updates the combo counters in O(1); the final score and combo come from these
+    verified counters instead of the client. Answers are also recorded, with their
+    latency, in `selector` (see adaptive_selector) when one is given.
+
+    Sessions that are never finished are swept by start_session, at most once per session
+    duration, once they have been over for a whole duration (time left to finish them).
+    """
+
+    def __init__(self, duration_seconds=SESSION_DURATION_SECONDS, clock=time.monotonic, selector=None):
+        self._duration_seconds = duration_seconds
+        self._clock = clock
+        self._selector = selector
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._next_sweep_at = clock() + duration_seconds
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def start_session(self, player_id, seed=None):
+        """
+        Starts a session and returns {"sessionId", "durationSeconds", "index", "targetColor", "targetHangeul"}.
+
+        Raises:
+            ValueError: If no colors are defined.
+        """
+        palette = color_catalog.snapshot()
+        if not palette:
+            raise ValueError("No colors defined.")
+        now = self._clock()
+        session = ColorChaosSession(
+            player_id=player_id,
+            seed=secrets.randbits(64) if seed is None else seed % 2**64,
+            palette=palette,
+            expires_at=now + self._duration_seconds + LATE_ANSWER_GRACE_SECONDS,
+            shown_at=now,
+        )
+        session_id = secrets.token_urlsafe(12)
+        with self._lock:
+            if now >= self._next_sweep_at: # O(sessions), amortized over every start of a duration
+                self._drop_expired(now - self._duration_seconds)
+                self._next_sweep_at = now + self._duration_seconds
+            self._sessions[session_id] = session
+        return {"sessionId": session_id, "durationSeconds": self._duration_seconds, **_target_payload(session)}
+
+    def _session(self, session_id, player_id):
+        session = self._sessions.get(session_id)
+        if session is None or session.player_id != player_id:
+            raise KeyError(f"Color Chaos session '{session_id}' not found.")
+        return session
+
+    @instrumented("color_chaos.session_answer")
+    def submit_answer(self, session_id, player_id, index, color_id):
+        """
+        Records the player's answer to target `index`.
+
+        Returns:
+            dict: {"correct", "combo", "score"} plus the next target ("index", "targetColor", "targetHangeul").
+        Raises:
+            KeyError: If the session does not exist (or belongs to someone else).
+            ValueError: If the answer is late, or not for the current target (replayed or skipped).
+        """
+        with self._lock:
+            session = self._session(session_id, player_id)
+            now = self._clock()
+            if now > session.expires_at:
+                raise ValueError("The Color Chaos session has ended.")
+            if index != session.cursor:
+                raise ValueError(f"Expected an answer for target {session.cursor}, got {index}.")
+
+            target_id = session.target()["colorId"]
+            correct = target_id == color_id
+            latency = now - session.shown_at
+            if correct:
+                session.score += POINTS_PER_HIT + COMBO_BONUS_POINTS * session.combo
+                session.combo += 1
+                session.highest_combo = max(session.highest_combo, session.combo)
+            else:
+                session.combo = 0
+            session.cursor += 1
+            session.shown_at = now
+            response = {"correct": correct, "combo": session.combo, "score": session.score, **_target_payload(session)}
+        # Outside the engine-wide lock: the selector has its own, and other sessions need not wait on it
+        if self._selector is not None:
+            self._selector.record(player_id, target_id, correct, latency)
+        return response
+
+    def finish_session(self, session_id, player_id):
+        """Ends a session and returns its verified ColorChaosResults."""
+        with self._lock:
+            session = self._session(session_id, player_id)
+            del self._sessions[session_id]
+        return session.results()
+
+    def _drop_expired(self, ended_before):
+        """Drops the sessions that ended before `ended_before` (callers hold the lock). Returns how many."""
+        expired = [session_id for session_id, session in self._sessions.items() if ended_before > session.expires_at]
+        for session_id in expired:
+            del self._sessions[session_id]
+        return len(expired)
+
+    def expire_sessions(self):
+        """Drops the sessions whose timer has run out without being finished, right away. Returns how many."""
+        now = self._clock()
+        with self._lock:
+            return self._drop_expired(now)
+
+
+color_chaos_sessions = ColorChaosSessionEngine(selector=color_selector)
+
+
+@instrumented("color_chaos.finish_session")
+def finish_color_chaos_session(player_profile, session_id, player_id, as_delta=False, engine=color_chaos_sessions):
+    """
+    Ends a session and rewards the player from its verified score and combo,
+    like submit_color_chaos_results does for client-reported results.
+
+    Returns:
+        dict: The updated player_profile (or a ProfileDelta when as_delta is True).
+    """
+    results = engine.finish_session(session_id, player_id)
+    return submit_color_chaos_results(player_profile, results.to_dict(), as_delta)
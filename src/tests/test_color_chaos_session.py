@@ -0,0 +1,71 @@
+# Test suite for the server-side Color Chaos sessions
+
+import unittest
+
+from src.game_logic.color_chaos import COLOR_DEFINITIONS
+from src.game_logic.color_chaos_session import (
+    COMBO_BONUS_POINTS, POINTS_PER_HIT, ColorChaosSessionEngine, finish_color_chaos_session, target_position
+)
+from testing_support import FakeClock
+
+
+class TestColorChaosSession(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.engine = ColorChaosSessionEngine(duration_seconds=60, clock=self.clock)
+        self.started = self.engine.start_session("alice", seed=1234)
+        self.session_id = self.started["sessionId"]
+
+    def answer(self, target, correct=True):
+        color_id = target["targetColor"]
+        if not correct:
+            color_id = next(color["colorId"] for color in COLOR_DEFINITIONS if color["colorId"] != color_id)
+        return self.engine.submit_answer(self.session_id, "alice", target["index"], color_id)
+
+    def test_targets_are_a_pure_function_of_the_seed(self):
+        positions = [target_position(1234, index, len(COLOR_DEFINITIONS)) for index in range(50)]
+        self.assertEqual(positions, [target_position(1234, index, len(COLOR_DEFINITIONS)) for index in range(50)])
+        self.assertGreater(len(set(positions)), 1)
+        self.assertEqual(self.started["targetColor"], COLOR_DEFINITIONS[positions[0]]["colorId"])
+
+    def test_combos_are_verified_incrementally(self):
+        target = self.started
+        for _ in range(3):
+            target = self.answer(target)
+        self.assertEqual((target["combo"], target["score"]), (3, 3 * POINTS_PER_HIT + 3 * COMBO_BONUS_POINTS))
+        target = self.answer(target, correct=False)
+        self.assertEqual(target["combo"], 0)
+        target = self.answer(target)
+
+        delta = finish_color_chaos_session({"mana": 0, "stats": {}}, self.session_id, "alice",
+                                           as_delta=True, engine=self.engine)
+        self.assertEqual(delta.records["colorChaosHighestCombo"], 3)
+        self.assertEqual(delta.mana, (4 * POINTS_PER_HIT + 3 * COMBO_BONUS_POINTS) * 0.1)
+        self.assertEqual(len(self.engine), 0)
+
+    def test_replayed_late_and_foreign_answers_are_rejected(self):
+        self.answer(self.started)
+        with self.assertRaisesRegex(ValueError, "Expected an answer for target 1"):
+            self.answer(self.started)
+        with self.assertRaises(KeyError):
+            self.engine.submit_answer(self.session_id, "mallory", 1, "hinsek")
+        self.clock.now = 63
+        with self.assertRaisesRegex(ValueError, "has ended"):
+            self.engine.submit_answer(self.session_id, "alice", 1, "hinsek")
+        self.assertEqual(self.engine.expire_sessions(), 1)
+
+    def test_abandoned_sessions_are_swept_by_new_sessions(self):
+        self.clock.now = 100 # alice's session ended at 62, less than a duration ago
+        bob = self.engine.start_session("bob")["sessionId"]
+        self.assertEqual(len(self.engine), 2)
+        self.assertEqual(finish_color_chaos_session({"mana": 0, "stats": {}}, bob, "bob", engine=self.engine)["mana"], 0)
+
+        self.clock.now = 170 # More than a duration after it ended, and a sweep is due again
+        self.engine.start_session("carol")
+        self.assertEqual(len(self.engine), 1)
+        with self.assertRaises(KeyError):
+            self.engine.finish_session(self.session_id, "alice")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# Bulk recomputation of every rune schedule after an SRS parameter change
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+import math
+
+import numpy as np
+
+from srs_scheduler import DEFAULT_SRS_PARAMETERS, MIN_MASTERY_LEVEL
+
+DEFAULT_CHUNK_SIZE = 100_000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+DAY_US = 86_400_000_000
+MISSING_TIMESTAMP = np.iinfo(np.int64).min
+
+
+def to_epoch_us(timestamp):
+    """Timezone-aware datetime (as Firestore returns them) -> int64 microseconds since the epoch."""
+    return MISSING_TIMESTAMP if timestamp is None else (timestamp - EPOCH) // MICROSECOND
+
+
+def from_epoch_us(value):
+    return EPOCH + timedelta(microseconds=int(value))
+
+
+@dataclass(slots=True)
+class RuneColumns:
+    """
+    One chunk of runes in columnar form. keys[i] is the (userId, runeId) of row i;
+    missing timestamps are MISSING_TIMESTAMP, and missing levels / ease factors are 0.
+    """
+    keys: list
+    mastery_level: np.ndarray       # int8
+    ease_factor: np.ndarray         # float64
+    last_reviewed: np.ndarray       # int64, microseconds since the epoch
+    next_review_date: np.ndarray    # int64, microseconds since the epoch
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds the columns from (userId, runeId, RuneDocument) tuples."""
+        keys, levels, eases, last_reviewed, next_review = [], [], [], [], []
+        for user_id, rune_id, rune in records:
+            keys.append((user_id, rune_id))
+            levels.append(rune.get("masteryLevel") or 0)
+            eases.append(rune.get("easeFactor") or 0.0)
+            last_reviewed.append(to_epoch_us(rune.get("lastReviewed")))
+            next_review.append(to_epoch_us(rune.get("nextReviewDate")))
+        return cls(
+            keys,
+            np.array(levels, dtype=np.int8),
+            np.array(eases, dtype=np.float64),
+            np.array(last_reviewed, dtype=np.int64),
+            np.array(next_review, dtype=np.int64),
+        )
+
+
+def recompute_columns(columns, params=DEFAULT_SRS_PARAMETERS):
+    """
+    Vectorized srs_scheduler.reschedule_rune over a chunk.
+
+    Returns:
+        tuple: (mastery_level, ease_factor, next_review_date, changed) arrays. Runes that
+               were never reviewed are left as they are and never marked as changed.
+    """
+    reviewed = columns.last_reviewed != MISSING_TIMESTAMP
+    has_next = columns.next_review_date != MISSING_TIMESTAMP
+
+    stored_ease = np.where(columns.ease_factor == 0, params.default_ease_factor, columns.ease_factor)
+    ease_factor = np.maximum(stored_ease, params.min_ease_factor)
+    mastery_level = np.clip(columns.mastery_level, MIN_MASTERY_LEVEL, params.max_mastery_level).astype(np.int8)
+
+    # Same operation order as the scalar version so both round identically
+    previous_interval = np.where(
+        reviewed & has_next,
+        np.maximum(0.0, (columns.next_review_date - columns.last_reviewed) / DAY_US),
+        0.0,
+    )
+    second_interval = math.ceil(params.initial_interval_days * params.second_interval_multiplier)
+    rescaled = np.ceil(np.maximum(previous_interval * (ease_factor / stored_ease), second_interval * ease_factor))
+    interval = np.select(
+        [mastery_level <= MIN_MASTERY_LEVEL + 1, mastery_level == MIN_MASTERY_LEVEL + 2],
+        [params.initial_interval_days, second_interval],
+        rescaled,
+    ).astype(np.int64)
+
+    next_review_date = np.where(reviewed, columns.last_reviewed + interval * DAY_US, columns.next_review_date)
+    mastery_level = np.where(reviewed, mastery_level, columns.mastery_level)
+    ease_factor = np.where(reviewed, ease_factor, columns.ease_factor)
+    changed = reviewed & (
+        (mastery_level != columns.mastery_level)
+        | (ease_factor != columns.ease_factor)
+        | (next_review_date != columns.next_review_date)
+    )
+    return mastery_level, ease_factor, next_review_date, changed
+
+
+def recompute_runes(records, params=DEFAULT_SRS_PARAMETERS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams the field updates for every rune whose schedule changes under `params`.
+
+    Args:
+        records (iterable): (userId, runeId, RuneDocument) tuples, e.g. from a collection group query.
+        params (SrsParameters): The new scheduling parameters.
+        chunk_size (int): Runes held in memory at once.
+
+    Yields:
+        list: One list per chunk of (userId, runeId, {"masteryLevel", "easeFactor", "nextReviewDate"})
+              updates, ready for a batched write. Chunks without changes are skipped.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+
+    records = iter(records)
+    while True:
+        columns = RuneColumns.from_records(islice(records, chunk_size))
+        if not len(columns):
+            return
+        mastery_level, ease_factor, next_review_date, changed = recompute_columns(columns, params)
+        updates = [
+            (*columns.keys[row], {
+                "masteryLevel": int(mastery_level[row]),
+                "easeFactor": float(ease_factor[row]),
+                "nextReviewDate": from_epoch_us(next_review_date[row]),
+            })
+            for row in np.flatnonzero(changed).tolist()
+        ]
+        if updates:
+            yield updates
@@ -0,0 +1,221 @@
+# Spaced-repetition scheduling for the runes of /users/{userId}/spellMastery/
+import heapq
+import math
+from dataclasses import dataclass
+from datetime import timedelta
+from models.spell_mastery import RuneDocument
+
+# Same defaults as the updateReviewItem Cloud Function (src/index.ts)
+DEFAULT_EASE_FACTOR = 2.5
+MIN_EASE_FACTOR = 1.3
+LAPSE_EASE_PENALTY = 0.2
+INITIAL_INTERVAL_DAYS = 1
+SECOND_INTERVAL_MULTIPLIER = 2.5
+MIN_MASTERY_LEVEL = 1  # Découverte
+MAX_MASTERY_LEVEL = 4  # Gravé
+PASSING_QUALITY = 3    # SM-2 answer quality (0-5): 3 and above counts as a successful review
+
+
+@dataclass(frozen=True, slots=True)
+class SrsParameters:
+    """Tunable scheduling parameters; changing them calls for a bulk recompute (srs_bulk_recompute)."""
+    default_ease_factor: float = DEFAULT_EASE_FACTOR
+    min_ease_factor: float = MIN_EASE_FACTOR
+    lapse_ease_penalty: float = LAPSE_EASE_PENALTY
+    initial_interval_days: int = INITIAL_INTERVAL_DAYS
+    second_interval_multiplier: float = SECOND_INTERVAL_MULTIPLIER
+    max_mastery_level: int = MAX_MASTERY_LEVEL
+
+
+DEFAULT_SRS_PARAMETERS = SrsParameters()
+
+
+def previous_interval_days(rune):
+    """Returns the interval (in days) the rune was last scheduled with, or 0 for a new rune."""
+    next_review_date = rune.get("nextReviewDate")
+    last_reviewed = rune.get("lastReviewed")
+    if next_review_date is None or last_reviewed is None:
+        return 0
+    return max(0.0, (next_review_date - last_reviewed) / timedelta(days=1))
+
+
+def next_interval_days(mastery_level, previous_interval, ease_factor, params=DEFAULT_SRS_PARAMETERS):
+    """Interval after a successful review at `mastery_level` (before it is increased)."""
+    if mastery_level <= MIN_MASTERY_LEVEL:
+        return params.initial_interval_days
+    if mastery_level == MIN_MASTERY_LEVEL + 1:
+        return math.ceil(params.initial_interval_days * params.second_interval_multiplier)
+    return math.ceil(max(previous_interval, params.initial_interval_days) * ease_factor)
+
+
+def updated_ease_factor(ease_factor, quality, params=DEFAULT_SRS_PARAMETERS):
+    """SM-2 ease factor update for a successful review, never below the minimum ease factor."""
+    missed = 5 - quality
+    return max(params.min_ease_factor, ease_factor + (0.1 - missed * (0.08 + missed * 0.02)))
+
+
+def review_rune(rune, quality, now, params=DEFAULT_SRS_PARAMETERS):
+    """
+    Applies one review to a rune, SM-2 style.
+
+    Args:
+        rune (RuneDocument): The rune before the review. Missing fields get their defaults.
+        quality (int): Answer quality from 0 (blackout) to 5 (perfect); >= 3 is a success.
+        now (datetime): Review time.
+        params (SrsParameters): Scheduling parameters.
+
+    Returns:
+        RuneDocument: A new document with masteryLevel, easeFactor, successfulReviews,
+                      lastReviewed and nextReviewDate updated.
+    """
+    if not 0 <= quality <= 5:
+        raise ValueError(f"quality must be between 0 and 5, got {quality}.")
+
+    mastery_level = rune.get("masteryLevel") or MIN_MASTERY_LEVEL
+    ease_factor = rune.get("easeFactor") or params.default_ease_factor
+    successful_reviews = rune.get("successfulReviews") or 0
+
+    if quality >= PASSING_QUALITY:
+        interval = next_interval_days(mastery_level, previous_interval_days(rune), ease_factor, params)
+        ease_factor = updated_ease_factor(ease_factor, quality, params)
+        mastery_level = min(params.max_mastery_level, mastery_level + 1)
+        successful_reviews += 1
+    else: # Lapse: back to the first level, and the rune gets harder to space out
+        interval = params.initial_interval_days
+        ease_factor = max(params.min_ease_factor, ease_factor - params.lapse_ease_penalty)
+        mastery_level = MIN_MASTERY_LEVEL
+
+    return RuneDocument(
+        masteryLevel=mastery_level,
+        nextReviewDate=now + timedelta(days=interval),
+        easeFactor=ease_factor,
+        successfulReviews=successful_reviews,
+        lastReviewed=now,
+    )
+
+
+def reschedule_rune(rune, params=DEFAULT_SRS_PARAMETERS):
+    """
+    Recomputes a rune's schedule under new parameters, without a new review.
+
+    The ease factor is brought within the new bounds and the mastery level within
+    [1, max_mastery_level]. The interval is the one the scheduler gives at that level:
+    the initial interval up to level 2, the second interval at level 3, and above that
+    the stored interval rescaled by the ease change (never below the level 3 -> 4 step).
+    Reference implementation for srs_bulk_recompute, which must give the same results.
+
+    Returns:
+        RuneDocument: The updated rune, or the rune itself if it was never reviewed.
+    """
+    if rune.get("lastReviewed") is None:
+        return rune
+
+    stored_ease = rune.get("easeFactor") or params.default_ease_factor
+    ease_factor = max(params.min_ease_factor, stored_ease)
+    mastery_level = min(params.max_mastery_level, max(MIN_MASTERY_LEVEL, rune.get("masteryLevel") or 0))
+
+    second_interval = math.ceil(params.initial_interval_days * params.second_interval_multiplier)
+    if mastery_level <= MIN_MASTERY_LEVEL + 1:
+        interval = params.initial_interval_days
+    elif mastery_level == MIN_MASTERY_LEVEL + 2:
+        interval = second_interval
+    else:
+        rescaled = previous_interval_days(rune) * (ease_factor / stored_ease)
+        interval = math.ceil(max(rescaled, second_interval * ease_factor))
+
+    updated_rune = dict(rune)
+    updated_rune.update(
+        masteryLevel=mastery_level,
+        easeFactor=ease_factor,
+        nextReviewDate=rune["lastReviewed"] + timedelta(days=interval),
+    )
+    return RuneDocument(**updated_rune)
+
+
+class DueQueue:
+    """
+    Min-heap of (nextReviewDate, runeId) for one user.
+
+    Rescheduling pushes a new entry and leaves the old one in place; stale entries are
+    skipped when they surface and the heap is rebuilt once they outnumber live ones.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._scheduled = {} # runeId -> current nextReviewDate
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    def schedule(self, rune_id, next_review_date):
+        """Adds or reschedules a rune. O(log n)."""
+        self._scheduled[rune_id] = next_review_date
+        heapq.heappush(self._heap, (next_review_date, rune_id))
+        if len(self._heap) > 2 * len(self._scheduled) + 16:
+            self._compact()
+
+    def remove(self, rune_id):
+        self._scheduled.pop(rune_id, None)
+
+    def _compact(self):
+        self._heap = [(date, rune_id) for rune_id, date in self._scheduled.items()]
+        heapq.heapify(self._heap)
+
+    def due(self, now, limit):
+        """
+        Returns up to `limit` rune ids whose nextReviewDate is <= now, most overdue first.
+        O(k log n) for k returned runes; the queue is left unchanged.
+        """
+        due_entries = []
+        heap = self._heap
+        while heap and len(due_entries) < limit and heap[0][0] <= now:
+            date, rune_id = heapq.heappop(heap)
+            if self._scheduled.get(rune_id) == date and (not due_entries or due_entries[-1][1] != rune_id):
+                due_entries.append((date, rune_id))
+            # Stale entries (rescheduled or removed runes) are simply dropped here
+        for entry in due_entries:
+            heapq.heappush(heap, entry)
+        return [rune_id for _date, rune_id in due_entries]
+
+    def next_review_date(self):
+        """Returns the earliest scheduled review date, or None if the queue is empty."""
+        while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+
+class RuneScheduler:
+    """Holds one user's runes and keeps their due-queue in sync with every review."""
+
+    def __init__(self, runes=None):
+        self._runes = {}
+        self._queue = DueQueue()
+        for rune_id, rune in (runes or {}).items():
+            self.put(rune_id, rune)
+
+    def __len__(self):
+        return len(self._runes)
+
+    def get(self, rune_id):
+        return self._runes.get(rune_id)
+
+    def put(self, rune_id, rune):
+        """Adds or replaces a rune (e.g. loaded from the spellMastery subcollection)."""
+        self._runes[rune_id] = rune
+        if rune.get("nextReviewDate") is not None:
+            self._queue.schedule(rune_id, rune["nextReviewDate"])
+        else:
+            self._queue.remove(rune_id)
+
+    def review(self, rune_id, quality, now):
+        """Reviews a rune and reschedules it. Returns the updated RuneDocument."""
+        rune = self._runes.get(rune_id)
+        if rune is None:
+            raise KeyError(f"Rune '{rune_id}' not found.")
+        updated_rune = review_rune(rune, quality, now)
+        self.put(rune_id, updated_rune)
+        return updated_rune
+
+    def due_runes(self, now, limit):
+        """Returns up to `limit` (runeId, RuneDocument) pairs due at `now`, most overdue first."""
+        return [(rune_id, self._runes[rune_id]) for rune_id in self._queue.due(now, limit)]
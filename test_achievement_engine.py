@@ -0,0 +1,51 @@
+# Tests for the precompiled achievement index.
+import unittest
+from achievement_engine import AchievementIndex, minigame_achievements
+from models.player_profile import PlayerProfile
+from profile_delta import ProfileDelta
+
+TIERED_ACHIEVEMENTS = [
+    {"id": "SELLER_3", "trigger": {"stat": "itemsSoldAtMarket", "value": 100}},
+    {"id": "SELLER_1", "trigger": {"stat": "itemsSoldAtMarket", "value": 1}},
+    {"id": "SELLER_2", "trigger": {"stat": "itemsSoldAtMarket", "value": 10}},
+    {"id": "POET_1", "trigger": {"stat": "poemsCompleted", "value": 1}},
+]
+
+
+class TestAchievementIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = AchievementIndex(TIERED_ACHIEVEMENTS)
+
+    def test_unlocks_every_reached_tier_of_changed_stats_only(self):
+        profile = PlayerProfile.from_dict({"stats": {"itemsSoldAtMarket": 5, "poemsCompleted": 3},
+                                           "achievements": ["SELLER_1"]})
+        delta = ProfileDelta(stats={"itemsSoldAtMarket": 7})
+        self.assertEqual(self.index.evaluate(profile, delta), {"SELLER_2"})
+        # poemsCompleted already qualifies for POET_1 but did not change, so it is not evaluated
+        self.assertEqual(self.index.evaluate(profile, ProfileDelta(stats={"foodItemsIdentified": 3})), set())
+
+    def test_zero_increments_do_not_unlock(self):
+        profile = PlayerProfile.from_dict({"stats": {"itemsSoldAtMarket": 5}})
+        self.assertEqual(minigame_achievements.evaluate(profile, ProfileDelta(stats={"itemsSoldAtMarket": 0})), set())
+        # A sale by a profile that passed the threshold before the achievement existed catches up
+        self.assertEqual(minigame_achievements.evaluate(profile, ProfileDelta(stats={"itemsSoldAtMarket": 2})),
+                         {"ACH_FIRST_SALE"})
+
+    def test_records_use_the_value_reached_in_the_delta(self):
+        profile = PlayerProfile.from_dict({"stats": {"colorChaosHighestCombo": 20}})
+        self.assertEqual(minigame_achievements.award(profile, ProfileDelta(records={"colorChaosHighestCombo": 4})), set())
+        delta = ProfileDelta(records={"colorChaosHighestCombo": 15})
+        self.assertEqual(minigame_achievements.award(profile, delta), {"Combo Master lvl 1"})
+        self.assertEqual(delta.achievements, {"Combo Master lvl 1"})
+        # Already pending in the delta: not reported twice
+        self.assertEqual(minigame_achievements.award(profile, delta), set())
+
+    def test_profile_achievements_are_a_set_serialized_as_a_list(self):
+        profile = PlayerProfile.from_dict({"achievements": ["B", "A", "A"]})
+        self.assertEqual(profile.achievements, frozenset({"A", "B"}))
+        self.assertEqual(profile.to_dict()["achievements"], ["A", "B"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+# Tests for the adaptive (per-player weighted) item selection.
+import random
+import unittest
+
+from adaptive_selector import WEAK_ITEM_BOOST, AdaptiveSelector, FenwickTree
+from definition_catalog import DefinitionCatalog
+from food_feast_functions import food_selector, get_food_game_data, submit_food_game_results
+from namdaemun_functions import get_namdaemun_game_data, market_item_selector
+from poem_functions import get_poem_puzzle_data, poem_selector, submit_poem_results
+from poem_mocks import MOCK_POEM_PUZZLES
+from src.game_logic.color_chaos import color_selector, get_color_chaos_game_data
+
+
+class TestFenwickTree(unittest.TestCase):
+
+    def test_find_matches_prefix_sums(self):
+        weights = [0.0, 2.0, 0.0, 1.5, 3.0, 0.5, 0.0]
+        tree = FenwickTree(len(weights))
+        for position, weight in enumerate(weights):
+            tree[position] = weight
+        self.assertAlmostEqual(tree.total, 7.0)
+        for target, expected in ((0.0, 1), (1.99, 1), (2.0, 3), (3.49, 3), (3.5, 4), (6.49, 4), (6.5, 5), (6.99, 5)):
+            self.assertEqual(tree.find(target), expected)
+
+        tree[4] = 0.0
+        self.assertEqual(tree.find(3.5), 5)
+        self.assertAlmostEqual(tree.total, 4.0)
+
+
+class TestAdaptiveSelector(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [{"id": f"item_{number}"} for number in range(10)]
+        self.catalog = DefinitionCatalog(lambda: self.items, version=lambda: len(self.items))
+        self.selector = AdaptiveSelector(self.catalog)
+
+    def draw_counts(self, player_id, draws=4000):
+        rng = random.Random(7)
+        counts = {}
+        for _ in range(draws):
+            item_id = self.selector.choose(player_id, rng)["id"]
+            counts[item_id] = counts.get(item_id, 0) + 1
+        return counts
+
+    def test_new_players_draw_uniformly(self):
+        counts = self.draw_counts("new_player")
+        self.assertEqual(len(counts), 10)
+        self.assertLess(max(counts.values()) - min(counts.values()), 150)
+
+    def test_weak_items_are_drawn_more_often(self):
+        self.selector.record("alice", "item_3", correct=False, latency_seconds=8.0)
+        self.selector.record("alice", "item_5", correct=True, latency_seconds=0.5)
+        self.assertEqual(self.selector.weight("alice", "item_3"), 1.0 + WEAK_ITEM_BOOST)
+        self.assertEqual(self.selector.weight("alice", "item_7"), 1.0)
+
+        counts = self.draw_counts("alice")
+        # item_3 weighs 5 out of a total of 9 + 5 + weight(item_5)
+        self.assertGreater(counts["item_3"], 1200)
+        self.assertLess(counts["item_7"], 400)
+        self.assertLess(self.draw_counts("bob")["item_3"], 550)
+
+    def test_sample_positions_are_distinct(self):
+        for item in self.items:
+            self.selector.record("alice", item["id"], correct=False)
+        snapshot, positions = self.selector.sample_positions("alice", 10, random.Random(1))
+        self.assertEqual(sorted(positions), list(range(10)))
+        self.assertAlmostEqual(self.selector.weight("alice", "item_0"), 1.0 + WEAK_ITEM_BOOST * 0.75)
+        with self.assertRaises(ValueError):
+            self.selector.sample_positions("alice", 11, random.Random(1))
+
+    def test_statistics_follow_catalog_reloads(self):
+        self.selector.record("alice", "item_9", correct=False, latency_seconds=10)
+        self.items.insert(0, {"id": "item_new"})
+        counts = self.draw_counts("alice")
+        self.assertGreater(counts["item_9"], counts["item_new"] * 3)
+
+    def test_record_answers_validates_everything_first(self):
+        with self.assertRaises(ValueError):
+            self.selector.record_answers("alice", [{"id": "item_1", "correct": True}, {"id": "item_2", "correct": "yes"}])
+        self.assertEqual(self.selector.weight("alice", "item_1"), 1.0)
+
+    def test_player_state_grows_with_answered_items_only(self):
+        items = [{"id": f"item_{number}"} for number in range(50_000)]
+        selector = AdaptiveSelector(DefinitionCatalog(lambda: items))
+        selector.choose("new_player", random.Random(1))
+        self.assertNotIn("new_player", selector._players) # Uniform draws keep no state
+        for number in range(20):
+            selector.record("alice", f"item_{number * 1000}", correct=False)
+        state = selector._players["alice"]
+        self.assertLessEqual(len(state.tree), 32)
+        self.assertAlmostEqual(state.tree.total, 20 * WEAK_ITEM_BOOST * 0.75)
+        snapshot, positions = selector.sample_positions("alice", 5, random.Random(1))
+        self.assertEqual(len(set(positions)), 5)
+
+    def test_least_recently_used_players_are_dropped(self):
+        selector = AdaptiveSelector(self.catalog, max_players=1)
+        selector.record("alice", "item_1", correct=False)
+        selector.record("bob", "item_1", correct=False)
+        self.assertEqual(selector.weight("alice", "item_1"), 1.0)
+        self.assertGreater(selector.weight("bob", "item_1"), 1.0)
+
+
+class TestGeneratorsUseTheSelectors(unittest.TestCase):
+
+    def test_color_chaos_targets_lean_toward_missed_colors(self):
+        color_selector.record("test_color_player", "borasaek", correct=False, latency_seconds=10)
+        rng = random.Random(3)
+        targets = [get_color_chaos_game_data({"playerId": "test_color_player"}, rng)["targetColor"] for _ in range(400)]
+        self.assertGreater(targets.count("borasaek"), 400 // 8 * 2)
+
+    def test_namdaemun_correct_item_is_one_of_the_displayed_items(self):
+        market_item_selector.record("test_market_player", "item_4", correct=False, latency_seconds=10)
+        rng = random.Random(5)
+        correct_ids = []
+        for _ in range(200):
+            game = get_namdaemun_game_data(rng, player_id="test_market_player")
+            self.assertIn(game["correct_item"], game["display_items"])
+            self.assertEqual(len({item["id"] for item in game["display_items"]}), len(game["display_items"]))
+            correct_ids.append(game["correct_item"]["id"])
+        self.assertGreater(correct_ids.count("item_4"), 200 // 8 * 2)
+
+    def test_food_answers_are_recorded_and_used(self):
+        profile = {"uid": "test_food_player", "mana": 0, "xp": 0, "stats": {"foodItemsIdentified": 0}}
+        results = {"correctAnswers": 0, "totalQuestions": 1, "timeTaken": 5,
+                   "answers": [{"id": "food_001", "correct": False, "timeTaken": 6}]}
+        submit_food_game_results(profile, results, as_delta=True)
+        self.assertEqual(food_selector.weight("test_food_player", "food_001"), 1.0 + WEAK_ITEM_BOOST)
+
+        game = get_food_game_data({"mode": "recognition", "playerId": "test_food_player"}, random.Random(2))
+        self.assertIn(game["correct_answer_id"], [option["id"] for option in game["options"]])
+
+    def test_poem_results_are_recorded(self):
+        profile = {"uid": "test_poem_player", "mana": 0, "xp": 0, "stats": {"poemsCompleted": 0}}
+        submit_poem_results(profile, "POEM_01", {"blank_1": "wrong"}, as_delta=True)
+        self.assertGreater(poem_selector.weight("test_poem_player", "POEM_01"), 1.0)
+        submit_poem_results(profile, "POEM_02", dict(MOCK_POEM_PUZZLES["POEM_02"]["solutions"]), as_delta=True)
+        self.assertEqual(poem_selector.weight("test_poem_player", "POEM_02"), 1.0)
+
+        payload = get_poem_puzzle_data(random.Random(4), player_id="test_poem_player")
+        self.assertIn(payload["poemId"], MOCK_POEM_PUZZLES)
+        self.assertNotIn("solutions", payload)
+
+
+if __name__ == '__main__':
+    unittest.main()
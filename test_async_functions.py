@@ -0,0 +1,88 @@
+# Tests for the asyncio variants of the minigame functions.
+import asyncio
+import time
+import unittest
+from async_functions import (
+    get_color_chaos_game_data_async, get_food_game_data_async, get_namdaemun_game_data_async,
+    get_poem_puzzle_data_async, submit_color_chaos_results_async, submit_namdaemun_results_async,
+    submit_poem_results_async
+)
+from poem_mocks import MOCK_POEM_PUZZLES
+from profile_store_mocks import AsyncInMemoryProfileStore
+from rng_service import round_rng
+
+
+def make_profile(**stats):
+    return {"mana": 100, "xp": 50, "stats": dict(stats), "achievements": []}
+
+
+class TestAsyncFunctions(unittest.TestCase):
+
+    def test_generators_match_the_sync_versions(self):
+        async def generate():
+            return await asyncio.gather(
+                get_namdaemun_game_data_async(round_rng("game", 1)),
+                get_food_game_data_async({"mode": "recognition", "gameId": "game", "round": 1}),
+                get_poem_puzzle_data_async(round_rng("game", 1)),
+                get_color_chaos_game_data_async({"gameId": "game", "round": 1}),
+            )
+
+        namdaemun, food, poem, color = asyncio.run(generate())
+        self.assertIn(namdaemun["correct_item"], namdaemun["display_items"])
+        self.assertIn("correct_answer_id", food)
+        self.assertIn(poem["poemId"], MOCK_POEM_PUZZLES)
+        self.assertIn("targetColor", color)
+
+    def test_submissions_update_the_store(self):
+        store = AsyncInMemoryProfileStore({"alice": make_profile(itemsSoldAtMarket=0, poemsCompleted=0)})
+
+        async def play():
+            await submit_namdaemun_results_async(store, "alice", 200, 3)
+            answers = dict(MOCK_POEM_PUZZLES["POEM_02"]["solutions"])
+            return await submit_poem_results_async(store, "alice", "POEM_02", answers)
+
+        result = asyncio.run(play())
+        self.assertEqual(result["score"], MOCK_POEM_PUZZLES["POEM_02"]["max_score"])
+        profile = asyncio.run(store.get_profile("alice"))
+        self.assertEqual(profile["mana"], 100 + 10 + 35)
+        self.assertEqual(profile["stats"], {"itemsSoldAtMarket": 3, "poemsCompleted": 1})
+        self.assertEqual(profile["achievements"], ["ACH_FIRST_SALE"])
+        with self.assertRaisesRegex(ValueError, "not found"):
+            asyncio.run(submit_namdaemun_results_async(store, "nobody", 10, 1))
+
+    def test_adaptive_selection_is_reachable(self):
+        from poem_functions import poem_selector
+        store = AsyncInMemoryProfileStore({"async_poet": make_profile(poemsCompleted=0)})
+
+        async def play():
+            await submit_poem_results_async(store, "async_poet", "POEM_02", {"blank_1": "wrong"})
+            return await asyncio.gather(
+                get_namdaemun_game_data_async(round_rng("game", 2), player_id="async_poet"),
+                get_poem_puzzle_data_async(round_rng("game", 2), player_id="async_poet"),
+            )
+
+        namdaemun, poem = asyncio.run(play())
+        self.assertGreater(poem_selector.weight("async_poet", "POEM_02"), 1.0) # Recorded under the store key
+        self.assertIn(namdaemun["correct_item"], namdaemun["display_items"])
+        self.assertIn(poem["poemId"], MOCK_POEM_PUZZLES)
+
+    def test_requests_interleave_on_one_event_loop(self):
+        players = [f"player_{index}" for index in range(100)]
+        store = AsyncInMemoryProfileStore({player: make_profile() for player in players}, latency_seconds=0.02)
+
+        async def play_all():
+            await asyncio.gather(*(
+                submit_color_chaos_results_async(store, player, {"score": 100, "highestCombo": 3}) for player in players
+            ))
+
+        start = time.perf_counter()
+        asyncio.run(play_all())
+        elapsed = time.perf_counter() - start
+        # 100 sequential requests would take at least 100 * 2 round-trips * 20ms = 4s
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(store.write_count, 100)
+        self.assertEqual(asyncio.run(store.get_profiles(players[:2]))["player_1"]["mana"], 110)
+
+
+if __name__ == '__main__':
+    unittest.main()
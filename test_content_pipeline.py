@@ -0,0 +1,152 @@
+# Tests for the definition content pipeline and its binary snapshots.
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from content_pipeline import (
+    COLOR_DEFINITION_SCHEMA, CONTENT_FILES, SYLLABLE_PUZZLE_SCHEMA, ContentSnapshot, ContentValidationError,
+    compile_content_pack, export_mock_collections, iter_json_array, write_snapshot
+)
+from definition_catalog import CONTENT_SNAPSHOT_DIR_ENV, MappedCatalog, build_derived_indexes, content_catalog
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestIterJsonArray(unittest.TestCase):
+
+    def test_streams_records_across_chunk_boundaries(self):
+        source = '[1, 23 ,{"a": [1, 2]}, "x, y", true, null, -4.5e3]'
+        self.assertEqual(list(iter_json_array(io.StringIO(source), read_size=1)), json.loads(source))
+        self.assertEqual(list(iter_json_array(io.StringIO(" [ ] "), read_size=1)), [])
+
+    def test_rejects_malformed_input(self):
+        for source in ("{}", "[1 2]", "[1,"):
+            with self.assertRaises(ValueError, msg=source):
+                list(iter_json_array(io.StringIO(source), read_size=2))
+
+
+class TestContentSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_content_pack_round_trip(self):
+        counts = compile_content_pack(REPO_DIR, self.output_dir)
+        for file_name, schema in CONTENT_FILES.items():
+            with open(os.path.join(REPO_DIR, file_name), encoding="utf-8") as file:
+                expected = json.load(file)
+            snapshot = ContentSnapshot(os.path.join(self.output_dir, schema.collection + ".kpsnap"))
+            try:
+                self.assertEqual(counts[schema.collection], len(expected))
+                self.assertEqual([dict(record) for record in snapshot], expected)
+                first = expected[0]
+                self.assertEqual(dict(snapshot.get(first[schema.id_field])), first)
+            finally:
+                snapshot.close()
+
+    def test_indexes(self):
+        path = os.path.join(self.output_dir, "syllables.kpsnap")
+        with open(os.path.join(REPO_DIR, "syllablePuzzles.json"), encoding="utf-8") as file:
+            write_snapshot(iter_json_array(file), SYLLABLE_PUZZLE_SCHEMA, path)
+        snapshot = ContentSnapshot(path)
+        try:
+            self.assertEqual([record["syllable"] for record in snapshot.items_where("difficulty", 2)], ["글", "강", "위"])
+            self.assertEqual(snapshot.items_where("difficulty", "2"), ())
+            self.assertEqual(sorted(snapshot.values_of("type")), ["CVC", "CVV"])
+            self.assertIsNone(snapshot.get("없"))
+            with self.assertRaises(TypeError):
+                snapshot[0]["syllable"] = "x"
+        finally:
+            snapshot.close()
+
+    def test_invalid_records_leave_no_snapshot(self):
+        path = os.path.join(self.output_dir, "syllables.kpsnap")
+        with self.assertRaisesRegex(ContentValidationError, r"syllablePuzzles\[0\]: 'difficulty' must be int"):
+            write_snapshot([{"syllable": "글", "jamo": [], "difficulty": "2"}], SYLLABLE_PUZZLE_SCHEMA, path)
+        with self.assertRaisesRegex(ContentValidationError, "duplicate syllable"):
+            write_snapshot([{"syllable": "글", "jamo": [], "difficulty": 2}] * 2, SYLLABLE_PUZZLE_SCHEMA, path)
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_unwritable_path_reports_the_open_error(self):
+        path = os.path.join(self.output_dir, "missing", "syllables.kpsnap")
+        with self.assertRaises(FileNotFoundError) as raised:
+            write_snapshot([{"syllable": "글", "jamo": [], "difficulty": 2}], SYLLABLE_PUZZLE_SCHEMA, path)
+        self.assertIsNone(raised.exception.__context__)
+
+
+class TestMappedCatalogs(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        export_mock_collections(self.output_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def path(self, collection):
+        return os.path.join(self.output_dir, collection + ".kpsnap")
+
+    def test_records_are_decoded_lazily(self):
+        snapshot = MappedCatalog(self.path("foodItems")).snapshot()
+        records = snapshot.items_where("category", "plats")
+        self.assertTrue(records)
+        self.assertTrue(all(record._data is None for record in records))
+        self.assertEqual(records[0]["hangeul"], "김치")
+        self.assertIsNotNone(records[0]._data)
+        self.assertIsNone(records[1]._data)
+
+    def test_content_catalog_uses_snapshots_when_configured(self):
+        fallback = object()
+        with mock.patch.dict(os.environ, {CONTENT_SNAPSHOT_DIR_ENV: self.output_dir}):
+            self.assertIsInstance(content_catalog("poemPuzzles", fallback), MappedCatalog)
+            self.assertIs(content_catalog("unknownCollection", fallback), fallback)
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertIs(content_catalog("poemPuzzles", fallback), fallback)
+
+    def test_catalog_remaps_a_replaced_file(self):
+        catalog = MappedCatalog(self.path("colorDefinitions"))
+        self.assertEqual(len(catalog.snapshot()), 8)
+        write_snapshot([{"colorId": "hinsek", "hangeul": "흰색"}], COLOR_DEFINITION_SCHEMA, self.path("colorDefinitions"))
+        self.assertEqual(len(catalog.snapshot()), 8, "Checked again only after the TTL or an invalidation.")
+        catalog.invalidate()
+        self.assertEqual(len(catalog.snapshot()), 1)
+
+    def test_derived_indexes_are_built_ahead_of_requests(self):
+        from food_distractors import FoodDistractorIndex
+        from poem_index import PoemPayloadCache
+
+        food_catalog = MappedCatalog(self.path("foodItems"))
+        poem_catalog = MappedCatalog(self.path("poemPuzzles"))
+        distractors, payloads = FoodDistractorIndex(food_catalog), PoemPayloadCache(poem_catalog)
+        build_derived_indexes()
+        self.assertIs(distractors._compiled.snapshot, food_catalog.snapshot())
+        self.assertIs(payloads._compiled[0], poem_catalog.snapshot())
+
+    def test_minigames_read_from_mapped_snapshots(self):
+        import food_feast_functions
+        import namdaemun_functions
+        import poem_functions
+        import poem_index
+        from src.game_logic import color_chaos
+
+        with mock.patch.object(namdaemun_functions, "market_item_catalog", MappedCatalog(self.path("marketItemDefinitions"))), \
+             mock.patch.object(food_feast_functions, "food_item_catalog", MappedCatalog(self.path("foodItems"))), \
+             mock.patch.object(poem_functions, "poem_payloads", poem_index.PoemPayloadCache(MappedCatalog(self.path("poemPuzzles")))), \
+             mock.patch.object(color_chaos, "color_catalog", MappedCatalog(self.path("colorDefinitions"))):
+            namdaemun = namdaemun_functions.get_namdaemun_game_data()
+            self.assertIn(namdaemun["correct_item"], namdaemun["display_items"])
+            self.assertIsInstance(namdaemun["correct_item"], dict)
+            food = food_feast_functions.get_food_game_data({"mode": "recognition"})
+            self.assertIn(food["correct_answer_id"], [option["id"] for option in food["options"]])
+            self.assertIn(poem_functions.get_poem_puzzle_data()["poemId"], ("POEM_01", "POEM_02"))
+            self.assertIn("targetHangeul", color_chaos.get_color_chaos_game_data({}))
+
+
+if __name__ == '__main__':
+    unittest.main()
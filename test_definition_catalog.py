@@ -0,0 +1,86 @@
+# Tests for the shared definition catalog layer.
+import unittest
+from definition_catalog import DefinitionCatalog, invalidate_all_catalogs
+from testing_support import FakeClock
+
+SAMPLE_RECORDS = [
+    {"id": "food_001", "hangeul": "김치", "category": "plats"},
+    {"id": "food_002", "hangeul": "비빔밥", "category": "plats"},
+    {"id": "food_007", "hangeul": "물", "category": "boissons"},
+]
+
+
+class TestDefinitionCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [dict(record) for record in SAMPLE_RECORDS]
+        self.load_count = 0
+        self.clock = FakeClock()
+
+    def loader(self):
+        self.load_count += 1
+        return self.records
+
+    def make_catalog(self, **kwargs):
+        return DefinitionCatalog(self.loader, index_fields=("category",), ttl_seconds=60, clock=self.clock, **kwargs)
+
+    def test_loads_once_and_indexes_records(self):
+        catalog = self.make_catalog()
+        snapshot = catalog.snapshot()
+        self.assertIs(catalog.snapshot(), snapshot)
+        self.assertEqual(self.load_count, 1)
+
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(snapshot.get("food_007")["hangeul"], "물")
+        self.assertIsNone(snapshot.get("food_999"))
+        self.assertEqual([item["id"] for item in snapshot.items_where("category", "plats")], ["food_001", "food_002"])
+        self.assertEqual(snapshot.items_where("category", "desserts"), ())
+        self.assertEqual(set(snapshot.values_of("category")), {"plats", "boissons"})
+
+    def test_records_are_read_only_and_detached_from_source(self):
+        snapshot = self.make_catalog().snapshot()
+        with self.assertRaises(TypeError):
+            snapshot.get("food_001")["hangeul"] = "밥"
+        self.records[0]["hangeul"] = "밥"
+        self.assertEqual(snapshot.get("food_001")["hangeul"], "김치")
+
+    def test_reloads_after_ttl(self):
+        catalog = self.make_catalog()
+        catalog.snapshot()
+        self.clock.now = 59
+        catalog.snapshot()
+        self.assertEqual(self.load_count, 1)
+        self.clock.now = 60
+        catalog.snapshot()
+        self.assertEqual(self.load_count, 2)
+
+    def test_reloads_when_version_changes(self):
+        catalog = self.make_catalog(version=lambda: len(self.records))
+        catalog.snapshot()
+        self.records.append({"id": "food_009", "hangeul": "빵", "category": "boulangerie"})
+        self.assertEqual(len(catalog.snapshot()), 4)
+        self.assertEqual(self.load_count, 2)
+
+    def test_ttl_expiry_at_the_same_version_keeps_the_snapshot(self):
+        version = [1]
+        catalog = self.make_catalog(version=lambda: version[0])
+        snapshot = catalog.snapshot()
+        self.clock.now = 600
+        self.assertIs(catalog.snapshot(), snapshot)
+        self.assertEqual(self.load_count, 1)
+        version[0] = 2
+        self.assertIsNot(catalog.snapshot(), snapshot)
+        self.assertEqual(self.load_count, 2)
+
+    def test_invalidation_hooks(self):
+        catalog = self.make_catalog()
+        catalog.snapshot()
+        catalog.invalidate()
+        catalog.snapshot()
+        invalidate_all_catalogs()
+        catalog.snapshot()
+        self.assertEqual(self.load_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
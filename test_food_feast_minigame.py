@@ -1,10 +1,15 @@
 # Tests for the "Festin des Mots" (Food Feast) minigame backend logic.
+import threading
+import time
 import unittest
+from unittest import mock
 from food_mocks import get_all_food_items, get_food_item_by_id # To simulate access to food definitions
 from food_feast_functions import get_food_game_data # Import the actual function
 
 # Import the actual submit_food_game_results function
 from food_feast_functions import submit_food_game_results, XP_CONVERSION_FACTOR # also import XP_CONVERSION_FACTOR for test
+from definition_catalog import invalidate_all_catalogs
+from round_sampler import make_rng
 
 # --- Test Classes ---
 
@@ -64,6 +69,14 @@ class TestGetFoodGameData(unittest.TestCase):
         self.assertEqual(correct_option_in_list["hangeul"], correct_item_from_mock["hangeul"],
                          "The Hangeul of the correct option does not match the mock data.")
 
+    def test_get_food_game_data_seeded_rounds_are_reproducible(self):
+        """The same seed must regenerate the same recognition round."""
+        first_round = get_food_game_data({"mode": "recognition"}, make_rng(42))
+        replayed_round = get_food_game_data({"mode": "recognition"}, make_rng(42))
+        self.assertEqual(first_round, replayed_round)
+        option_ids = [option["id"] for option in first_round["options"]]
+        self.assertEqual(len(option_ids), len(set(option_ids)), "Options should be distinct items.")
+
     def test_get_food_game_data_not_enough_items(self):
         """Tests behavior when there are not enough items for recognition mode."""
         all_food_items_backup = list(get_all_food_items()) # Backup
@@ -84,6 +97,7 @@ class TestGetFoodGameData(unittest.TestCase):
         food_mocks.MOCK_FOOD_ITEMS.clear()
         food_mocks.MOCK_FOOD_ITEMS.append({"id": "food_001", "hangeul": "김치", "imageUrl": "img.png"})
         food_mocks.MOCK_FOOD_ITEMS.append({"id": "food_002", "hangeul": "밥", "imageUrl": "img2.png"})
+        invalidate_all_catalogs()
 
         with self.assertRaisesRegex(ValueError, "Not enough unique food items"):
             get_food_game_data({"mode": "recognition"})
@@ -91,6 +105,7 @@ class TestGetFoodGameData(unittest.TestCase):
         # Restore
         food_mocks.MOCK_FOOD_ITEMS.clear()
         food_mocks.MOCK_FOOD_ITEMS.extend(original_food_mocks_list)
+        invalidate_all_catalogs()
 
 
 class TestSubmitFoodGameResults(unittest.TestCase):
@@ -158,5 +173,129 @@ class TestSubmitFoodGameResults(unittest.TestCase):
                          f"foodItemsIdentified incorrect. Expected {expected_items_identified_after_game}, got {updated_player_profile['stats']['foodItemsIdentified']}")
 
 
+
+class TestFoodItemCatalog(unittest.TestCase):
+
+    def test_lookups_return_read_only_items(self):
+        item = get_food_item_by_id("food_007")
+        self.assertEqual(item["hangeul"], "물")
+        self.assertIsNone(get_food_item_by_id("food_999"))
+        with self.assertRaises(TypeError):
+            item["hangeul"] = "불"
+        self.assertIs(get_food_item_by_id("food_007"), item, "Lookups should not copy the item.")
+
+    def test_category_index(self):
+        from food_mocks import get_food_items_by_category
+        self.assertEqual([item["id"] for item in get_food_items_by_category("plats")],
+                         ["food_001", "food_002", "food_003", "food_005"])
+        self.assertEqual(get_food_items_by_category("desserts"), ())
+
+
+class TestFoodGameSession(unittest.TestCase):
+
+    def test_session_payload(self):
+        session = get_food_game_data({"mode": "recognition", "questions": 6}, make_rng(7))
+        questions = session["questions"]
+        self.assertEqual(len(questions), 6)
+
+        correct_ids = [question["id"] for question in questions]
+        self.assertEqual(len(set(correct_ids)), 6, "Correct answers must not repeat within a session.")
+        categories = [get_food_item_by_id(item_id)["category"] for item_id in correct_ids]
+        self.assertEqual(len(set(categories)), 6, "Six questions over six categories: one per category.")
+
+        for question in questions:
+            self.assertIn(question["id"], question["options"])
+            self.assertEqual(len(set(question["options"])), len(question["options"]))
+            self.assertTrue(3 <= len(question["options"]) <= 4)
+            for item_id in question["options"]:
+                self.assertEqual(session["items"][item_id]["hangeul"], get_food_item_by_id(item_id)["hangeul"])
+
+        self.assertEqual(session, get_food_game_data({"mode": "recognition", "questions": 6}, make_rng(7)))
+
+    def test_session_bounds(self):
+        with self.assertRaisesRegex(ValueError, "'questions' must be an integer"):
+            get_food_game_data({"mode": "recognition", "questions": 0})
+        with self.assertRaisesRegex(ValueError, "Cannot draw 10 distinct items"):
+            get_food_game_data({"mode": "recognition", "questions": 10})
+
+
+class TestFoodGameModes(unittest.TestCase):
+
+    def test_listening_and_reverse_modes(self):
+        for mode, prompt_field in (("listening", "audioUrl"), ("reverse", "name_fr")):
+            game_data = get_food_game_data({"mode": mode}, make_rng(3))
+            correct_item = get_food_item_by_id(game_data["correct_answer_id"])
+            self.assertEqual(game_data["question"], {prompt_field: correct_item[prompt_field], "id": correct_item["id"]})
+            self.assertIn(correct_item["id"], [option["id"] for option in game_data["options"]])
+        self.assertIn("error", get_food_game_data({"mode": "writing"}))
+
+    def test_hard_distractors_prefer_look_alikes(self):
+        from food_distractors import food_distractors, hangeul_syllables
+        self.assertEqual(hangeul_syllables("김밥 (roll)"), {"김", "밥"})
+        for seed in range(20):
+            correct_item, display_items = food_distractors.hard_round(2, make_rng(seed))
+            self.assertIn(correct_item, display_items)
+            self.assertEqual(len({item["id"] for item in display_items}), 3)
+            if correct_item["id"] == "food_006": # 김밥 shares a syllable with 김치, 비빔밥 and 밥
+                self.assertLessEqual({item["id"] for item in display_items}, {"food_006", "food_001", "food_002", "food_008"})
+
+        game_data = get_food_game_data({"mode": "reverse", "difficulty": "hard"}, make_rng(1))
+        self.assertIn("name_fr", game_data["question"])
+        with self.assertRaisesRegex(ValueError, "'difficulty'"):
+            get_food_game_data({"mode": "reverse", "difficulty": "expert"})
+
+    def test_sessions_honour_the_difficulty(self):
+        with self.assertRaisesRegex(ValueError, "'difficulty'"):
+            get_food_game_data({"mode": "recognition", "difficulty": "expert", "questions": 3})
+        for seed in range(5):
+            session = get_food_game_data({"mode": "recognition", "difficulty": "hard", "questions": 6}, make_rng(seed))
+            for question in session["questions"]:
+                if question["id"] == "food_006": # 김밥: its look-alikes 김치, 비빔밥 and 밥 come first
+                    self.assertLessEqual(set(question["options"]), {"food_006", "food_001", "food_002", "food_008"})
+                self.assertIn(question["id"], question["options"])
+                self.assertEqual(len(set(question["options"])), len(question["options"]))
+
+    def test_hard_distractors_in_large_categories(self):
+        from definition_catalog import DefinitionCatalog
+        from food_distractors import FoodDistractorIndex
+        # Two categories of 1000 items: more candidates than are filtered whole, so they are sampled
+        items = [{"id": f"food_{number}", "hangeul": "김치" if number % 100 == 0 else chr(0xB000 + number),
+                  "category": f"category_{number % 2}"} for number in range(2000)]
+        index = FoodDistractorIndex(DefinitionCatalog(lambda: items))
+        look_alikes = {item["id"] for item in items if item["hangeul"] == "김치" and item["category"] == "category_0"}
+        for seed in range(50):
+            correct_item, display_items = index.hard_round(3, make_rng(seed))
+            ids = {item["id"] for item in display_items}
+            self.assertEqual(len(ids), 4)
+            if correct_item["id"] in look_alikes: # Same category and syllables: all drawn from the look-alikes
+                self.assertLessEqual(ids, look_alikes)
+            else:
+                self.assertEqual({item["category"] for item in display_items}, {correct_item["category"]})
+
+    def test_tables_are_built_once_per_snapshot(self):
+        import food_distractors
+        from definition_catalog import DefinitionCatalog
+        items = [{"id": f"food_{number}", "hangeul": chr(0xB000 + number), "category": "plats"} for number in range(50)]
+        index = food_distractors.FoodDistractorIndex(DefinitionCatalog(lambda: items))
+        builds, start = [], threading.Barrier(8)
+
+        def build_tables(snapshot):
+            builds.append(snapshot)
+            time.sleep(0.01) # A large catalog: the other requests arrive mid-build
+            return real_tables(snapshot)
+
+        def first_hard_question(seed):
+            start.wait()
+            index.hard_round(3, make_rng(seed))
+
+        real_tables = food_distractors._Tables
+        with mock.patch.object(food_distractors, "_Tables", build_tables):
+            workers = [threading.Thread(target=first_hard_question, args=(seed,)) for seed in range(8)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        self.assertEqual(len(builds), 1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,75 @@
+# Tests for Hangeul jamo decomposition and syllable puzzle generation.
+import json
+import os
+import tempfile
+import unittest
+
+from content_pipeline import SYLLABLE_PUZZLE_SCHEMA
+from hangeul_jamo import (
+    SYLLABLE_COUNT, SYLLABLES, compose, decompose, decompose_text, decompose_words,
+    generate_syllable_puzzles, keystroke_text, syllable_puzzle, write_syllable_puzzles,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestDecomposition(unittest.TestCase):
+
+    def test_decompose_and_compose(self):
+        self.assertEqual(decompose("한"), ("ㅎ", "ㅏ", "ㄴ"))
+        self.assertEqual(decompose("가"), ("ㄱ", "ㅏ", ""))
+        self.assertEqual(decompose("닭"), ("ㄷ", "ㅏ", "ㄺ"))
+        self.assertEqual(compose("ㅎ", "ㅏ", "ㄴ"), "한")
+        self.assertEqual(compose("ㅇ", "ㅢ"), "의")
+
+    def test_round_trips_every_syllable(self):
+        self.assertEqual(len(SYLLABLES), SYLLABLE_COUNT)
+        for code in SYLLABLES:
+            self.assertEqual(compose(*decompose(chr(code))), chr(code))
+
+    def test_rejects_non_syllables(self):
+        for value in ("a", "ㄱ", "한글", "", None):
+            with self.assertRaises(ValueError):
+                decompose(value)
+        with self.assertRaises(ValueError):
+            compose("ㅏ", "ㄱ")
+
+    def test_decompose_text_keeps_other_characters(self):
+        self.assertEqual(decompose_text("한글 2!"), "ㅎㅏㄴㄱㅡㄹ 2!")
+        self.assertEqual(decompose_words(["김밥", "ok"]), ["ㄱㅣㅁㅂㅏㅂ", "ok"])
+
+    def test_keystroke_text_splits_compound_letters(self):
+        self.assertEqual(keystroke_text("과일"), "ㄱㅗㅏㅇㅣㄹ")
+        self.assertEqual(keystroke_text("닭 ㅢ"), "ㄷㅏㄹㄱ ㅡㅣ")
+        self.assertEqual(keystroke_text("꽃"), "ㄲㅗㅊ")
+
+
+class TestSyllablePuzzles(unittest.TestCase):
+
+    def test_reproduces_the_hand_written_puzzles(self):
+        with open(os.path.join(HERE, "syllablePuzzles.json"), encoding="utf-8") as file:
+            hand_written = json.load(file)
+        for record in hand_written:
+            self.assertEqual(syllable_puzzle(record["syllable"]), record)
+
+    def test_splits_compound_letters(self):
+        self.assertEqual(syllable_puzzle("과"), {"syllable": "과", "jamo": ["ㄱ", "ㅗ", "ㅏ"], "difficulty": 2, "type": "CVV"})
+        self.assertEqual(syllable_puzzle("닭")["jamo"], ["ㄷ", "ㅏ", "ㄹ", "ㄱ"])
+        self.assertEqual(syllable_puzzle("나")["type"], "CV")
+
+    def test_generates_distinct_syllables_in_order(self):
+        records = generate_syllable_puzzles(["한글", "글자", "K-pop", "한국"])
+        self.assertEqual([record["syllable"] for record in records], ["한", "글", "자", "국"])
+        for position, record in enumerate(records):
+            SYLLABLE_PUZZLE_SCHEMA.validate(record, position)
+
+    def test_writes_a_puzzle_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "syllablePuzzles.json")
+            self.assertEqual(write_syllable_puzzles(["꽃", "위"], path), 2)
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(json.load(file), [syllable_puzzle("꽃"), syllable_puzzle("위")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# Tests for the hot-path instrumentation hooks and their sinks.
+import os
+import random
+import tempfile
+import unittest
+
+import instrumentation
+from instrumentation import InMemorySink, LogSink, PrometheusTextSink, instrumented, phase
+from food_feast_functions import submit_food_game_results
+from namdaemun_functions import get_namdaemun_game_data
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def install(self, sink):
+        previous = instrumentation.set_sink(sink)
+        self.addCleanup(instrumentation.set_sink, previous)
+        return sink
+
+
+class TestHooks(unittest.TestCase):
+
+    def test_disabled_hooks_touch_nothing(self):
+        self.assertIsNone(instrumentation.get_sink())
+        self.assertIs(phase("a"), phase("b")) # One shared no-op context manager
+
+        @instrumented("double")
+        def double(value):
+            return value * 2
+        self.assertEqual(double(21), 42)
+        self.assertEqual(double.__name__, "double")
+
+
+class TestInMemorySink(InstrumentationTestCase):
+
+    def test_records_entry_points_and_phases(self):
+        sink = self.install(InMemorySink())
+        get_namdaemun_game_data(random.Random(1))
+        profile = {"mana": 0, "xp": 0, "stats": {"foodItemsIdentified": 0}}
+        submit_food_game_results(profile, {"correctAnswers": 8, "totalQuestions": 10, "timeTaken": 45}, as_delta=True)
+
+        timings = sink.snapshot()["timings"]
+        for name in ("namdaemun.get_game_data", "namdaemun.catalog_fetch", "namdaemun.sample",
+                     "food_feast.submit_results", "food_feast.reward", "food_feast.achievements"):
+            self.assertEqual(timings[name]["count"], 1, name)
+        outer, inner = timings["namdaemun.get_game_data"], timings["namdaemun.sample"]
+        self.assertGreaterEqual(outer["sumSeconds"], inner["sumSeconds"])
+
+    def test_counts_errors(self):
+        sink = self.install(InMemorySink())
+
+        @instrumented("failing")
+        def failing():
+            raise ValueError("boom")
+        with self.assertRaises(ValueError):
+            failing()
+        instrumentation.increment("custom", 3)
+
+        snapshot = sink.snapshot()
+        self.assertEqual(snapshot["timings"]["failing"]["count"], 1)
+        self.assertEqual(snapshot["counters"], {"failing.errors": 1, "custom": 3})
+
+    def test_histogram_quantiles(self):
+        sink = InMemorySink()
+        for _ in range(98):
+            sink.observe("call", 0.00002)
+        sink.observe("call", 0.003)
+        sink.observe("call", 30.0)
+        timing = sink.snapshot()["timings"]["call"]
+        self.assertEqual((timing["p50"], timing["p99"]), (2.5e-5, 5e-3))
+        self.assertEqual(timing["count"], 100)
+
+
+class TestOtherSinks(InstrumentationTestCase):
+
+    def test_log_sink(self):
+        self.install(LogSink())
+        with self.assertLogs("korean_party.instrumentation", level="DEBUG") as logs:
+            with phase("poem.reward"):
+                pass
+        self.assertRegex(logs.output[0], r"timing poem\.reward \d+\.\d{3}ms")
+
+    def test_prometheus_text_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "minigames.prom")
+            sink = self.install(PrometheusTextSink(path))
+            with phase("color_chaos.get_game_data"):
+                pass
+            instrumentation.increment("food_feast.hard_rounds")
+            sink.write()
+            with open(path, encoding="utf-8") as file:
+                text = file.read()
+
+        self.assertIn("# TYPE korean_party_color_chaos_get_game_data_seconds histogram", text)
+        self.assertIn('korean_party_color_chaos_get_game_data_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("korean_party_color_chaos_get_game_data_seconds_count 1", text)
+        self.assertIn("korean_party_food_feast_hard_rounds_total 1", text)
+
+    def test_prometheus_unwritable_path_reports_the_open_error(self):
+        with tempfile.TemporaryDirectory() as directory:
+            sink = PrometheusTextSink(os.path.join(directory, "missing", "minigames.prom"))
+            with self.assertRaises(FileNotFoundError) as raised:
+                sink.write()
+        self.assertIsNone(raised.exception.__context__)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+# Tests for the typed profile and results models.
+import unittest
+from models.game_results import ColorChaosResults, FoodGameResults, PoemResults
+from models.player_profile import PlayerProfile
+
+
+class TestPlayerProfileCodec(unittest.TestCase):
+
+    def test_round_trip_keeps_unknown_fields(self):
+        document = {
+            "uid": "alice",
+            "displayName": "Alice",
+            "mana": 12.5,
+            "xp": 40,
+            "stats": {"itemsSoldAtMarket": 3, "colorChaosHighestCombo": 9, "quizzesWon": 2},
+            "achievements": ["ACH_FIRST_SALE"],
+        }
+        profile = PlayerProfile.from_dict(document)
+        self.assertEqual(profile.stats.items_sold_at_market, 3)
+        self.assertIsNone(profile.stats.poems_completed)
+        self.assertEqual(profile.to_dict(), document)
+        self.assertFalse(hasattr(profile, "__dict__"), "Models should be slotted.")
+
+    def test_validation_errors(self):
+        with self.assertRaises(TypeError):
+            PlayerProfile.from_dict(["not", "a", "dict"])
+        with self.assertRaisesRegex(ValueError, "'mana' as a number"):
+            PlayerProfile.from_dict({"mana": "100"})
+        with self.assertRaisesRegex(ValueError, "'xp' as a number"):
+            PlayerProfile.from_dict({"mana": 1}, required=("mana", "xp"))
+        with self.assertRaisesRegex(ValueError, "'stats' as a dictionary"):
+            PlayerProfile.from_dict({"mana": 1}, required_stats=("poemsCompleted",))
+        with self.assertRaisesRegex(ValueError, "'poemsCompleted' as an integer"):
+            PlayerProfile.from_dict({"stats": {"poemsCompleted": 1.5}})
+
+
+class TestGameResultsCodec(unittest.TestCase):
+
+    def test_defaults_and_round_trip(self):
+        self.assertEqual(FoodGameResults.from_dict({"correctAnswers": 8}), FoodGameResults(8, 0, 0))
+        results = {"score": 2500, "highestCombo": 15}
+        self.assertEqual(ColorChaosResults.from_dict(results).to_dict(), results)
+
+    def test_validation_errors(self):
+        with self.assertRaisesRegex(ValueError, "'highestCombo' must be an integer"):
+            ColorChaosResults.from_dict({"score": 1, "highestCombo": "15"})
+        with self.assertRaisesRegex(ValueError, "poemId"):
+            PoemResults.from_dict({"answers": {}})
+        with self.assertRaisesRegex(ValueError, "'timeTaken' must be a number"):
+            FoodGameResults.from_dict({"timeTaken": True})
+
+    def test_fractional_time_and_color_chaos_score(self):
+        self.assertEqual(FoodGameResults.from_dict({"timeTaken": 12.5}).time_taken, 12.5)
+        self.assertEqual(ColorChaosResults.from_dict({"score": 2500.5, "highestCombo": 3}).score, 2500.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from namdaemun_functions import submit_namdaemun_results, get_namdaemun_game_data # Import the actual functions
 from firestore_mocks import MARKET_ITEM_DEFINITIONS_MOCK # For checking against available items
+from definition_catalog import invalidate_all_catalogs
+from round_sampler import make_rng
 
 class TestSubmitNamdaemunResults(unittest.TestCase): # Renamed for clarity
 
@@ -106,6 +108,20 @@ class TestGetNamdaemunGameData(unittest.TestCase):
         correct_item_id = game_data["correct_item"]["id"]
         self.assertIn(correct_item_id, valid_ids, f"Correct item with id '{correct_item_id}' is not a valid market item.")
 
+    def test_seeded_rounds_are_reproducible(self):
+        """The same seed must regenerate the same round, for replays and audits."""
+        first_round = get_namdaemun_game_data(make_rng(1234))
+        replayed_round = get_namdaemun_game_data(make_rng(1234))
+        self.assertEqual(first_round, replayed_round)
+
+    def test_game_data_does_not_mutate_definitions(self):
+        """Generating a round must not reorder or alter the shared market item definitions."""
+        original_items = [dict(item) for item in MARKET_ITEM_DEFINITIONS_MOCK]
+        game_data = get_namdaemun_game_data()
+        game_data["correct_item"]["name_fr"] = "Modifié"
+        self.assertEqual(MARKET_ITEM_DEFINITIONS_MOCK, original_items)
+        self.assertNotIn("Modifié", [item["name_fr"] for item in get_namdaemun_game_data()["display_items"]])
+
     def test_not_enough_items_for_game_set(self):
         """
         Tests the behavior when there are not enough unique items in the source
@@ -119,6 +135,7 @@ class TestGetNamdaemunGameData(unittest.TestCase):
             {"id": "item_1", "name_kr": "사과", "name_fr": "Pomme", "imageUrl": "images/apple.png"},
             {"id": "item_2", "name_kr": "바나나", "name_fr": "Banane", "imageUrl": "images/banana.png"},
         ])
+        invalidate_all_catalogs()
 
         with self.assertRaisesRegex(ValueError, "Not enough unique items to generate a game set"):
             get_namdaemun_game_data()
@@ -126,17 +143,20 @@ class TestGetNamdaemunGameData(unittest.TestCase):
         # Restore original items for other tests
         MARKET_ITEM_DEFINITIONS_MOCK.clear()
         MARKET_ITEM_DEFINITIONS_MOCK.extend(original_items)
+        invalidate_all_catalogs()
 
     def test_no_items_defined(self):
         """Tests behavior when marketItemDefinitions is empty."""
         original_items = list(MARKET_ITEM_DEFINITIONS_MOCK)
         MARKET_ITEM_DEFINITIONS_MOCK.clear()
+        invalidate_all_catalogs()
 
         with self.assertRaisesRegex(ValueError, "No market item definitions found"):
             get_namdaemun_game_data()
 
         MARKET_ITEM_DEFINITIONS_MOCK.clear()
         MARKET_ITEM_DEFINITIONS_MOCK.extend(original_items)
+        invalidate_all_catalogs()
 
 
 if __name__ == '__main__':
@@ -1,7 +1,11 @@
 # Tests for the "Poème Perdu" minigame backend logic.
+import json
+import random
 import unittest
-from poem_functions import submit_poem_results # Import the actual function
+from poem_functions import get_poem_puzzle_data, get_poem_puzzle_payload, submit_poem_results
 from poem_mocks import get_poem_puzzle_by_id, MOCK_POEM_PUZZLES # To get poem data for tests
+from poem_index import normalize_answer, poem_solutions
+from definition_catalog import invalidate_all_catalogs
 
 class TestPoemMinigameSubmitResults(unittest.TestCase): # Renamed for clarity
 
@@ -121,12 +125,6 @@ class TestPoemMinigameSubmitResults(unittest.TestCase): # Renamed for clarity
         self.assertEqual(result["updated_profile"], initial_profile_state, "Profile should not change for non-existent poem.")
 
 
-if __name__ == '__main__':
-    unittest.main()
-
-# Need to import get_poem_puzzle_data from poem_functions
-from poem_functions import get_poem_puzzle_data
-
 class TestPoemMinigameGetPuzzleData(unittest.TestCase):
 
     def setUp(self):
@@ -140,6 +138,7 @@ class TestPoemMinigameGetPuzzleData(unittest.TestCase):
                 "text": ["Test ", None], "solutions": {"blank_1": "word"},
                 "choices": ["word", "another"], "reward": {"xp": 10, "mana": 5}, "max_score": 10
             }
+            invalidate_all_catalogs()
             self.temp_data_added = True
         else:
             self.temp_data_added = False
@@ -147,6 +146,7 @@ class TestPoemMinigameGetPuzzleData(unittest.TestCase):
     def tearDown(self):
         if hasattr(self, 'temp_data_added') and self.temp_data_added:
             MOCK_POEM_PUZZLES.pop('TEMP_POEM_FOR_TEST', None)
+            invalidate_all_catalogs()
 
 
     def test_get_poem_data_structure_and_content(self):
@@ -193,8 +193,62 @@ class TestPoemMinigameGetPuzzleData(unittest.TestCase):
         """Tests behavior when no poems are defined in the mock data."""
         original_poems = MOCK_POEM_PUZZLES.copy()
         MOCK_POEM_PUZZLES.clear() # Temporarily empty the mock data
+        invalidate_all_catalogs()
 
         with self.assertRaisesRegex(ValueError, "No poem puzzles available"):
             get_poem_puzzle_data()
 
         MOCK_POEM_PUZZLES.update(original_poems) # Restore mock data
+        invalidate_all_catalogs()
+
+
+class TestPoemSolutionIndex(unittest.TestCase):
+
+    def test_answers_are_compared_in_normalized_form(self):
+        self.assertEqual(normalize_answer("  Rêves "), normalize_answer("rêves"))
+        answers = {"blank_1": "Chantent", "blank_2": " silence", "blank_3": "CALME", "blank_4": "rêves"}
+        player_profile = {"mana": 100, "xp": 50, "stats": {"poemsCompleted": 0}}
+
+        result = submit_poem_results(player_profile, "POEM_01", answers)
+
+        self.assertEqual(result["score"], MOCK_POEM_PUZZLES["POEM_01"]["max_score"])
+        self.assertEqual(result["updated_profile"]["stats"]["poemsCompleted"], 1)
+
+    def test_partial_credit_scores_each_blank(self):
+        solutions = poem_solutions.get("POEM_01")
+        self.assertEqual(solutions.expected, ("chantent", "silence", "calme", "rêves"))
+        answers = {"blank_1": "chantent", "blank_2": "paix", "blank_3": "calme", "blank_4": "vent"}
+        self.assertEqual(solutions.check(answers), (True, False, True, False))
+
+        result = submit_poem_results({"mana": 100, "xp": 50, "stats": {"poemsCompleted": 0}},
+                                     "POEM_01", answers, as_delta=True, partial_credit=True)
+
+        self.assertEqual(result["score"], 50)
+        self.assertTrue(result["delta"].is_empty(), "Rewards are only given for a perfect poem.")
+
+    def test_index_follows_poem_changes(self):
+        MOCK_POEM_PUZZLES["POEM_TEMP"] = {"id": "POEM_TEMP", "solutions": {"blank_1": "mot"}, "max_score": 10}
+        invalidate_all_catalogs()
+        try:
+            self.assertEqual(poem_solutions.get("POEM_TEMP").expected, ("mot",))
+        finally:
+            MOCK_POEM_PUZZLES.pop("POEM_TEMP")
+            invalidate_all_catalogs()
+        self.assertIsNone(poem_solutions.get("POEM_TEMP"))
+
+
+class TestPoemPayloadCache(unittest.TestCase):
+
+    def test_payload_bytes_match_the_client_projection(self):
+        payload = json.loads(get_poem_puzzle_payload(random.Random(3)))
+        self.assertEqual(payload, get_poem_puzzle_data(random.Random(3)))
+        self.assertEqual(set(payload), {"poemId", "title", "author", "text", "choices"})
+
+    def test_returned_dicts_do_not_share_state(self):
+        first = get_poem_puzzle_data(random.Random(1))
+        first["choices"].clear()
+        self.assertTrue(get_poem_puzzle_data(random.Random(1))["choices"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# Tests for delta-based profile updates.
+import copy
+import unittest
+from profile_delta import ProfileDelta, coalesce_deltas
+from namdaemun_functions import submit_namdaemun_results
+from food_feast_functions import submit_food_game_results
+from poem_functions import submit_poem_results
+from poem_mocks import MOCK_POEM_PUZZLES
+from src.game_logic.color_chaos import submit_color_chaos_results
+
+
+class TestProfileDelta(unittest.TestCase):
+
+    def test_merge_coalesces_increments_records_and_achievements(self):
+        merged = coalesce_deltas([
+            ProfileDelta(mana=10, stats={"colorsIdentified": 4}, records={"colorChaosHighestCombo": 9}),
+            ProfileDelta(mana=5, xp=2, stats={"colorsIdentified": 6}, records={"colorChaosHighestCombo": 7},
+                         achievements={"Combo Master lvl 1"}),
+            ProfileDelta(achievements={"Combo Master lvl 1", "ACH_FIRST_SALE"}),
+        ])
+        self.assertEqual(merged.mana, 15)
+        self.assertEqual(merged.xp, 2)
+        self.assertEqual(merged.stats, {"colorsIdentified": 10})
+        self.assertEqual(merged.records, {"colorChaosHighestCombo": 9})
+        self.assertEqual(merged.achievements, {"Combo Master lvl 1", "ACH_FIRST_SALE"})
+
+    def test_field_transforms_skip_zero_increments(self):
+        delta = ProfileDelta(mana=75, stats={"itemsSoldAtMarket": 8, "foodItemsIdentified": 0},
+                             records={"colorChaosHighestCombo": 15}, achievements={"ACH_FIRST_SALE"})
+        self.assertEqual(delta.to_field_transforms(), {
+            "mana": ("increment", 75),
+            "stats.itemsSoldAtMarket": ("increment", 8),
+            "stats.colorChaosHighestCombo": ("maximum", 15),
+            "achievements": ("arrayUnion", ["ACH_FIRST_SALE"]),
+        })
+        self.assertEqual(ProfileDelta.from_dict(delta.to_dict()), delta)
+
+    def test_apply_to_keeps_higher_stored_record(self):
+        profile = {"mana": 1, "stats": {"colorChaosHighestCombo": 20}, "achievements": ["A"]}
+        ProfileDelta(records={"colorChaosHighestCombo": 15}, achievements={"A", "B"}).apply_to(profile)
+        self.assertEqual(profile["stats"]["colorChaosHighestCombo"], 20)
+        self.assertEqual(profile["achievements"], ["A", "B"])
+
+
+class TestSubmitAsDelta(unittest.TestCase):
+
+    def assert_delta_matches_in_place_update(self, submit, profile, *args):
+        delta_result = submit(profile, *args, as_delta=True)
+        delta = delta_result if isinstance(delta_result, ProfileDelta) else delta_result["delta"]
+        untouched = copy.deepcopy(profile)
+        self.assertEqual(profile, untouched, "as_delta must not mutate the profile.")
+
+        updated = submit(copy.deepcopy(profile), *args)
+        updated = updated.get("updated_profile", updated)
+        self.assertEqual(delta.apply_to(copy.deepcopy(profile)), updated)
+
+    def test_all_minigames(self):
+        self.assert_delta_matches_in_place_update(
+            submit_namdaemun_results, {"mana": 100, "stats": {"itemsSoldAtMarket": 0}, "achievements": []}, 1500, 8)
+        self.assert_delta_matches_in_place_update(
+            submit_food_game_results, {"mana": 100, "xp": 50, "stats": {"foodItemsIdentified": 10}},
+            {"correctAnswers": 8, "totalQuestions": 10, "timeTaken": 45})
+        self.assert_delta_matches_in_place_update(
+            submit_poem_results, {"mana": 100, "xp": 50, "stats": {"poemsCompleted": 0}},
+            "POEM_01", dict(MOCK_POEM_PUZZLES["POEM_01"]["solutions"]))
+        self.assert_delta_matches_in_place_update(
+            submit_color_chaos_results,
+            {"mana": 100, "stats": {"colorsIdentified": 0, "colorChaosHighestCombo": 0}, "achievements": []},
+            {"score": 2500, "highestCombo": 15})
+
+
+if __name__ == '__main__':
+    unittest.main()
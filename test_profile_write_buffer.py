@@ -0,0 +1,101 @@
+# Tests for the write-behind profile update buffer and its local store stand-ins.
+import time
+import unittest
+from profile_delta import ProfileDelta
+from profile_store_mocks import InMemoryProfileStore, SQLiteProfileStore
+from profile_write_buffer import ProfileWriteBuffer
+from src.game_logic.color_chaos import submit_color_chaos_results
+from testing_support import FakeClock
+
+
+class FailingStore:
+    def __init__(self):
+        self.fail = True
+        self.applied = []
+
+    def apply_deltas(self, deltas_by_player):
+        if self.fail:
+            raise ConnectionError("store unavailable")
+        self.applied.append(deltas_by_player)
+
+
+class TestProfileWriteBuffer(unittest.TestCase):
+
+    def test_coalesces_until_size_threshold(self):
+        store = InMemoryProfileStore()
+        buffer = ProfileWriteBuffer(store, max_pending_players=2, flush_at_exit=False, flush_interval_seconds=None)
+        buffer.add("alice", ProfileDelta(mana=10))
+        buffer.add("alice", ProfileDelta(mana=5, stats={"colorsIdentified": 3}))
+        self.assertEqual(store.write_count, 0)
+        buffer.add("bob", ProfileDelta(xp=7))
+        self.assertEqual(store.write_count, 1)
+        self.assertEqual(store.get_profile("alice"), {"mana": 15, "stats": {"colorsIdentified": 3}})
+        self.assertEqual(len(buffer), 0)
+
+    def test_flushes_when_oldest_delta_is_due(self):
+        clock = FakeClock()
+        store = InMemoryProfileStore()
+        buffer = ProfileWriteBuffer(store, max_delay_seconds=2.0, flush_at_exit=False, clock=clock,
+                                    flush_interval_seconds=None)
+        buffer.add("alice", ProfileDelta(mana=1))
+        clock.now = 1.0
+        buffer.flush_if_due()
+        self.assertEqual(store.write_count, 0)
+        clock.now = 2.5
+        buffer.flush_if_due()
+        self.assertEqual(store.write_count, 1)
+
+    def test_failed_flush_keeps_increments(self):
+        store = FailingStore()
+        buffer = ProfileWriteBuffer(store, flush_at_exit=False, flush_interval_seconds=None)
+        buffer.add("alice", ProfileDelta(mana=10, achievements={"ACH_FIRST_SALE"}))
+        with self.assertRaises(ConnectionError):
+            buffer.flush()
+        buffer.add("alice", ProfileDelta(mana=5))
+
+        store.fail = False
+        buffer.close()
+        self.assertEqual(store.applied, [{"alice": ProfileDelta(mana=15, achievements={"ACH_FIRST_SALE"})}])
+        with self.assertRaises(RuntimeError):
+            buffer.add("alice", ProfileDelta(mana=1))
+
+    def test_failed_flush_on_add_does_not_raise(self):
+        store = FailingStore()
+        buffer = ProfileWriteBuffer(store, max_pending_players=1, flush_at_exit=False, flush_interval_seconds=None)
+        with self.assertLogs("korean_party.profile_write_buffer", level="WARNING"):
+            buffer.add("alice", ProfileDelta(mana=10)) # Accepted: a retry here would count it twice
+        self.assertIsInstance(buffer.last_flush_error, ConnectionError)
+        store.fail = False
+        self.assertEqual(buffer.flush(), 1)
+        self.assertIsNone(buffer.last_flush_error)
+        self.assertEqual(store.applied, [{"alice": ProfileDelta(mana=10)}])
+
+    def test_background_flusher_drains_an_idle_buffer(self):
+        store = InMemoryProfileStore()
+        buffer = ProfileWriteBuffer(store, max_delay_seconds=0.02, flush_at_exit=False, flush_interval_seconds=0.01)
+        self.addCleanup(buffer.close)
+        buffer.add("alice", ProfileDelta(mana=3))
+        deadline = time.monotonic() + 2.0
+        while store.write_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(store.get_profile("alice"), {"mana": 3})
+        buffer.close()
+        self.assertFalse(buffer._flusher.is_alive())
+
+    def test_sqlite_store_applies_atomic_field_transforms(self):
+        store = SQLiteProfileStore()
+        with ProfileWriteBuffer(store, flush_at_exit=False, flush_interval_seconds=None) as buffer:
+            for results in ({"score": 2500, "highestCombo": 15}, {"score": 1000, "highestCombo": 9}):
+                buffer.add("alice", submit_color_chaos_results({}, results, as_delta=True))
+        self.assertEqual(store.write_count, 1)
+        self.assertEqual(store.get_profile("alice"), {
+            "mana": 350,
+            "stats": {"colorsIdentified": 24, "colorChaosHighestCombo": 15},
+            "achievements": ["Combo Master lvl 1"],
+        })
+        self.assertIsNone(store.get_profile("bob"))
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
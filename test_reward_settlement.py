@@ -0,0 +1,89 @@
+# Tests for end-of-session batch settlement of minigame results.
+import copy
+import unittest
+from unittest import mock
+
+import reward_settlement
+from reward_settlement import settle_session
+from food_feast_functions import submit_food_game_results
+from namdaemun_functions import submit_namdaemun_results
+from poem_mocks import MOCK_POEM_PUZZLES
+from src.game_logic.color_chaos import submit_color_chaos_results
+from testing_support import make_profile
+
+
+class TestSettleSession(unittest.TestCase):
+
+    def setUp(self):
+        self.alice = make_profile("alice", itemsSoldAtMarket=0, foodItemsIdentified=10, poemsCompleted=0)
+        self.bob = make_profile("bob", colorsIdentified=3, colorChaosHighestCombo=12)
+        self.submissions = [
+            (self.alice, "namdaemun", {"score": 1500, "itemsSold": 8}),
+            (self.alice, "food_feast", {"correctAnswers": 8, "totalQuestions": 10, "timeTaken": 45}),
+            (self.alice, "poem", {"poemId": "POEM_01", "answers": dict(MOCK_POEM_PUZZLES["POEM_01"]["solutions"])}),
+            (self.bob, "color_chaos", {"score": 2500, "highestCombo": 15}),
+            (self.bob, "food_feast", {"correctAnswers": 0, "totalQuestions": 0, "timeTaken": 10}),
+            (self.bob, "poem", {"poemId": "POEM_02", "answers": {"blank_1": "lune"}}),
+        ]
+
+    def assert_matches_single_submissions(self, result):
+        # Settling the batch must give the same rewards as calling each submit_* function in turn.
+        alice = copy.deepcopy(self.alice)
+        submit_namdaemun_results(alice, 1500, 8)
+        food_score = submit_food_game_results(alice, {"correctAnswers": 8, "totalQuestions": 10, "timeTaken": 45})["score"]
+        bob = copy.deepcopy(self.bob)
+        submit_color_chaos_results(bob, {"score": 2500, "highestCombo": 15})
+
+        alice_delta = result["deltas"]["alice"]
+        self.assertEqual(alice_delta.mana, alice["mana"] - 100 + 50)
+        self.assertEqual(alice_delta.xp, alice["xp"] - 50 + 75)
+        self.assertEqual(alice_delta.stats, {"itemsSoldAtMarket": 8, "foodItemsIdentified": 8, "poemsCompleted": 1})
+        self.assertEqual(alice_delta.achievements, {"ACH_FIRST_SALE"})
+
+        bob_delta = result["deltas"]["bob"]
+        self.assertEqual(bob_delta.mana, bob["mana"] - 100)
+        self.assertEqual(bob_delta.stats, {"colorsIdentified": 15, "foodItemsIdentified": 0})
+        self.assertEqual(bob_delta.records, {"colorChaosHighestCombo": 15})
+        self.assertEqual(bob_delta.achievements, {"Combo Master lvl 1"})
+
+        self.assertEqual(result["scores"], [1500, food_score, 100, 2500, 0, 0])
+        self.assertEqual(result["totals"]["submissions"], 6)
+        self.assertEqual(result["totals"]["achievementsUnlocked"], 2)
+        self.assertEqual(result["totals"]["mana"], alice_delta.mana + bob_delta.mana)
+
+    def test_settles_all_minigames_without_numpy(self):
+        with mock.patch.object(reward_settlement, "np", None):
+            result = settle_session(self.submissions)
+        self.assert_matches_single_submissions(result)
+        self.assertEqual(self.alice["mana"], 100, "Profiles must not be mutated by settlement.")
+
+    def test_applied_deltas_match_single_submissions(self):
+        alice = copy.deepcopy(self.alice)
+        submit_namdaemun_results(alice, 1500, 8)
+        result = settle_session(self.submissions[:1])
+        self.assertEqual(result["deltas"]["alice"].apply_to(copy.deepcopy(self.alice)), alice)
+
+    @unittest.skipIf(reward_settlement.np is None, "NumPy is not installed.")
+    def test_settles_all_minigames_with_numpy(self):
+        with mock.patch.object(reward_settlement, "NUMPY_MIN_VALUES", 0): # Vectorize even this small session
+            self.assert_matches_single_submissions(settle_session(self.submissions))
+
+    def test_first_sale_is_only_granted_once_per_session(self):
+        result = settle_session([
+            (self.alice, "namdaemun", {"score": 100, "itemsSold": 2}),
+            (self.alice, "namdaemun", {"score": 100, "itemsSold": 3}),
+        ])
+        self.assertEqual(result["deltas"]["alice"].achievements, {"ACH_FIRST_SALE"})
+        self.assertEqual(result["deltas"]["alice"].stats, {"itemsSoldAtMarket": 5})
+
+    def test_rejects_malformed_submissions(self):
+        with self.assertRaisesRegex(ValueError, "unknown minigame"):
+            settle_session([(self.alice, "tetris", {})])
+        with self.assertRaisesRegex(ValueError, "'score' must be an integer"):
+            settle_session([(self.alice, "namdaemun", {"score": "1500", "itemsSold": 8})])
+        with self.assertRaisesRegex(ValueError, "poemId"):
+            settle_session([(self.alice, "poem", {"answers": {}})])
+
+
+if __name__ == '__main__':
+    unittest.main()
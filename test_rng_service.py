@@ -0,0 +1,43 @@
+# Tests for the deterministic round generators and their use by the minigame generators.
+import unittest
+from food_feast_functions import get_food_game_data
+from namdaemun_functions import get_namdaemun_game_data
+from poem_functions import get_poem_puzzle_data
+from rng_service import derive_seed, request_rng, round_rng
+from src.game_logic.color_chaos import get_color_chaos_game_data
+
+
+class TestDeriveSeed(unittest.TestCase):
+
+    def test_seeds_are_stable_and_distinct(self):
+        self.assertEqual(derive_seed("game_42", 3), derive_seed("game_42", 3))
+        seeds = {derive_seed("game_42", 3), derive_seed("game_42", 4), derive_seed("game_43", 3),
+                 derive_seed("game_42", 3, "poem"), derive_seed("game_4", 23)}
+        self.assertEqual(len(seeds), 5)
+        self.assertLess(derive_seed("game_42", 3), 2**64)
+
+    def test_request_rng(self):
+        rng = round_rng("game_42", 1)
+        self.assertIs(request_rng(rng, {"gameId": "other", "round": 2}), rng)
+        self.assertEqual(request_rng(None, {"gameId": "game_42", "round": 1}).random(), round_rng("game_42", 1).random())
+        self.assertIs(request_rng(), request_rng(None, {"mode": "recognition"})) # Unseeded: the thread's generator
+        self.assertIsNot(request_rng(None, {"gameId": "game_42", "round": 1}), request_rng())
+
+
+class TestReproducibleRounds(unittest.TestCase):
+
+    def test_rounds_regenerate_from_game_id_and_round(self):
+        generators = {
+            "namdaemun": lambda game_round: get_namdaemun_game_data(round_rng("game_42", game_round, "namdaemun")),
+            "poem": lambda game_round: get_poem_puzzle_data(round_rng("game_42", game_round, "poem")),
+            "food": lambda game_round: get_food_game_data({"mode": "recognition", "gameId": "game_42", "round": game_round}),
+            "color": lambda game_round: get_color_chaos_game_data({"gameId": "game_42", "round": game_round}),
+        }
+        for name, generate in generators.items():
+            rounds = [generate(game_round) for game_round in range(12)]
+            self.assertEqual(rounds, [generate(game_round) for game_round in range(12)], name)
+            self.assertGreater(len({repr(round_data) for round_data in rounds}), 1, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# Tests for the sampling engine shared by the minigame generators.
+import random
+import threading
+import unittest
+from round_sampler import sample_balanced, thread_rng
+
+
+class TestSampleBalanced(unittest.TestCase):
+
+    def test_quotas_of_open_groups_differ_by_at_most_one(self):
+        fuzz = random.Random(2024)
+        for seed in range(2000):
+            sizes = [fuzz.randint(0, 8) for _ in range(fuzz.randint(1, 6))]
+            if not sum(sizes):
+                continue
+            count = fuzz.randint(1, sum(sizes))
+            groups = [[(index, position) for position in range(size)] for index, size in enumerate(sizes)]
+            drawn = sample_balanced(groups, count, random.Random(seed))
+            self.assertEqual(len(set(drawn)), count)
+            counts = [0] * len(sizes)
+            for index, _position in drawn:
+                counts[index] += 1
+            not_exhausted = [taken for taken, size in zip(counts, sizes) if taken < size]
+            if not_exhausted:
+                self.assertLessEqual(max(counts) - min(not_exhausted), 1, (sizes, count, counts))
+
+    def test_small_groups_hand_their_share_to_the_others(self):
+        groups = [[(name, position) for position in range(size)] for name, size in zip("abcd", (2, 5, 4, 5))]
+        for seed in range(200):
+            drawn = sample_balanced(groups, 11, random.Random(seed))
+            counts = [sum(name == group for name, _position in drawn) for group in "abcd"]
+            self.assertEqual(counts[0], 2)
+            self.assertEqual(sorted(counts[1:]), [3, 3, 3])
+
+    def test_rejects_counts_above_the_total(self):
+        with self.assertRaisesRegex(ValueError, "Cannot draw 4 distinct items from 3"):
+            sample_balanced([[1], [2, 3]], 4, random.Random(1))
+
+
+
+class TestThreadRng(unittest.TestCase):
+
+    def test_thread_rng_is_created_once_per_thread(self):
+        self.assertIs(thread_rng(), thread_rng())
+        other_thread_rngs = []
+        worker = threading.Thread(target=lambda: other_thread_rngs.append(thread_rng()))
+        worker.start()
+        worker.join()
+        self.assertIsNot(other_thread_rngs[0], thread_rng())
+
+
+if __name__ == '__main__':
+    unittest.main()
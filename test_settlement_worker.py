@@ -0,0 +1,85 @@
+# Tests for the parallel end-of-session settlement worker.
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from reward_settlement import settle_session
+from settlement_worker import SettlementWorker, partition_by_player, settle_job
+from poem_mocks import MOCK_POEM_PUZZLES
+from testing_support import make_profile
+
+
+def make_job(player_count):
+    submissions = []
+    profiles = [make_profile(f"player_{number}", itemsSoldAtMarket=0, colorsIdentified=0) for number in range(player_count)]
+    for round_number in range(3):
+        for number, profile in enumerate(profiles):
+            if (number + round_number) % 3 == 0:
+                submissions.append((profile, "namdaemun", {"score": 300 * number + 7, "itemsSold": round_number + 1}))
+            elif (number + round_number) % 3 == 1:
+                submissions.append((profile, "color_chaos", {"score": 40 * number, "highestCombo": number % 25}))
+            else:
+                answers = dict(MOCK_POEM_PUZZLES["POEM_01"]["solutions"]) if number % 2 else {}
+                submissions.append((profile, "poem", {"poemId": "POEM_01", "answers": answers}))
+    return submissions
+
+
+class TestPartitionByPlayer(unittest.TestCase):
+
+    def test_keeps_each_player_together_and_in_order(self):
+        submissions = make_job(10)
+        partitions = partition_by_player(submissions, 4)
+
+        self.assertEqual(len(partitions), 4)
+        self.assertEqual(sorted(position for entries in partitions for position, _ in entries), list(range(30)))
+        owners = {}
+        for number, entries in enumerate(partitions):
+            positions = [position for position, _ in entries]
+            self.assertEqual(positions, sorted(positions))
+            for _position, (profile, _minigame, _results) in entries:
+                self.assertEqual(owners.setdefault(profile["uid"], number), number)
+        self.assertLessEqual(max(map(len, partitions)) - min(map(len, partitions)), 3)
+
+    def test_players_without_uid_are_keyed_by_position(self):
+        anonymous = {"mana": 0, "xp": 0, "stats": {}}
+        submissions = [(anonymous, "namdaemun", {"score": 10, "itemsSold": 1})] * 2
+        self.assertEqual(len(partition_by_player(submissions, 8)), 2)
+
+
+class TestSettlementWorker(unittest.TestCase):
+
+    def test_matches_sequential_settlement_across_processes(self):
+        submissions = make_job(40)
+        with SettlementWorker(max_workers=2, min_parallel_submissions=0) as worker:
+            result = worker.settle(submissions)
+        self.assertEqual(result, settle_session(submissions))
+
+    def test_same_player_games_are_settled_in_order(self):
+        # The second sale unlocks nothing new: only the player's first sale gives ACH_FIRST_SALE.
+        alice = make_profile("alice", itemsSoldAtMarket=0)
+        submissions = [(make_profile(f"p{number}"), "namdaemun", {"score": 10, "itemsSold": 0}) for number in range(6)]
+        submissions[1:1] = [(alice, "namdaemun", {"score": 100, "itemsSold": 1})]
+        submissions.append((alice, "namdaemun", {"score": 200, "itemsSold": 2}))
+        with ThreadPoolExecutor(3) as executor:
+            result = SettlementWorker(3, executor, min_parallel_submissions=0).settle(submissions)
+
+        self.assertEqual(result, settle_session(submissions))
+        self.assertEqual(result["deltas"]["alice"].stats, {"itemsSoldAtMarket": 3})
+        self.assertEqual(result["deltas"]["alice"].achievements, {"ACH_FIRST_SALE"})
+        self.assertEqual(result["scores"][1], 100)
+        self.assertEqual(result["scores"][-1], 200)
+
+    def test_errors_report_the_position_in_the_job(self):
+        submissions = make_job(4)
+        submissions[9] = (submissions[9][0], "tetris", {})
+        with ThreadPoolExecutor(2) as executor:
+            worker = SettlementWorker(2, executor, min_parallel_submissions=0)
+            with self.assertRaisesRegex(ValueError, "Submission 9: unknown minigame"):
+                worker.settle(submissions)
+
+    def test_small_jobs_are_settled_inline(self):
+        submissions = make_job(2)
+        self.assertEqual(settle_job(submissions, max_workers=4), settle_session(submissions))
+
+
+if __name__ == '__main__':
+    unittest.main()
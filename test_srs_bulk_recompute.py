@@ -0,0 +1,68 @@
+# Tests for the vectorized bulk SRS recompute.
+import unittest
+from datetime import datetime, timedelta, timezone
+from srs_scheduler import SrsParameters, reschedule_rune
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    from srs_bulk_recompute import recompute_runes
+
+NOW = datetime(2026, 10, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def make_rune(level, interval_days, ease_factor):
+    return {
+        "masteryLevel": level,
+        "nextReviewDate": NOW + timedelta(days=interval_days),
+        "easeFactor": ease_factor,
+        "successfulReviews": 3,
+        "lastReviewed": NOW,
+    }
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed.")
+class TestRecomputeRunes(unittest.TestCase):
+
+    def test_matches_the_scalar_reschedule(self):
+        params = SrsParameters(min_ease_factor=1.5, second_interval_multiplier=3.0, max_mastery_level=3)
+        runes = {
+            ("alice", f"rune_{level}_{interval}_{ease}"): make_rune(level, interval, ease)
+            for level in (0, 1, 2, 3, 4, 5)
+            for interval in (1, 3, 7, 45)
+            for ease in (0, 1.3, 1.5, 2.37, 2.5)
+        }
+        runes[("bob", "never_reviewed")] = {"masteryLevel": 1}
+
+        updates = {}
+        for chunk in recompute_runes(((*key, rune) for key, rune in runes.items()), params, chunk_size=7):
+            self.assertLessEqual(len(chunk), 7)
+            for user_id, rune_id, fields in chunk:
+                updates[(user_id, rune_id)] = fields
+
+        for key, rune in runes.items():
+            expected = reschedule_rune(rune, params)
+            if expected == rune:
+                self.assertNotIn(key, updates)
+                continue
+            self.assertEqual(updates[key], {
+                "masteryLevel": expected["masteryLevel"],
+                "easeFactor": expected["easeFactor"],
+                "nextReviewDate": expected["nextReviewDate"],
+            }, key)
+
+    def test_unchanged_parameters_yield_nothing(self):
+        records = [
+            ("alice", "rune_ga", make_rune(2, 1, 2.5)),
+            ("alice", "rune_na", make_rune(3, 3, 2.36)),
+            ("alice", "rune_da", make_rune(4, 21, 2.6)),
+        ]
+        self.assertEqual(list(recompute_runes(records)), [])
+        self.assertEqual(list(recompute_runes([])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
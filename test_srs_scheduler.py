@@ -0,0 +1,90 @@
+# Tests for the spaced-repetition scheduler and its due-queue.
+import unittest
+from datetime import datetime, timedelta, timezone
+from srs_scheduler import (
+    DEFAULT_EASE_FACTOR, MAX_MASTERY_LEVEL, MIN_EASE_FACTOR, DueQueue, RuneScheduler, review_rune
+)
+
+NOW = datetime(2026, 10, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def make_rune(level, interval_days, ease_factor=DEFAULT_EASE_FACTOR, successful_reviews=0, due_in_days=0):
+    next_review_date = NOW + timedelta(days=due_in_days)
+    return {
+        "masteryLevel": level,
+        "nextReviewDate": next_review_date,
+        "easeFactor": ease_factor,
+        "successfulReviews": successful_reviews,
+        "lastReviewed": next_review_date - timedelta(days=interval_days),
+    }
+
+
+class TestReviewRune(unittest.TestCase):
+
+    def test_successful_reviews_space_out(self):
+        rune = review_rune({}, 4, NOW)
+        self.assertEqual(rune["masteryLevel"], 2)
+        self.assertEqual(rune["nextReviewDate"], NOW + timedelta(days=1))
+        self.assertEqual(rune["successfulReviews"], 1)
+
+        rune = review_rune(rune, 4, NOW + timedelta(days=1))
+        self.assertEqual(rune["nextReviewDate"] - rune["lastReviewed"], timedelta(days=3))
+
+        rune = review_rune(rune, 4, NOW + timedelta(days=4))
+        self.assertEqual(rune["nextReviewDate"] - rune["lastReviewed"], timedelta(days=8)) # ceil(3 * 2.5)
+        self.assertEqual(rune["masteryLevel"], MAX_MASTERY_LEVEL)
+
+    def test_ease_factor_follows_answer_quality(self):
+        self.assertAlmostEqual(review_rune(make_rune(3, 10), 5, NOW)["easeFactor"], 2.6)
+        self.assertAlmostEqual(review_rune(make_rune(3, 10), 4, NOW)["easeFactor"], 2.5)
+        self.assertAlmostEqual(review_rune(make_rune(3, 10), 3, NOW)["easeFactor"], 2.36)
+
+    def test_lapse_resets_level_and_lowers_ease(self):
+        rune = review_rune(make_rune(4, 30, ease_factor=1.4, successful_reviews=6), 1, NOW)
+        self.assertEqual(rune["masteryLevel"], 1)
+        self.assertEqual(rune["nextReviewDate"], NOW + timedelta(days=1))
+        self.assertEqual(rune["easeFactor"], MIN_EASE_FACTOR)
+        self.assertEqual(rune["successfulReviews"], 6)
+
+    def test_rejects_invalid_quality(self):
+        with self.assertRaises(ValueError):
+            review_rune({}, 6, NOW)
+
+
+class TestDueQueue(unittest.TestCase):
+
+    def test_returns_most_overdue_first_without_consuming(self):
+        queue = DueQueue()
+        for index, offset in enumerate([-3, 2, -1, -5, 0]):
+            queue.schedule(f"rune_{index}", NOW + timedelta(days=offset))
+        self.assertEqual(queue.due(NOW, 10), ["rune_3", "rune_0", "rune_2", "rune_4"])
+        self.assertEqual(queue.due(NOW, 2), ["rune_3", "rune_0"])
+        self.assertEqual(len(queue), 5)
+
+    def test_rescheduled_and_removed_runes_are_skipped(self):
+        queue = DueQueue()
+        queue.schedule("a", NOW - timedelta(days=2))
+        queue.schedule("b", NOW - timedelta(days=1))
+        queue.schedule("a", NOW + timedelta(days=4))
+        queue.remove("b")
+        self.assertEqual(queue.due(NOW, 10), [])
+        self.assertEqual(queue.next_review_date(), NOW + timedelta(days=4))
+
+
+class TestRuneScheduler(unittest.TestCase):
+
+    def test_review_moves_rune_out_of_the_due_set(self):
+        scheduler = RuneScheduler({
+            "rune_ga": make_rune(2, 1, due_in_days=-1),
+            "rune_na": make_rune(3, 3, due_in_days=-2),
+            "rune_da": make_rune(3, 3, due_in_days=5),
+        })
+        self.assertEqual([rune_id for rune_id, _rune in scheduler.due_runes(NOW, 10)], ["rune_na", "rune_ga"])
+        scheduler.review("rune_na", 5, NOW)
+        self.assertEqual([rune_id for rune_id, _rune in scheduler.due_runes(NOW, 10)], ["rune_ga"])
+        with self.assertRaises(KeyError):
+            scheduler.review("rune_ra", 5, NOW)
+
+
+if __name__ == '__main__':
+    unittest.main()
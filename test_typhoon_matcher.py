@@ -0,0 +1,82 @@
+# Tests for the Hangeul Typhoon keystroke matcher.
+import unittest
+
+from typhoon_matcher import (
+    ATTACK_FAILED, ATTACK_LANDED, BACKSPACE, DESTROYED, MISSED, BlockTrie, TyphoonMatcher, verify_typhoon_log,
+)
+
+
+def type_keys(matcher, keys, now=0.0):
+    outcome = None
+    for key in keys:
+        outcome = matcher.press(key, now)
+    return outcome
+
+
+class TestTyphoonMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.field = BlockTrie()
+        self.field.add("b1", "과일")
+        self.field.add("b2", "과")
+        self.field.add("b3", "Maison")
+        self.matcher = TyphoonMatcher(self.field)
+
+    def test_highlights_the_block_typed_so_far(self):
+        type_keys(self.matcher, "ㄱㅗ")
+        self.assertIsNone(self.matcher.highlighted())
+        self.matcher.press("ㅏ")
+        self.assertEqual(self.matcher.highlighted(), "b2")
+        type_keys(self.matcher, "ㅇㅣㄹ")
+        self.assertEqual(self.matcher.highlighted(), "b1")
+
+    def test_destroys_the_matching_block_on_submit(self):
+        self.assertEqual(type_keys(self.matcher, ["ㄱ", "ㅗ", "ㅏ", "Enter"]), (DESTROYED, "b2"))
+        self.assertNotIn("b2", self.field)
+        self.assertEqual(type_keys(self.matcher, ["ㄱ", "ㅗ", "ㅏ", " "]), (MISSED, None))
+        self.assertEqual(type_keys(self.matcher, list("maison") + ["Enter"]), (DESTROYED, "b3"))
+
+    def test_backspace_recovers_from_a_typo(self):
+        type_keys(self.matcher, ["ㄱ", "ㅗ", "ㅓ", "ㅓ", BACKSPACE, BACKSPACE, "ㅏ"])
+        self.assertEqual(self.matcher.highlighted(), "b2")
+        self.assertEqual(self.matcher.press("Enter"), (DESTROYED, "b2"))
+
+    def test_attacks_only_vulnerable_opponent_blocks(self):
+        opponent_field = BlockTrie()
+        opponent_field.add("o1", "집", vulnerable_at=5.0)
+        matcher = TyphoonMatcher(self.field, opponent_field)
+
+        self.assertEqual(type_keys(matcher, "<ㅈㅣㅂ>", now=4.0), (ATTACK_FAILED, None))
+        self.assertEqual(type_keys(matcher, "<ㅈㅣㅂ>", now=5.0), (ATTACK_LANDED, "o1"))
+        self.assertEqual(len(opponent_field), 0)
+        self.assertFalse(matcher.attacking)
+
+
+class TestVerifyTyphoonLog(unittest.TestCase):
+
+    def test_replays_a_duel(self):
+        blocks = [
+            {"id": "a1", "owner": "alice", "text": "가", "spawnedAt": 0},
+            {"id": "b1", "owner": "bob", "text": "나무", "spawnedAt": 0},
+            {"id": "b2", "owner": "bob", "text": "물", "spawnedAt": 1},
+        ]
+        keys = [("alice", "ㄱ", 1), ("alice", "ㅏ", 1.2), ("alice", "Enter", 1.3),
+                ("bob", "ㅁ", 2), ("bob", "ㅜ", 2.1), ("bob", "ㄹ", 2.2), ("bob", "Enter", 2.3),
+                ("alice", "<", 5), ("alice", "ㄴ", 5.1), ("alice", "ㅏ", 5.2), ("alice", "ㅁ", 5.3),
+                ("alice", "ㅜ", 5.4), ("alice", ">", 5.5),
+                ("bob", "ㅁ", 6), ("bob", "Enter", 6.1)]
+        results = verify_typhoon_log(blocks, [{"player": p, "key": k, "at": t} for p, k, t in keys])
+
+        self.assertEqual(results["alice"], {"destroyed": ["a1"], "attacksLanded": ["b1"], "misses": 0,
+                                            "failedAttacks": 0, "keystrokes": 9})
+        self.assertEqual(results["bob"], {"destroyed": ["b2"], "attacksLanded": [], "misses": 1,
+                                          "failedAttacks": 0, "keystrokes": 6})
+
+    def test_rejects_out_of_order_logs(self):
+        keystrokes = [{"player": "alice", "key": "ㄱ", "at": 2}, {"player": "alice", "key": "ㅏ", "at": 1}]
+        with self.assertRaises(ValueError):
+            verify_typhoon_log([], keystrokes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,15 @@
+# Fixture factories shared by the test modules.
+
+
+class FakeClock:
+    """Stands in for time.monotonic: returns `now`, which tests set directly."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_profile(uid, **stats):
+    return {"uid": uid, "mana": 100, "xp": 50, "stats": dict(stats), "achievements": []}
@@ -0,0 +1,203 @@
+# Server-side replay of Hangeul Typhoon keystroke logs (docs/06_Spec_Minijeu_Hangeul_Typhoon.md)
+#
+# The blocks of a player's field are indexed in a trie over the keys that type them
+# (hangeul_jamo.keystroke_text), and the player's input is a path down that trie: a key
+# follows one child link, Backspace pops the path, so matching costs O(1) per keystroke
+# however many blocks are falling.
+from hangeul_jamo import keystroke_text
+
+VULNERABILITY_DELAY_SECONDS = 5 # A block can be attacked once it has been on screen this long
+BACKSPACE = "Backspace"
+SUBMIT_KEYS = frozenset(("Enter", " "))
+ATTACK_PREFIX = "<" # "<word>" attacks the opponent's vulnerable block "word"
+ATTACK_SUFFIX = ">"
+
+DESTROYED = "destroyed"
+MISSED = "missed"
+ATTACK_LANDED = "attackLanded"
+ATTACK_FAILED = "attackFailed"
+
+
+class _Node:
+    __slots__ = ("children", "blocks")
+
+    def __init__(self):
+        self.children = {}
+        self.blocks = {} # Ids of the blocks typed by the path to this node, oldest first
+
+
+class BlockTrie:
+    """
+    The blocks on one player's field, keyed by the keys that type their text.
+
+    Destroyed blocks are unlinked from their node only: the nodes stay, so input paths
+    pointing into the trie are never invalidated.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self._blocks = {} # block_id -> node (which maps it to its vulnerable_at time)
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def __contains__(self, block_id):
+        return block_id in self._blocks
+
+    def add(self, block_id, text, vulnerable_at=0.0):
+        if block_id in self._blocks:
+            raise ValueError(f"Block '{block_id}' is already on the field.")
+        node = self.root
+        for key in keystroke_text(text).casefold():
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _Node()
+            node = child
+        node.blocks[block_id] = vulnerable_at
+        self._blocks[block_id] = node
+
+    def remove(self, block_id):
+        node = self._blocks.pop(block_id)
+        del node.blocks[block_id]
+
+
+class TyphoonMatcher:
+    """
+    The input of one player: matches each keystroke against the player's field (or, after
+    ATTACK_PREFIX, the opponent's) and resolves submissions.
+
+    Keys are what the client logs for each key press: one jamo or character, BACKSPACE,
+    or a submit key ("Enter" or " ").
+    """
+
+    def __init__(self, field, opponent_field=None):
+        self.field = field
+        self.opponent_field = opponent_field
+        self._target = field
+        self._path = [field.root]
+        self._overflow = 0 # Keys typed past the last trie match (no block starts with the input)
+
+    @property
+    def attacking(self):
+        return self._target is not self.field
+
+    def highlighted(self):
+        """The id of the block the current input types exactly (the one to highlight), or None."""
+        if self._overflow or len(self._path) == 1:
+            return None
+        return next(iter(self._path[-1].blocks), None)
+
+    def press(self, key, now=0.0):
+        """
+        Applies one key press made at `now` (seconds).
+
+        Returns:
+            tuple: (outcome, block_id) when the key submits the input, outcome being DESTROYED,
+                   MISSED, ATTACK_LANDED or ATTACK_FAILED (block_id None on failures); None otherwise.
+        """
+        if key == BACKSPACE:
+            if self._overflow:
+                self._overflow -= 1
+            elif len(self._path) > 1:
+                self._path.pop()
+            elif self.attacking: # Erasing the attack prefix itself
+                self._target = self.field
+                self._path = [self.field.root]
+            return None
+        if key in SUBMIT_KEYS or (key == ATTACK_SUFFIX and self.attacking):
+            return self._submit(now)
+        if key == ATTACK_PREFIX and self.opponent_field is not None and len(self._path) == 1 and not self._overflow:
+            self._target = self.opponent_field
+            self._path = [self.opponent_field.root]
+            return None
+
+        for char in keystroke_text(key).casefold():
+            if self._overflow:
+                self._overflow += 1
+                continue
+            child = self._path[-1].children.get(char)
+            if child is None:
+                self._overflow = 1
+            else:
+                self._path.append(child)
+        return None
+
+    def _submit(self, now):
+        node = None if self._overflow or len(self._path) == 1 else self._path[-1]
+        target, attacking = self._target, self.attacking
+        self._target = self.field
+        self._path = [self.field.root]
+        self._overflow = 0
+
+        if not attacking:
+            if node is None or not node.blocks:
+                return MISSED, None
+            block_id = next(iter(node.blocks))
+            target.remove(block_id)
+            return DESTROYED, block_id
+
+        # Protected (black) blocks cannot be attacked: the oldest vulnerable one is hit
+        for block_id, vulnerable_at in (node.blocks.items() if node is not None else ()):
+            if vulnerable_at <= now:
+                target.remove(block_id)
+                return ATTACK_LANDED, block_id
+        return ATTACK_FAILED, None
+
+
+def verify_typhoon_log(blocks, keystrokes, vulnerability_delay=VULNERABILITY_DELAY_SECONDS):
+    """
+    Replays a Hangeul Typhoon game (solo, or a duel between two players) from its logs.
+
+    Args:
+        blocks (list): The blocks dropped during the game, as
+                       {"id": str, "owner": player_id, "text": str, "spawnedAt": seconds}.
+        keystrokes (list): Every key press, in the order they were made, as
+                           {"player": player_id, "key": str, "at": seconds}.
+        vulnerability_delay (float): Seconds before a block can be attacked.
+
+    Returns:
+        dict: Per player id, {"destroyed": [block ids], "attacksLanded": [block ids of the
+              opponent], "misses": int, "failedAttacks": int, "keystrokes": int}.
+    Raises:
+        ValueError: If there are more than two players, a keystroke goes back in time or
+                    a block id is already on the field.
+    """
+    players = dict.fromkeys([block["owner"] for block in blocks] + [stroke["player"] for stroke in keystrokes])
+    if len(players) > 2:
+        raise ValueError(f"A Typhoon game has one or two players, got {len(players)}.")
+    fields = {player_id: BlockTrie() for player_id in players}
+    matchers = {}
+    for player_id, field in fields.items():
+        opponents = [fields[other] for other in fields if other != player_id]
+        matchers[player_id] = TyphoonMatcher(field, opponents[0] if opponents else None)
+    results = {player_id: {"destroyed": [], "attacksLanded": [], "misses": 0, "failedAttacks": 0, "keystrokes": 0}
+               for player_id in players}
+
+    pending = sorted(blocks, key=lambda block: block["spawnedAt"])
+    next_block = 0
+    last_at = float("-inf")
+    for stroke in keystrokes:
+        now = stroke["at"]
+        if now < last_at:
+            raise ValueError(f"Keystroke at {now}s logged after one at {last_at}s.")
+        last_at = now
+        while next_block < len(pending) and pending[next_block]["spawnedAt"] <= now:
+            block = pending[next_block]
+            fields[block["owner"]].add(block["id"], block["text"], block["spawnedAt"] + vulnerability_delay)
+            next_block += 1
+
+        player_result = results[stroke["player"]]
+        player_result["keystrokes"] += 1
+        outcome = matchers[stroke["player"]].press(stroke["key"], now)
+        if outcome is None:
+            continue
+        outcome, block_id = outcome
+        if outcome == DESTROYED:
+            player_result["destroyed"].append(block_id)
+        elif outcome == ATTACK_LANDED:
+            player_result["attacksLanded"].append(block_id)
+        elif outcome == MISSED:
+            player_result["misses"] += 1
+        else:
+            player_result["failedAttacks"] += 1
+    return results